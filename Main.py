@@ -10,6 +10,7 @@ Authors:
 Created through collaborative development including pair programming sessions.
 """
 
+import time
 import asyncio
 import sys
 import signal
@@ -22,9 +23,11 @@ from rich.table import Table
 from rich.panel import Panel
 from rich.text import Text
 
-from config import ConfigManager, AppConfig
+from config import ConfigManager, AppConfig, is_loopback
 from sniper import UsernameSniper
 from logger import setup_logging, get_logger
+from event_loop import LOOP_CHOICES, install_event_loop
+from time_sync import parse_namemc_time
 
 console = Console()
 logger = get_logger(__name__)
@@ -113,11 +116,26 @@ class NameMCSniper:
         
         console.print(table)
 
+def run_async(coro, app_config: AppConfig = None):
+    """Run a coroutine on the event loop chosen by --loop or the config"""
+    ctx = click.get_current_context(silent=True)
+    preference = (ctx.find_root().obj or {}).get('loop') if ctx else None
+    if not preference:
+        preference = app_config.event_loop if app_config else "auto"
+    
+    loop_name = install_event_loop(preference)
+    logger.info(f"Event loop: {loop_name}")
+    console.print(f"[dim]Event loop: {loop_name}[/dim]")
+    return asyncio.run(coro)
+
 @click.group()
 @click.version_option(version="1.0.0", prog_name="NameMC Sniper")
-def cli():
+@click.option('--loop', type=click.Choice(LOOP_CHOICES), default=None, help='Event loop to use (overrides event_loop in config)')
+@click.pass_context
+def cli(ctx, loop):
     """NameMC Sniper - CLI Minecraft Username Sniper"""
-    pass
+    ctx.ensure_object(dict)
+    ctx.obj['loop'] = loop
 
 @cli.command()
 @click.option('--config', '-c', default='config.yaml', help='Configuration file path')
@@ -155,7 +173,7 @@ def snipe(config, username, token):
     
     # Start sniping
     try:
-        asyncio.run(app.start_sniping())
+        run_async(app.start_sniping(), app.config)
     except KeyboardInterrupt:
         console.print("\n[yellow]Sniping interrupted by user[/yellow]")
     except Exception as e:
@@ -242,14 +260,16 @@ def test_proxies(config):
         
         console.print(table)
     
-    asyncio.run(run_test())
+    run_async(run_test(), app_config)
 
 
 @cli.command()
 @click.option('--config', '-c', default='config.yaml', help='Configuration file path')
 @click.option('--username', '-u', required=True, help='Username to snipe')
 @click.option('--drop-window', '-w', required=True, help='Drop window format: "9/29/2025 • 9∶04∶09 PM" (EXACT FORMAT REQUIRED)')
-def snipe_at(config, username, drop_window):
+@click.option('--shards', '-s', type=int, default=None, help='Run the burst in this many processes (overrides snipe.shards)')
+@click.option('--uncertainty-windows', type=click.IntRange(1, 5), default=1, help='Also cover up to 4 slightly later candidate drop times (+0.1s, +0.2s, +0.5s, +1.0s) in one merged burst')
+def snipe_at(config, username, drop_window, shards, uncertainty_windows):
     """Snipe a username at the specified time (starts 0.1s before, continues 10s after)"""
     config_manager = ConfigManager(config)
     app_config = config_manager.load_config()
@@ -258,38 +278,14 @@ def snipe_at(config, username, drop_window):
     try:
         from datetime import datetime, timezone, timedelta
         
-        # Validate exact format first
-        if '•' not in drop_window or '∶' not in drop_window:
-            console.print(f"[red]Error: Invalid format. Must use EXACT format: '9/29/2025 • 9∶04∶09 PM'[/red]")
-            console.print(f"[red]Your input: '{drop_window}'[/red]")
-            console.print(f"[red]Required: bullet (•) and special colons (∶)[/red]")
-            return
-        
-        # Clean up the format - replace special characters
-        clean_window = drop_window.replace('•', '').replace('∶', ':').strip()
-        
-        # Try to parse the datetime - EXACT format only
+        # NameMC displays times in the user's local timezone; parsed_time is UTC
         try:
-            # Expected format after cleaning: "9/29/2025 9:04:09 PM"
-            parsed_time = datetime.strptime(clean_window, '%m/%d/%Y %I:%M:%S %p')
+            parsed_time = parse_namemc_time(drop_window)
         except ValueError:
             console.print(f"[red]Error: Invalid format. Must use EXACT format: '9/29/2025 • 9∶04∶09 PM'[/red]")
             console.print(f"[red]Your input: '{drop_window}'[/red]")
-            console.print(f"[red]Expected: M/D/YYYY • H∶MM∶SS AM/PM[/red]")
+            console.print(f"[red]Expected: M/D/YYYY • H∶MM∶SS AM/PM, with a bullet (•) and special colons (∶)[/red]")
             return
-        # NameMC displays times in the user's local timezone
-        # Convert from local timezone to UTC
-        import time
-        from datetime import datetime, timezone, timedelta
-        
-        # Get the user's local timezone offset
-        local_offset_seconds = -time.timezone if time.daylight == 0 else -time.altzone
-        local_offset = timedelta(seconds=local_offset_seconds)
-        local_tz = timezone(local_offset)
-        
-        # Apply user's local timezone to parsed time
-        parsed_time = parsed_time.replace(tzinfo=local_tz)
-        parsed_time = parsed_time.astimezone(timezone.utc)
         
         # Check if time is in the future (allow 60 seconds grace period for clock drift)
         now = datetime.now(timezone.utc)
@@ -303,7 +299,7 @@ def snipe_at(config, username, drop_window):
         
         time_until = (parsed_time - now).total_seconds()
         # Show both local and UTC times for clarity
-        local_time = parsed_time.astimezone(local_tz)
+        local_time = parsed_time.astimezone()
         clean_display = drop_window.replace('•', ' ').replace('∶', ':')
         console.print(f"[green]SUCCESS[/green] Drop window parsed: {clean_display}")
         console.print(f"Local Time: {local_time.strftime('%Y-%m-%d %I:%M:%S %p')}")
@@ -320,8 +316,21 @@ def snipe_at(config, username, drop_window):
         console.print(f"[yellow]Sniping will start 0.1 seconds before drop time and continue for 10 seconds after[/yellow]")
         
         # Create and run sniper
-        sniper = UsernameSniper(app_config)
-        result = await sniper.snipe_at_time(parsed_time, username)
+        shard_count = shards or app_config.snipe.shards
+        if shard_count > 1 and uncertainty_windows > 1:
+            console.print("[yellow]--uncertainty-windows is not supported with shards; covering the exact drop time only[/yellow]")
+        if shard_count > 1:
+            from sharding import ShardedSniper
+            sniper = ShardedSniper(app_config, shards=shard_count)
+            result = await sniper.snipe_at_time(parsed_time, username)
+        elif uncertainty_windows > 1:
+            from window_planner import uncertainty_weights
+            sniper = UsernameSniper(app_config)
+            drop_times = sniper.timer.calculate_drop_windows(parsed_time, uncertainty_windows)
+            result = await sniper.snipe_with_fallback(drop_times, username, uncertainty_weights(len(drop_times)))
+        else:
+            sniper = UsernameSniper(app_config)
+            result = await sniper.snipe_at_time(parsed_time, username)
         
         # Display results
         if result.success:
@@ -334,8 +343,18 @@ def snipe_at(config, username, drop_window):
                 f"FAILED to claim '{username}'. Attempts: {result.attempts}, Time: {result.total_time:.2f}s\nError: {result.error_message or 'Unknown'}",
                 style="bold red"
             ))
+        if result.gc_collections is not None:
+            console.print(f"[dim]GC collections inside the critical window: {result.gc_collections}[/dim]")
+        if result.tls_stats and result.tls_stats['handshakes']:
+            tls = result.tls_stats
+            console.print(f"[dim]TLS resumption: {tls['resumed']}/{tls['handshakes']} handshakes ({tls['hit_rate']:.0%}), ~{tls['saved_ms']:.0f}ms saved[/dim]")
+        if result.pool_stats and result.pool_stats['waited_for_connection']:
+            pool = result.pool_stats
+            console.print(f"[yellow]{pool['waited_for_connection']} request(s) waited for a free connection (max {pool['max_wait_ms']}ms)[/yellow]")
+        if result.deferred_work:
+            console.print(f"[dim]Deferred during the burst: {result.deferred_work['depth']} items {result.deferred_work['deferred']}[/dim]")
     
-    asyncio.run(run_snipe())
+    run_async(run_snipe(), app_config)
 
 @cli.command()
 @click.option('--username', '-u', required=True, help='Username to snipe')
@@ -363,28 +382,10 @@ def snipe_fallback(username, times, config):
     drop_times = []
     for time_str in times:
         try:
-            # Parse NameMC format: "9/30/2025 • 11∶46∶32 PM"
-            if '•' not in time_str or '∶' not in time_str:
-                console.print(f"[red]❌ Invalid NameMC format: '{time_str}'[/red]")
-                console.print("[yellow]Use format: M/D/YYYY • H∶MM∶SS AM/PM[/yellow]")
-                return
-            
-            # Clean the format: replace NameMC special characters
-            import time as time_module
+            # Parse NameMC format: "9/30/2025 • 11∶46∶32 PM" (local time, converted to UTC)
             from datetime import timedelta
             
-            clean_window = time_str.replace('•', '').replace('∶', ':').strip()
-            parsed_time = datetime.strptime(clean_window, '%m/%d/%Y %I:%M:%S %p')
-            
-            # NameMC displays times in the user's local timezone, convert to UTC
-            # Get the user's local timezone offset
-            local_offset_seconds = -time_module.timezone if time_module.daylight == 0 else -time_module.altzone
-            local_offset = timedelta(seconds=local_offset_seconds)
-            local_tz = timezone(local_offset)
-            
-            # Set as local time, then convert to UTC
-            parsed_time = parsed_time.replace(tzinfo=local_tz)
-            parsed_time = parsed_time.astimezone(timezone.utc)
+            parsed_time = parse_namemc_time(time_str)
             
             # Allow 60 second grace period for clock drift
             now = datetime.now(timezone.utc)
@@ -414,9 +415,9 @@ def snipe_fallback(username, times, config):
     async def run_fallback_snipe():
         console.print(f"[cyan]Starting fallback sniper for username: {username}[/cyan]")
         
-        # Create and run sniper
-        sniper = UsernameSniper(app_config)
-        result = await sniper.snipe_with_fallback(drop_times, username)
+        # Create and run sniper - sessions stay open and warm across every window
+        async with UsernameSniper(app_config) as sniper:
+            result = await sniper.snipe_with_fallback(drop_times, username)
         
         # Display results
         if result.success:
@@ -429,13 +430,243 @@ def snipe_fallback(username, times, config):
                 f"FAILED to claim '{username}' after {len(drop_times)} drop windows.\nError: {result.error_message or 'All windows failed'}",
                 style="bold red"
             ))
+        
+        if result.windows:
+            table = Table(title="Drop Windows")
+            table.add_column("Burst", style="cyan")
+            table.add_column("Drop Time(s)")
+            table.add_column("Setup", justify="right")
+            table.add_column("Attempts", justify="right")
+            table.add_column("Outcome")
+            for window in result.windows:
+                table.add_row(
+                    str(window['burst']),
+                    window['drop_times'],
+                    f"{window['setup_ms']:.0f}ms",
+                    str(window['attempts']),
+                    window['outcome'] or "-"
+                )
+            console.print(table)
+    
+    run_async(run_fallback_snipe(), app_config)
+
+@cli.command()
+@click.option('--target', '-t', 'targets', required=True, multiple=True, help='"Username|M/D/YYYY • H∶MM∶SS AM/PM" with an optional "|priority" (higher wins overlaps); repeatable')
+@click.option('--config', '-c', default='config.yaml', help='Configuration file path')
+def snipe_many(targets, config):
+    """Snipe several usernames from one process with shared connections and tokens"""
+    config_manager = ConfigManager(config)
+    try:
+        app_config = config_manager.load_config()
+    except Exception as e:
+        console.print(f"[red]❌ Failed to load config: {e}[/red]")
+        return
+    
+    jobs = []
+    for target in targets:
+        parts = [part.strip() for part in target.split('|')]
+        try:
+            if len(parts) not in (2, 3):
+                raise ValueError("expected Username|drop time[|priority]")
+            jobs.append((parts[0], parse_namemc_time(parts[1]), int(parts[2]) if len(parts) == 3 else 0))
+        except ValueError as e:
+            console.print(f"[red]❌ Invalid target '{target}': {e}[/red]")
+            console.print("[yellow]Example: -t \"Notch|12/25/2024 • 3∶30∶00 PM|1\"[/yellow]")
+            return
+    
+    table = Table(title="Targets")
+    table.add_column("Username", style="cyan")
+    table.add_column("Drop Time (UTC)")
+    table.add_column("Priority", justify="right")
+    for username, drop_time, priority in sorted(jobs, key=lambda job: job[1]):
+        table.add_row(username, drop_time.strftime('%Y-%m-%d %H:%M:%S'), str(priority))
+    console.print(table)
+    
+    async def run_schedule():
+        from scheduler import MultiTargetScheduler
+        
+        scheduler = MultiTargetScheduler(app_config)
+        for username, drop_time, priority in jobs:
+            scheduler.add(username, drop_time, priority)
+        results = await scheduler.run()
+        
+        for result in results:
+            style = "green" if result.success else "red"
+            console.print(
+                f"[{style}]{result.username}: {result.outcome or 'failed'} after {result.attempts} attempts "
+                f"({result.total_time:.2f}s)[/{style}]" + (f" - {result.error_message}" if result.error_message and not result.success else "")
+            )
+    
+    run_async(run_schedule(), app_config)
+
+@cli.command()
+@click.option('--config', '-c', default='config.yaml', help='Configuration file path')
+@click.option('--port', '-p', type=int, default=None, help='Control API port (overrides daemon.port)')
+def daemon(config, port):
+    """Run the long-lived sniper daemon (control it with sniperctl.py)"""
+    config_manager = ConfigManager(config)
+    try:
+        app_config = config_manager.load_config()
+    except Exception as e:
+        console.print(f"[red]❌ Failed to load config: {e}[/red]")
+        return
+    if port:
+        app_config.daemon.port = port
+    if not is_loopback(app_config.daemon.host):
+        console.print(f"[red]❌ daemon.host {app_config.daemon.host} is not loopback - the control API has no authentication "
+                      f"(reach it through an SSH tunnel instead)[/red]")
+        return
+    
+    setup_logging(
+        log_level=app_config.log_level,
+        log_file=f"logs/daemon_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log",
+        debug_mode=app_config.debug_mode
+    )
+    console.print(Panel.fit(
+        f"🛰️ Sniper daemon on http://{app_config.daemon.host}:{app_config.daemon.port}\n"
+        f"Jobs: {app_config.daemon.db_path} - add them with: python sniperctl.py add <username> \"<drop time>\"",
+        style="bold cyan"
+    ))
     
-    asyncio.run(run_fallback_snipe())
+    from daemon import SniperDaemon
+    run_async(SniperDaemon(app_config).run(), app_config)
+
+@cli.command()
+@click.option('--username', '-u', required=True, help='Username to snipe')
+@click.option('--drop-window', '-w', required=True, help='Drop time in NameMC format "M/D/YYYY • H∶MM∶SS AM/PM"')
+@click.option('--agents', '-n', type=int, required=True, help='Number of agents to wait for')
+@click.option('--config', '-c', default='config.yaml', help='Configuration file path')
+def coordinate(username, drop_window, agents, config):
+    """Coordinate a snipe across several agent machines (tokens come from this config)"""
+    app_config = ConfigManager(config).load_config()
+    try:
+        drop_time = parse_namemc_time(drop_window)
+    except ValueError as e:
+        console.print(f"[red]❌ {e}[/red]")
+        return
+    
+    from cluster import exposure_problem
+    problem = exposure_problem(app_config.cluster)
+    if problem:
+        console.print(f"[red]❌ {problem}[/red]")
+        return
+    
+    async def run_cluster():
+        from cluster import ClusterCoordinator
+        
+        result = await ClusterCoordinator(app_config, agents).run(drop_time, username)
+        style = "bold green" if result.success else "bold red"
+        console.print(Panel.fit(
+            f"{'SUCCESS' if result.success else 'FAILED'}: {username} - {result.attempts} attempts across the cluster"
+            + (f"\nError: {result.error_message}" if result.error_message else ""),
+            style=style
+        ))
+        if result.cluster_nodes:
+            table = Table(title="Nodes")
+            for column in ("Node", "Tokens", "Attempts", "Clock Offset", "RTT", "Self-Sync Δ", "Outcome"):
+                table.add_column(column)
+            for node in result.cluster_nodes:
+                table.add_row(
+                    node['node'],
+                    str(node['tokens']),
+                    str(node['attempts']),
+                    f"{node['clock_offset_ms']:+.2f}ms",
+                    f"{node['rtt_ms']:.2f}ms",
+                    f"{node['clock_disagreement_ms']:+.1f}ms" if node['clock_disagreement_ms'] is not None else "-",
+                    node['outcome'] or "-"
+                )
+            console.print(table)
+    
+    run_async(run_cluster(), app_config)
+
+@cli.command()
+@click.option('--coordinator', '-u', 'coordinator_url', required=True, help='Coordinator URL, e.g. wss://10.0.0.1:8790 or http://127.0.0.1:8790 through an SSH tunnel')
+@click.option('--name', '-n', default=None, help='Node name shown by the coordinator (default: hostname)')
+@click.option('--config', '-c', default='config.yaml', help='Configuration file path (tokens are sent by the coordinator)')
+def agent(coordinator_url, name, config):
+    """Join a coordinated snipe and fire this node's share of it"""
+    import socket as socket_module
+    
+    app_config = ConfigManager(config).load_config()
+    
+    async def run_agent():
+        from cluster import ClusterAgent
+        
+        result = await ClusterAgent(app_config, coordinator_url, name or socket_module.gethostname()).run()
+        if result is None:
+            console.print("[yellow]Coordinator ended the session without an assignment[/yellow]")
+        else:
+            console.print(f"[cyan]{result.username}: {result.outcome} after {result.attempts} attempts ({result.total_time:.2f}s)[/cyan]")
+    
+    run_async(run_agent(), app_config)
+
+@cli.command()
+@click.argument('telemetry_files', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--json', 'json_path', help='Write the full report as JSON')
+@click.option('--csv', 'csv_prefix', help='Write <prefix>.latency.csv and <prefix>.timeline.csv')
+@click.option('--bin', 'bin_seconds', default=1.0, show_default=True, help='Timeline bin width in seconds')
+@click.option('--top', default=10, show_default=True, help='Slowest connections to list per burst')
+def report(telemetry_files, json_path, csv_prefix, bin_seconds, top):
+    """Analyse attempt telemetry (snipe.telemetry_path; pass every shard file of a run)"""
+    from report import build_report, export_csv, export_json, print_report
+    
+    try:
+        analysis = build_report(list(telemetry_files), bin_seconds)
+    except (RuntimeError, ValueError, OSError) as e:
+        console.print(f"[red]❌ {e}[/red]")
+        return
+    
+    print_report(analysis, console, top)
+    if json_path:
+        export_json(analysis, json_path)
+        console.print(f"[green]💾 Report written to {json_path}[/green]")
+    if csv_prefix:
+        for path in export_csv(analysis, csv_prefix):
+            console.print(f"[green]💾 {path}[/green]")
+
+@cli.command()
+@click.option('--config', '-c', default='config.yaml', help='Configuration file path')
+@click.option('--username', '-u', default=None, help='Only runs against this target')
+@click.option('--days', type=float, default=None, help='Only runs from the last N days')
+@click.option('--limit', '-n', default=20, show_default=True, help='Most recent runs to show')
+@click.option('--compare', nargs=2, type=int, default=None, help='Compare two runs by id (metrics, environment and config changes)')
+def history(config, username, days, limit, compare):
+    """Show recorded runs and flag regressions against the rolling baseline"""
+    from history import HistoryStore, regressions_by_run, print_history, print_comparison
+    
+    config_manager = ConfigManager(config)
+    settings = config_manager.load_config().history
+    if not Path(settings.db_path).exists():
+        hint = "is created after the first burst" if settings.enabled else "is only written with history.enabled: true"
+        console.print(f"[yellow]No run history yet ({settings.db_path} {hint})[/yellow]")
+        return
+    
+    store = HistoryStore(settings.db_path)
+    try:
+        if compare:
+            runs = [store.get(run_id) for run_id in compare]
+            missing = [str(run_id) for run_id, run in zip(compare, runs) if run is None]
+            if missing:
+                console.print(f"[red]❌ No run with id {', '.join(missing)}[/red]")
+                return
+            print_comparison(runs[0], runs[1], console)
+            return
+        
+        since = time.time() - days * 86400 if days else None
+        runs = store.runs(username=username, since=since, limit=limit)
+        if not runs:
+            console.print("[yellow]No runs match[/yellow]")
+            return
+        print_history(runs, regressions_by_run(store, runs, settings), console, settings.baseline_runs)
+    finally:
+        store.close()
 
 @cli.command()
 @click.option('--config', '-c', default='config.yaml', help='Configuration file path')
 def test_token(config):
-    """Test if your bearer token is valid"""
+    """Test if your bearer tokens are valid and when they expire"""
+    from token_health import token_expiry, describe_expiry
+    
     config_manager = ConfigManager(config)
     app_config = config_manager.load_config()
     
@@ -446,33 +677,38 @@ def test_token(config):
     async def test_bearer_token():
         import aiohttp
         
-        # Test token by getting current profile
+        # Test every token by getting its current profile
         url = "https://api.minecraftservices.com/minecraft/profile"
-        headers = {
-            'Authorization': f'Bearer {app_config.snipe.bearer_token}',
-            'User-Agent': 'MinecraftSniper/1.0'
-        }
-        
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        profile_data = await response.json()
-                        current_name = profile_data.get('name', 'Unknown')
-                        console.print(f"[green]✅ Bearer token is valid![/green]")
-                        console.print(f"[cyan]Current username: {current_name}[/cyan]")
-                        console.print(f"[cyan]Account UUID: {profile_data.get('id', 'Unknown')}[/cyan]")
-                    elif response.status == 401:
-                        console.print(f"[red]❌ Bearer token is invalid or expired[/red]")
-                        console.print(f"[yellow]Please get a new token from minecraft.net[/yellow]")
-                    else:
-                        response_text = await response.text()
-                        console.print(f"[red]❌ Unexpected response: {response.status}[/red]")
-                        console.print(f"[yellow]Response: {response_text}[/yellow]")
-        except Exception as e:
-            console.print(f"[red]❌ Error testing token: {e}[/red]")
+        async with aiohttp.ClientSession() as session:
+            for i, token in enumerate(app_config.snipe.bearer_tokens, 1):
+                expires_at = token_expiry(token)
+                expiry = describe_expiry(expires_at)
+                expiry_color = "green" if expires_at is not None and expires_at > time.time() + 3600 else "yellow"
+                console.print(f"\n[bold]Token #{i} (...{token[-8:]})[/bold] [{expiry_color}]{expiry}[/{expiry_color}]")
+                headers = {
+                    'Authorization': f'Bearer {token}',
+                    'User-Agent': 'MinecraftSniper/1.0'
+                }
+                
+                try:
+                    async with session.get(url, headers=headers) as response:
+                        if response.status == 200:
+                            profile_data = await response.json()
+                            current_name = profile_data.get('name', 'Unknown')
+                            console.print(f"[green]✅ Bearer token is valid![/green]")
+                            console.print(f"[cyan]Current username: {current_name}[/cyan]")
+                            console.print(f"[cyan]Account UUID: {profile_data.get('id', 'Unknown')}[/cyan]")
+                        elif response.status == 401:
+                            console.print(f"[red]❌ Bearer token is invalid or expired[/red]")
+                            console.print(f"[yellow]Please get a new token from minecraft.net[/yellow]")
+                        else:
+                            response_text = await response.text()
+                            console.print(f"[red]❌ Unexpected response: {response.status}[/red]")
+                            console.print(f"[yellow]Response: {response_text}[/yellow]")
+                except Exception as e:
+                    console.print(f"[red]❌ Error testing token: {e}[/red]")
     
-    asyncio.run(test_bearer_token())
+    run_async(test_bearer_token(), app_config)
 
 @cli.command()
 def version():
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Benchmark harness for NameMC Sniper - measures the sniper against the local mock API
+"""
+
+import gc
+import os
+import resource
+import time
+import logging
+import tempfile
+import socket
+import tracemalloc
+import statistics
+import asyncio
+import argparse
+import multiprocessing
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+
+import aiohttp
+
+from config import AppConfig, SnipeConfig
+import mock_api
+
+BENCH_USERNAME = "BenchName"
+
+def _serve_mock(port: int, latency_ms: float):
+    """Run one mock API process (several can share the port via SO_REUSEPORT)"""
+    async def serve():
+        await mock_api.start_mock_server(port=port, reuse_port=True, latency_ms=latency_ms)
+        await asyncio.Event().wait()
+    asyncio.run(serve())
+
+@contextmanager
+def mock_servers(port: int, processes: int = 1, latency_ms: float = 0.0):
+    """Start mock API processes on a loopback port for the duration of a benchmark"""
+    ctx = multiprocessing.get_context('spawn')
+    servers = [ctx.Process(target=_serve_mock, args=(port, latency_ms), daemon=True) for _ in range(processes)]
+    for server in servers:
+        server.start()
+    
+    # Wait until the port accepts connections
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        for server in servers:
+            server.terminate()
+            server.join()
+
+def bench_config(base_url: str, tokens: int = 8, workers: int = 64, duration: float = 3.0) -> AppConfig:
+    """Configuration that fires as fast as possible at the mock API"""
+    return AppConfig(
+        snipe=SnipeConfig(
+            bearer_tokens=[f"bench{i:02d}" + "x" * 60 for i in range(tokens)],
+            concurrent_requests=workers,
+            request_delay_ms=0,
+            max_snipe_attempts=10 ** 9,
+            burst_duration_seconds=duration,
+            adaptive_delays=False,
+            api_base_url=base_url,
+            profile_api_base_url=base_url
+        ),
+        log_level="WARNING"
+    )
+
+def bench_shards(args):
+    """Claim throughput with 1..N shard processes"""
+    from sharding import ShardedSniper, SHARD_STARTUP_SECONDS
+    
+    print(f"🧩 Shard scaling: {args.workers} workers, {args.tokens} tokens, {args.duration}s bursts")
+    with mock_servers(args.port, processes=args.mock_processes, latency_ms=args.latency_ms) as base_url:
+        baseline = None
+        for shards in range(1, args.max_shards + 1):
+            config = bench_config(base_url, args.tokens, args.workers, args.duration)
+            sniper = ShardedSniper(config, shards=shards, pin_cores=args.pin)
+            result = asyncio.run(sniper.run(BENCH_USERNAME, launch_in=SHARD_STARTUP_SECONDS))
+            throughput = result.attempts / result.total_time if result.total_time else 0.0
+            baseline = baseline or throughput
+            speedup = throughput / baseline if baseline else 0.0
+            print(f"  {sniper.shards} shard(s): {result.attempts:>7} attempts  {throughput:>9.0f} req/s  x{speedup:.2f}")
+
+async def _timer_jitter(samples: int = 2000, interval: float = 0.001) -> list:
+    """Overshoot of asyncio.sleep() wake-ups in milliseconds"""
+    jitter = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        jitter.append((time.perf_counter() - start - interval) * 1000)
+    return jitter
+
+async def _claim_throughput(config: AppConfig) -> float:
+    """Claims per second sustained by one UsernameSniper burst"""
+    from sniper import UsernameSniper
+    
+    sniper = UsernameSniper(config)
+    await sniper._open_session()
+    try:
+        result = await sniper._start_sniping(BENCH_USERNAME)
+    finally:
+        await sniper.session.close()
+    return result.attempts / result.total_time if result.total_time else 0.0
+
+def bench_loop(args):
+    """Claim throughput and timer wake-up jitter on each available event loop"""
+    from event_loop import install_event_loop
+    
+    loops = ["asyncio"]
+    if install_event_loop("auto") == "uvloop":
+        loops.append("uvloop")
+    else:
+        print("  ⚠️ uvloop not installed - only measuring the default loop")
+    
+    print(f"⚙️ Event loops: {args.workers} workers, {args.tokens} tokens, {args.duration}s bursts")
+    with mock_servers(args.port, processes=args.mock_processes, latency_ms=args.latency_ms) as base_url:
+        for loop_name in loops:
+            install_event_loop(loop_name)
+            config = bench_config(base_url, args.tokens, args.workers, args.duration)
+            throughput = asyncio.run(_claim_throughput(config))
+            jitter = sorted(asyncio.run(_timer_jitter()))
+            p50 = statistics.median(jitter)
+            p99 = jitter[int(len(jitter) * 0.99) - 1]
+            print(f"  {loop_name:<8} {throughput:>9.0f} req/s   timer jitter p50 {p50:.3f}ms  p99 {p99:.3f}ms  max {jitter[-1]:.3f}ms")
+    install_event_loop("asyncio")
+
+async def _burst_allocations(config: AppConfig, critical: bool) -> dict:
+    """Allocations traced and GC collections seen during one burst"""
+    from sniper import UsernameSniper
+    
+    collections = 0
+    def count_collections(phase, info):
+        nonlocal collections
+        if phase == "start":
+            collections += 1
+    
+    sniper = UsernameSniper(config)
+    await sniper._open_session()
+    sniper._prepare_claims(BENCH_USERNAME)
+    if critical:
+        sniper.memory_window.enter()
+    gc.callbacks.append(count_collections)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    try:
+        result = await sniper._start_sniping(BENCH_USERNAME)
+    finally:
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        gc.callbacks.remove(count_collections)
+        sniper.memory_window.exit()
+        await sniper.session.close()
+    
+    diff = after.compare_to(before, 'filename')
+    return {
+        'attempts': result.attempts,
+        'blocks': sum(stat.count_diff for stat in diff),
+        'kib': sum(stat.size_diff for stat in diff) / 1024,
+        'peak_kib': peak / 1024,
+        'collections': collections
+    }
+
+def bench_memory(args):
+    """Allocations and GC collections during a burst with and without the critical memory window"""
+    print(f"🧊 Burst allocations: {args.workers} workers, {args.tokens} tokens, {args.duration}s bursts (tracemalloc on)")
+    with mock_servers(args.port, processes=args.mock_processes, latency_ms=args.latency_ms) as base_url:
+        for critical in (False, True):
+            config = bench_config(base_url, args.tokens, args.workers, args.duration)
+            stats = asyncio.run(_burst_allocations(config, critical))
+            per_attempt = stats['blocks'] / stats['attempts'] if stats['attempts'] else 0.0
+            label = "gc frozen" if critical else "gc normal"
+            print(
+                f"  {label:<10} {stats['attempts']:>7} attempts  net {stats['blocks']:>+8} blocks "
+                f"({per_attempt:+.2f}/attempt, {stats['kib']:+.0f} KiB)  peak {stats['peak_kib']:.0f} KiB  "
+                f"{stats['collections']} GC collections"
+            )
+
+def _per_attempt_logging(log_file: str, use_queue: bool, records: int) -> tuple:
+    """Calling-thread cost of one per-attempt log line, and time to drain the queue afterwards"""
+    from logger import setup_logging, stop_logging
+    
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        setup_logging(log_level="INFO", log_file=log_file, use_queue=use_queue)
+        log = logging.getLogger("sniper")
+        start = time.perf_counter()
+        for i in range(records):
+            log.info(f"Claim attempt (direct) - Status: {403 if i % 10 else 429}")
+        elapsed = time.perf_counter() - start
+        drain_start = time.perf_counter()
+        stop_logging()
+        drain = time.perf_counter() - drain_start
+        logging.getLogger().handlers.clear()
+    return elapsed / records * 1e6, drain
+
+def bench_logging(args):
+    """Per-attempt logging overhead: synchronous handlers vs queue pipeline vs aggregation"""
+    from logger import AttemptLogAggregator
+    
+    print(f"📝 Per-attempt logging: {args.records} records to console (devnull) and a log file")
+    with tempfile.TemporaryDirectory() as tmp:
+        log_file = os.path.join(tmp, "bench.log")
+        for label, use_queue in (("sync", False), ("queue", True)):
+            per_call, drain = _per_attempt_logging(log_file, use_queue, args.records)
+            print(f"  {label:<10} {per_call:>7.2f}µs per attempt on the event loop thread  (drain {drain * 1000:.0f}ms)")
+    
+    aggregator = AttemptLogAggregator(logging.getLogger("sniper"))
+    start = time.perf_counter()
+    for i in range(args.records):
+        aggregator.record(i % args.workers, 403 if i % 10 else 429)
+    per_call = (time.perf_counter() - start) / args.records * 1e6
+    print(f"  {'aggregated':<10} {per_call:>7.2f}µs per attempt (one summary line per second)")
+
+def bench_telemetry(args):
+    """Cost of writing one attempt record into the memory-mapped ring buffer"""
+    from telemetry import TelemetryWriter, AttemptTrace
+    
+    print(f"📼 Attempt telemetry: {args.records} records into a {args.capacity}-slot ring buffer")
+    with tempfile.TemporaryDirectory() as tmp:
+        writer = TelemetryWriter(os.path.join(tmp, "bench.bin"), args.capacity)
+        trace = AttemptTrace()
+        trace.sent = trace.first_byte = time.perf_counter()
+        
+        start = time.perf_counter()
+        for i in range(args.records):
+            writer.record(start, trace, start, 403 if i % 10 else 429, i % args.tokens, i % args.workers)
+        per_call = (time.perf_counter() - start) / args.records * 1e6
+        
+        tracemalloc.start()
+        before, _ = tracemalloc.get_traced_memory()
+        for i in range(args.records):
+            writer.record(start, trace, start, 403, i % args.tokens, i % args.workers)
+        after, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        writer.close()
+        print(f"  {per_call:.2f}µs per record, {max(0, after - before)} bytes retained after {args.records} records")
+        
+        with mock_servers(args.port, processes=args.mock_processes, latency_ms=args.latency_ms) as base_url:
+            for label, path in (("off", ""), ("on", os.path.join(tmp, "burst.bin"))):
+                config = bench_config(base_url, args.tokens, args.workers, args.duration)
+                config.snipe.telemetry_path = path
+                config.snipe.telemetry_capacity = args.capacity
+                stats = asyncio.run(_burst_cpu(config))
+                print(
+                    f"  burst with telemetry {label:<3}: {stats['attempts'] / stats['seconds']:>8.0f} req/s, "
+                    f"{stats['cpu'] / stats['attempts'] * 1e6:.1f}µs CPU per attempt"
+                )
+
+def bench_metrics(args):
+    """Cost of counting one attempt in the Prometheus counters, and of a scrape"""
+    from metrics import AttemptMetrics
+    
+    print(f"📈 Metrics: {args.records} attempts into preallocated counters and histograms")
+    metrics = AttemptMetrics()
+    start = time.perf_counter()
+    for i in range(args.records):
+        metrics.observe(403 if i % 10 else 429, (i % 50) / 1000)
+    per_call = (time.perf_counter() - start) / args.records * 1e6
+    
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for i in range(args.records):
+        metrics.observe(403 if i % 10 else 429, (i % 50) / 1000)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {per_call:.2f}µs per attempt, {max(0, after - before)} bytes retained after {args.records} attempts")
+    
+    with mock_servers(args.port, processes=args.mock_processes, latency_ms=args.latency_ms) as base_url:
+        for enabled in (False, True):
+            config = bench_config(base_url, args.tokens, args.workers, args.duration)
+            config.metrics.enabled = enabled
+            config.metrics.port = args.metrics_port
+            stats = asyncio.run(_burst_cpu(config, scrape_url=f"http://127.0.0.1:{args.metrics_port}/metrics" if enabled else None))
+            line = (
+                f"  burst with metrics {'on' if enabled else 'off':<3}: {stats['attempts'] / stats['seconds']:>8.0f} req/s, "
+                f"{stats['cpu'] / stats['attempts'] * 1e6:.1f}µs CPU per attempt"
+            )
+            if enabled:
+                line += f", scrape {stats['scrape_ms']:.2f}ms"
+            print(line)
+
+async def _burst_cpu(config: AppConfig, scrape_url: Optional[str] = None) -> dict:
+    """Throughput and CPU time of one burst against the mock"""
+    from sniper import UsernameSniper
+    
+    sniper = UsernameSniper(config)
+    async with sniper:
+        cpu_start = time.process_time()
+        result = await sniper._start_sniping(BENCH_USERNAME)
+        stats = {'attempts': result.attempts, 'seconds': result.total_time, 'cpu': time.process_time() - cpu_start}
+        if scrape_url:
+            async with aiohttp.ClientSession() as session:
+                started = time.perf_counter()
+                async with session.get(scrape_url) as response:
+                    await response.read()
+                stats['scrape_ms'] = (time.perf_counter() - started) * 1000
+        return stats
+
+def _separate_process_cost(config: AppConfig, results):
+    """Peak RSS of a process that runs one sniper on its own (the per-target cost without scheduling)"""
+    from sniper import UsernameSniper
+    
+    async def open_sniper():
+        async with UsernameSniper(config):
+            pass
+    asyncio.run(open_sniper())
+    results.put(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+async def _scheduled_targets(config: AppConfig, count: int, spacing: float) -> dict:
+    """CPU time and setup cost of running `count` non-overlapping targets through one scheduler"""
+    from scheduler import MultiTargetScheduler
+    
+    scheduler = MultiTargetScheduler(config)
+    scheduler.sniper.time_sync.last_sync = datetime.now(timezone.utc)
+    first_drop = datetime.now(timezone.utc) + timedelta(seconds=1)
+    for i in range(count):
+        scheduler.add(f"{BENCH_USERNAME}{i}", first_drop + timedelta(seconds=i * spacing))
+    
+    cpu_start = time.process_time()
+    results = await scheduler.run()
+    return {
+        'cpu': time.process_time() - cpu_start,
+        'attempts': sum(result.attempts for result in results),
+        'setup_ms': statistics.mean((result.setup_seconds or 0) * 1000 for result in results)
+    }
+
+def bench_targets(args):
+    """Memory and CPU for each additional target served by one scheduler"""
+    from scheduler import MultiTargetScheduler, plan_slots
+    
+    print(f"🎯 Multi-target scheduling: up to {args.targets} targets, {args.duration}s bursts")
+    with mock_servers(args.port, processes=args.mock_processes, latency_ms=args.latency_ms) as base_url:
+        config = bench_config(base_url, args.tokens, args.workers, args.duration)
+        ctx = multiprocessing.get_context('spawn')
+        results = ctx.Queue()
+        process = ctx.Process(target=_separate_process_cost, args=(config, results))
+        process.start()
+        print(f"  one process per target: {results.get() / 1024:.1f} MiB peak RSS each")
+        process.join()
+        
+        spacing = args.duration + 0.2
+        counts = sorted({1, max(1, args.targets // 2), args.targets})
+        for count in counts:
+            stats = asyncio.run(_scheduled_targets(bench_config(base_url, args.tokens, args.workers, args.duration), count, spacing))
+            per_attempt = stats['cpu'] / stats['attempts'] * 1e6 if stats['attempts'] else 0.0
+            print(
+                f"  {count:>3} target(s) in one scheduler: {stats['cpu']:.2f}s CPU, {stats['attempts']} attempts "
+                f"({per_attempt:.0f}µs CPU/attempt), {stats['setup_ms']:.1f}ms setup per window"
+            )
+    
+    # Bookkeeping for targets that are only queued
+    queued = 1000
+    tracemalloc.start()
+    scheduler = MultiTargetScheduler(config)
+    before, _ = tracemalloc.get_traced_memory()
+    now = datetime.now(timezone.utc)
+    for i in range(queued):
+        scheduler.add(f"{BENCH_USERNAME}{i}", now + timedelta(seconds=i * 7), priority=i % 3)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    slots = plan_slots(scheduler.pending(), now)
+    planning = time.perf_counter() - start
+    print(
+        f"  queued target: {(after - before) / queued:.0f} bytes each; planning {queued} targets "
+        f"({len(slots)} slots) took {planning * 1000:.1f}ms"
+    )
+
+def _agent_main(config: AppConfig, url: str, name: str):
+    """Entry point of one local cluster agent process"""
+    from cluster import ClusterAgent
+    
+    with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+        asyncio.run(ClusterAgent(config, url, name).run())
+
+def bench_cluster(args):
+    """Coordinated snipe with local agent processes, with and without interleaved time slots"""
+    from cluster import ClusterCoordinator
+    
+    print(f"🛰️ Cluster: {args.agents} local agents, {args.tokens} tokens, {args.duration}s bursts")
+    with mock_servers(args.port, processes=args.mock_processes, latency_ms=args.latency_ms) as base_url:
+        for slot_ms in (0.0, args.slot_ms):
+            config = bench_config(base_url, args.tokens, args.workers, args.duration)
+            config.cluster.port = args.cluster_port
+            config.cluster.slot_ms = slot_ms
+            ctx = multiprocessing.get_context('spawn')
+            agents = [
+                ctx.Process(target=_agent_main, args=(config, f"http://127.0.0.1:{args.cluster_port}", f"agent{i + 1}"), daemon=True)
+                for i in range(args.agents)
+            ]
+            for agent in agents:
+                agent.start()
+            
+            drop_time = datetime.now(timezone.utc) + timedelta(seconds=args.lead)
+            with open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+                result = asyncio.run(ClusterCoordinator(config, args.agents).run(drop_time, BENCH_USERNAME))
+            for agent in agents:
+                agent.join(timeout=5)
+            
+            label = f"{slot_ms:g}ms slots" if slot_ms else "no slots"
+            print(f"  {label:<10} {result.attempts:>7} attempts ({result.attempts / args.duration:.0f}/s) - {result.outcome}")
+            for node in result.cluster_nodes or []:
+                print(
+                    f"    {node['node']:<8} {node['tokens']} token(s) {node['attempts']:>7} attempts  "
+                    f"clock {node['clock_offset_ms']:+.3f}ms (rtt {node['rtt_ms']:.2f}ms)"
+                )
+
+def main():
+    parser = argparse.ArgumentParser(description="NameMC Sniper benchmarks against the local mock API")
+    parser.add_argument('--port', type=int, default=8095, help='Loopback port for the mock API')
+    parser.add_argument('--mock-processes', type=int, default=2, help='Mock API processes sharing the port')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Artificial mock latency per claim')
+    parser.add_argument('--workers', type=int, default=64)
+    parser.add_argument('--tokens', type=int, default=8)
+    parser.add_argument('--duration', type=float, default=3.0, help='Burst length in seconds')
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+    
+    shards = subparsers.add_parser('shards', help='Claim throughput from 1 to N shard processes')
+    shards.add_argument('--max-shards', type=int, default=multiprocessing.cpu_count())
+    shards.add_argument('--pin', action='store_true', help='Pin shards to CPU cores')
+    shards.set_defaults(func=bench_shards)
+    
+    loop = subparsers.add_parser('loop', help='Claim throughput and timer jitter on asyncio vs uvloop')
+    loop.set_defaults(func=bench_loop)
+    
+    memory = subparsers.add_parser('memory', help='Burst allocations (tracemalloc) and GC collections with and without GC freeze')
+    memory.set_defaults(func=bench_memory)
+    
+    log_bench = subparsers.add_parser('logging', help='Per-attempt logging overhead before and after the queue pipeline')
+    log_bench.add_argument('--records', type=int, default=20000)
+    log_bench.set_defaults(func=bench_logging)
+    
+    telemetry = subparsers.add_parser('telemetry', help='Write cost per attempt record in the mmap telemetry ring buffer')
+    telemetry.add_argument('--records', type=int, default=200000)
+    telemetry.add_argument('--capacity', type=int, default=65536)
+    telemetry.set_defaults(func=bench_telemetry)
+    
+    metrics = subparsers.add_parser('metrics', help='Per-attempt cost of the Prometheus counters and one scrape')
+    metrics.add_argument('--records', type=int, default=200000)
+    metrics.add_argument('--metrics-port', type=int, default=9464)
+    metrics.set_defaults(func=bench_metrics)
+    
+    targets = subparsers.add_parser('targets', help='Memory and CPU per additional target in the multi-target scheduler')
+    targets.add_argument('--targets', type=int, default=4, help='Largest number of targets to schedule')
+    targets.set_defaults(func=bench_targets)
+    
+    cluster = subparsers.add_parser('cluster', help='Coordinator with local agent processes against the mock API')
+    cluster.add_argument('--agents', type=int, default=3)
+    cluster.add_argument('--slot-ms', type=float, default=10.0)
+    cluster.add_argument('--cluster-port', type=int, default=8790)
+    cluster.add_argument('--lead', type=float, default=6.0, help='Seconds from start until the drop')
+    cluster.set_defaults(func=bench_cluster)
+    
+    args = parser.parse_args()
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
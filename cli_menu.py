@@ -21,6 +21,7 @@ from sniper import UsernameSniper
 from proxy_manager import ProxyManager
 from discord_notifier import DiscordNotifier
 from logger import setup_logging
+from event_loop import configured_loop, install_event_loop
 
 console = Console()
 
@@ -922,6 +923,8 @@ def main():
     """Main entry point"""
     try:
         cli = NameMCSniperCLI()
+        loop_name = install_event_loop(configured_loop(str(cli.config_manager.config_path)))
+        console.print(f"[dim]Event loop: {loop_name}[/dim]")
         asyncio.run(cli.run())
     except KeyboardInterrupt:
         pass
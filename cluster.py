@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""
+Multi-node coordinated sniping
+
+A coordinator (python Main.py coordinate) waits for agents running on other
+machines (python Main.py agent) to connect over a WebSocket. It measures
+each agent's clock against its own and cross-checks that against the
+agent's own time sync. It then hands every node a token subset, a matching
+share of workers and attempt budget, and an interleaved time-slot schedule
+expressed in that node's clock. Nodes only fire inside their own slots, so
+the cluster produces one continuous stream of attempts instead of N copies
+firing at the same instant. When any node sees a definitive outcome, the
+coordinator pushes a stop to every other node. Per-node telemetry is merged
+into one SnipeResult.
+
+Every node can run on one machine against the local mock API for testing
+(see `python benchmark.py cluster`).
+
+The assignment carries bearer tokens, so the coordinator only listens on a
+loopback address (reach it through an SSH tunnel) unless a shared secret and
+a TLS certificate are configured, in which case agents connect over wss://.
+"""
+
+import copy
+import hmac
+import json
+import ssl
+import time
+import asyncio
+import logging
+from urllib.parse import urlsplit
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import List, Optional
+
+import aiohttp
+from aiohttp import web
+
+from config import AppConfig, is_loopback
+from sniper import UsernameSniper, SnipeResult
+from sharding import SHARED_OUTCOMES, split_config, merge_results, _sleep_until_monotonic
+from time_sync import TimeSync
+from history import record_run_async
+
+logger = logging.getLogger(__name__)
+
+def exposure_problem(cluster) -> Optional[str]:
+    """Why the coordinator must not listen on cluster.host, or None if it may"""
+    if is_loopback(cluster.host):
+        return None
+    if not cluster.secret:
+        return f"cluster.host {cluster.host} is not loopback - set cluster.secret (or listen on 127.0.0.1 behind an SSH tunnel)"
+    if not cluster.tls_cert_file:
+        return f"cluster.host {cluster.host} is not loopback - set cluster.tls_cert_file so tokens travel over wss:// (or listen on 127.0.0.1 behind an SSH tunnel)"
+    return None
+
+def server_ssl_context(cluster) -> Optional[ssl.SSLContext]:
+    """TLS context for the coordinator, if a certificate is configured"""
+    if not cluster.tls_cert_file:
+        return None
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    context.load_cert_chain(cluster.tls_cert_file, cluster.tls_key_file or None)
+    return context
+
+def client_ssl_context(cluster) -> ssl.SSLContext:
+    """TLS context agents verify a wss:// coordinator with"""
+    return ssl.create_default_context(cafile=cluster.tls_ca_file or None)
+
+@dataclass
+class TimeSlots:
+    """Round-robin time slots: node `index` of `count` owns every count-th slot from `base` (epoch seconds)"""
+    base: float
+    slot_seconds: float
+    index: int = 0
+    count: int = 1
+    
+    def wait_seconds(self, now: float) -> float:
+        """0 while this node's slot is open, otherwise the time until it opens again"""
+        if self.count <= 1 or now < self.base:
+            return 0.0
+        position = (now - self.base) / self.slot_seconds
+        slot = int(position)
+        ahead = (self.index - slot) % self.count
+        if ahead == 0:
+            return 0.0
+        return (slot + ahead - position) * self.slot_seconds
+
+@dataclass
+class AgentNode:
+    """Coordinator-side view of one connected agent"""
+    name: str
+    ws: web.WebSocketResponse
+    index: int = 0
+    offset: float = 0.0  # Agent clock minus coordinator clock (seconds)
+    rtt_ms: float = 0.0
+    self_sync_offset: Optional[float] = None  # The agent's own TimeSync correction
+    disagreement_ms: Optional[float] = None  # How far the agent's and coordinator's corrected clocks differ
+    tokens: int = 0
+    attempts: int = 0
+    result: Optional[SnipeResult] = None
+    clock_replies: asyncio.Queue = field(default_factory=asyncio.Queue)
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    
+    def telemetry(self) -> dict:
+        return {
+            'node': self.name,
+            'clock_offset_ms': round(self.offset * 1000, 2),
+            'rtt_ms': round(self.rtt_ms, 2),
+            'clock_disagreement_ms': self.disagreement_ms,
+            'tokens': self.tokens,
+            'attempts': self.attempts,
+            'outcome': self.result.outcome if self.result else None,
+            'total_time': round(self.result.total_time, 3) if self.result else None,
+        }
+
+class ClusterCoordinator:
+    """Assign tokens and time slots to agents, relay stops and merge their results"""
+    
+    def __init__(self, config: AppConfig, agents: int):
+        self.config = config
+        self.expected = agents
+        self.time_sync = TimeSync()
+        self.nodes: List[AgentNode] = []
+        self.stop_node: Optional[int] = None
+        self._joined = asyncio.Event()
+        self._assigned = False
+    
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get('/agent', self.agent_socket)
+        return app
+    
+    async def agent_socket(self, request: web.Request) -> web.WebSocketResponse:
+        """One WebSocket per agent: hello, clock probes, assignment, progress, stop and result"""
+        ws = web.WebSocketResponse(heartbeat=10)
+        await ws.prepare(request)
+        try:
+            hello = await ws.receive_json(timeout=10)
+        except (TypeError, ValueError, asyncio.TimeoutError):
+            await ws.close(message=b'expected hello')
+            return ws
+        secret = str(hello.get('secret', '')).encode()
+        if hello.get('type') != 'hello' or not hmac.compare_digest(secret, self.config.cluster.secret.encode()):
+            logger.warning(f"Rejected agent from {request.remote}: bad hello or secret")
+            await ws.close(message=b'unauthorized')
+            return ws
+        if self._assigned or len(self.nodes) >= self.expected:
+            await ws.close(message=b'cluster full')
+            return ws
+        
+        node = AgentNode(name=hello.get('name') or f"node{len(self.nodes) + 1}", ws=ws, self_sync_offset=hello.get('time_offset'))
+        self.nodes.append(node)
+        logger.info(f"🛰️ Agent {node.name} joined from {request.remote} ({len(self.nodes)}/{self.expected})")
+        if len(self.nodes) == self.expected:
+            self._joined.set()
+        
+        try:
+            async for msg in ws:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    await self._handle(node, json.loads(msg.data))
+        finally:
+            node.done.set()
+        return ws
+    
+    async def _handle(self, node: AgentNode, data: dict):
+        kind = data.get('type')
+        if kind == 'clock':
+            node.clock_replies.put_nowait((data['t0'], data['agent_time'], time.time()))
+        elif kind == 'progress':
+            node.attempts = data['attempts']
+        elif kind == 'stop':
+            await self._broadcast_stop(node, data['outcome'])
+        elif kind == 'result':
+            node.result = SnipeResult(**data['result'])
+            node.attempts = node.result.attempts
+            node.done.set()
+    
+    async def _broadcast_stop(self, origin: AgentNode, outcome: str):
+        """Push a stop to every other node the first time any node reports a definitive outcome"""
+        if self.stop_node is not None:
+            return
+        self.stop_node = origin.index
+        logger.info(f"🛑 {origin.name} reported {outcome} - stopping every node")
+        for node in self.nodes:
+            if node is not origin and not node.ws.closed:
+                await node.ws.send_json({'type': 'stop', 'outcome': outcome, 'node': origin.name})
+    
+    async def _measure_clock(self, node: AgentNode):
+        """Estimate the agent's clock offset from the lowest-RTT probe (NTP-style midpoint)"""
+        samples = []
+        for _ in range(self.config.cluster.clock_samples):
+            await node.ws.send_json({'type': 'clock', 't0': time.time()})
+            sent, agent_time, received = await asyncio.wait_for(node.clock_replies.get(), timeout=5)
+            samples.append((received - sent, agent_time - (sent + received) / 2))
+            await asyncio.sleep(0.02)
+        rtt, node.offset = min(samples)
+        node.rtt_ms = rtt * 1000
+        
+        # Both sides synced to the same time source should agree once the measured offset is applied
+        if node.self_sync_offset is not None:
+            node.disagreement_ms = round((node.offset + node.self_sync_offset - self.time_sync.time_offset) * 1000, 2)
+        tolerance = self.config.cluster.clock_tolerance_ms
+        flag = ""
+        if node.disagreement_ms is not None and abs(node.disagreement_ms) > tolerance:
+            flag = f" ⚠️ own time sync disagrees by {node.disagreement_ms:+.1f}ms - using the coordinator's clock"
+        logger.info(f"⏱️ {node.name}: clock offset {node.offset * 1000:+.2f}ms (rtt {node.rtt_ms:.2f}ms){flag}")
+    
+    async def _monitor(self, nodes: List[AgentNode], launch_in: float):
+        await asyncio.sleep(max(0.0, launch_in))
+        while True:
+            await asyncio.sleep(1)
+            logger.info(f"🛰️ Cluster: {sum(n.attempts for n in nodes)} attempts ({', '.join(f'{n.name} {n.attempts}' for n in nodes)})")
+    
+    def _failure(self, username: str, message: str) -> SnipeResult:
+        return SnipeResult(success=False, username=username, attempts=0, total_time=0.0, error_message=message)
+    
+    async def run(self, drop_time: datetime, username: str) -> SnipeResult:
+        """Wait for the agents, assign the burst and collect their results"""
+        cluster = self.config.cluster
+        # The assignment carries bearer tokens: never serve it unauthenticated or in cleartext off this machine
+        problem = exposure_problem(cluster)
+        if problem:
+            logger.error(f"Coordinator not started: {problem}")
+            return self._failure(username, problem)
+        ssl_context = server_ssl_context(cluster)
+        
+        await self.time_sync.sync_time()
+        runner = web.AppRunner(self.app(), access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, cluster.host, cluster.port, ssl_context=ssl_context).start()
+        scheme = "wss" if ssl_context else "ws"
+        logger.info(f"🛰️ Coordinator listening on {scheme}://{cluster.host}:{cluster.port}/agent - waiting for {self.expected} agent(s)")
+        
+        nodes: List[AgentNode] = []
+        monitor = None
+        try:
+            try:
+                await asyncio.wait_for(self._joined.wait(), timeout=cluster.join_timeout_seconds)
+            except asyncio.TimeoutError:
+                logger.warning(f"Only {len(self.nodes)}/{self.expected} agent(s) joined within {cluster.join_timeout_seconds}s")
+            self._assigned = True
+            
+            nodes = [node for node in self.nodes if not node.ws.closed]
+            tokens = self.config.snipe.bearer_tokens
+            if len(nodes) > len(tokens):
+                logger.warning(f"Only {len(tokens)} tokens configured - {len(nodes) - len(tokens)} agent(s) stay idle")
+                for node in nodes[len(tokens):]:
+                    await node.ws.close(message=b'no tokens left')
+                nodes = nodes[:len(tokens)]
+            if not nodes:
+                return self._failure(username, "No agents joined the cluster")
+            
+            await asyncio.gather(*(self._measure_clock(node) for node in nodes))
+            
+            # Times are sent in each agent's own clock
+            drop_epoch = time.time() + (drop_time - self.time_sync.get_accurate_time()).total_seconds()
+            launch_epoch = drop_epoch - 0.4
+            slot_seconds = cluster.slot_ms / 1000.0
+            for index, (node, node_config) in enumerate(zip(nodes, split_config(self.config, len(nodes)))):
+                node.index = index
+                node.tokens = len(node_config.snipe.bearer_tokens)
+                slots = TimeSlots(base=launch_epoch + node.offset, slot_seconds=slot_seconds, index=index, count=len(nodes))
+                await node.ws.send_json({
+                    'type': 'assign',
+                    'username': username,
+                    'tokens': node_config.snipe.bearer_tokens,
+                    'concurrent_requests': node_config.snipe.concurrent_requests,
+                    'max_snipe_attempts': node_config.snipe.max_snipe_attempts,
+                    'burst_duration_seconds': self.config.snipe.burst_duration_seconds,
+                    'launch_at': launch_epoch + node.offset,
+                    'drop_at': drop_epoch + node.offset,
+                    'slots': asdict(slots) if slot_seconds > 0 else None,
+                })
+            launch_in = launch_epoch - time.time()
+            logger.info(f"🛰️ Assigned {len(tokens)} tokens across {len(nodes)} node(s), {cluster.slot_ms:g}ms slots - launch in {launch_in:.1f}s")
+            
+            monitor = asyncio.create_task(self._monitor(nodes, launch_in))
+            wait_seconds = launch_in + self.config.snipe.burst_duration_seconds + 30
+            try:
+                await asyncio.wait_for(asyncio.gather(*(node.done.wait() for node in nodes)), timeout=wait_seconds)
+            except asyncio.TimeoutError:
+                logger.error("Timed out waiting for agent results")
+        finally:
+            if monitor:
+                monitor.cancel()
+            for node in self.nodes:
+                if not node.ws.closed:
+                    await node.ws.close()
+            await runner.cleanup()
+        
+        results = {node.index: node.result for node in nodes if node.result}
+        merged = merge_results(
+            username,
+            results,
+            len(nodes),
+            self.stop_node if self.stop_node is not None else -1,
+            sum(node.attempts for node in nodes),
+            unit="node"
+        )
+        merged.cluster_nodes = [node.telemetry() for node in nodes]
+        for stats in merged.cluster_nodes:
+            logger.info(
+                f"🛰️ {stats['node']}: {stats['attempts']} attempts with {stats['tokens']} token(s), "
+                f"offset {stats['clock_offset_ms']:+.2f}ms, outcome {stats['outcome']}"
+            )
+        if merged.timing:
+            # Agent clocks are aligned with this one to within half their probe round trip
+            own_error = self.time_sync.offset_error or 0.0
+            merged.timing['clock_offset_ms'] = round(self.time_sync.time_offset * 1000, 3)
+            merged.timing['clock_error_ms'] = round(own_error * 1000 + max(node.rtt_ms for node in nodes) / 2, 3)
+        await record_run_async(self.config, merged, drop_time, mode="cluster")
+        return merged
+
+class _AgentSniper(UsernameSniper):
+    """UsernameSniper that reports definitive outcomes to the coordinator and obeys its stops"""
+    
+    def __init__(self, config: AppConfig, ws: aiohttp.ClientWebSocketResponse):
+        super().__init__(config)
+        self.ws = ws
+    
+    def _finish(self, outcome: str, detail: str):
+        if outcome in SHARED_OUTCOMES and self._stop_event and not self._stop_event.is_set():
+            asyncio.create_task(self.ws.send_json({'type': 'stop', 'outcome': outcome}))
+        super()._finish(outcome, detail)
+    
+    def remote_stop(self, outcome: str, node: str):
+        super()._finish(outcome, f"Stopped by node {node} ({outcome})")
+
+class ClusterAgent:
+    """Connect to a coordinator, run the assigned burst and report back"""
+    
+    def __init__(self, config: AppConfig, coordinator_url: str, name: str):
+        self.config = config
+        self.url = coordinator_url.rstrip('/') + '/agent'
+        self.name = name
+        url = urlsplit(self.url)
+        self.ssl_context = client_ssl_context(config.cluster) if url.scheme in ('https', 'wss') else None
+        if self.ssl_context is None and not is_loopback(url.hostname or ''):
+            logger.warning(f"Connecting to {url.hostname} without TLS - the secret and tokens travel in cleartext")
+        self.sniper: Optional[_AgentSniper] = None
+    
+    async def _connect(self, session: aiohttp.ClientSession) -> aiohttp.ClientWebSocketResponse:
+        """Keep trying until the coordinator is up"""
+        deadline = time.monotonic() + self.config.cluster.join_timeout_seconds
+        while True:
+            try:
+                return await session.ws_connect(self.url, heartbeat=10, ssl=self.ssl_context or True)
+            except aiohttp.ClientError as e:
+                if time.monotonic() > deadline:
+                    raise ConnectionError(f"Coordinator at {self.url} not reachable: {e}")
+                await asyncio.sleep(0.5)
+    
+    async def run(self) -> Optional[SnipeResult]:
+        time_sync = TimeSync()
+        await time_sync.sync_time()
+        task = None
+        async with aiohttp.ClientSession() as session:
+            ws = await self._connect(session)
+            await ws.send_json({'type': 'hello', 'name': self.name, 'secret': self.config.cluster.secret, 'time_offset': time_sync.time_offset})
+            logger.info(f"🛰️ {self.name} connected to {self.url}")
+            async for msg in ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                data = json.loads(msg.data)
+                kind = data.get('type')
+                if kind == 'clock':
+                    await ws.send_json({'type': 'clock', 't0': data['t0'], 'agent_time': time.time()})
+                elif kind == 'assign' and task is None:
+                    task = asyncio.create_task(self._snipe(ws, data))
+                elif kind == 'stop' and self.sniper:
+                    self.sniper.remote_stop(data['outcome'], data['node'])
+            if ws.close_code and ws.close_code != aiohttp.WSCloseCode.OK:
+                logger.warning(f"Coordinator closed the connection (code {ws.close_code})")
+            if task is None:
+                return None
+            return await task
+    
+    async def _report_progress(self, ws: aiohttp.ClientWebSocketResponse, sniper: _AgentSniper):
+        while True:
+            await asyncio.sleep(1)
+            await ws.send_json({'type': 'progress', 'attempts': sniper._burst_attempts})
+    
+    async def _snipe(self, ws: aiohttp.ClientWebSocketResponse, assignment: dict) -> SnipeResult:
+        """Run the assigned share of the burst inside this node's time slots"""
+        username = assignment['username']
+        config = copy.deepcopy(self.config)
+        config.snipe.bearer_tokens = assignment['tokens']
+        config.snipe.bearer_token = assignment['tokens'][0]
+        config.snipe.concurrent_requests = assignment['concurrent_requests']
+        config.snipe.max_snipe_attempts = assignment['max_snipe_attempts']
+        config.snipe.burst_duration_seconds = assignment['burst_duration_seconds']
+        config.discord.enabled = False
+        
+        sniper = self.sniper = _AgentSniper(config, ws)
+        if assignment['slots']:
+            sniper.time_slots = TimeSlots(**assignment['slots'])
+        launch_deadline = time.monotonic() + (assignment['launch_at'] - time.time())
+        logger.info(
+            f"🛰️ {self.name}: {len(config.snipe.bearer_tokens)} token(s), {config.snipe.concurrent_requests} workers, "
+            f"launch in {launch_deadline - time.monotonic():.1f}s"
+        )
+        
+        progress = None
+        await sniper._open_session()
+        await sniper._start_metrics()
+        try:
+            sniper._prepare_claims(username)
+            await sniper._record_original_owner(username)
+            await sniper._pin_addresses()
+            for lead_seconds, enter in sniper._critical_phases():
+                await _sleep_until_monotonic(launch_deadline - lead_seconds)
+                await sniper._enter_phase(enter)
+            await _sleep_until_monotonic(launch_deadline)
+            woke_late = time.monotonic() - launch_deadline
+            progress = asyncio.create_task(self._report_progress(ws, sniper))
+            result = await sniper._start_sniping(username, assignment['drop_at'], woke_late=woke_late)
+            await sniper._end_critical_phases(result)
+        except Exception as e:
+            logger.error(f"Agent burst failed: {e}")
+            result = SnipeResult(success=False, username=username, attempts=sniper._burst_attempts, total_time=0.0, error_message=str(e))
+        finally:
+            if progress:
+                progress.cancel()
+            await sniper._end_critical_phases()
+            await sniper._stop_metrics()
+            await sniper.session.close()
+        
+        await ws.send_json({'type': 'result', 'result': asdict(result)})
+        await ws.close()
+        return result
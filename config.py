@@ -1,9 +1,22 @@
 import os
+import time
 import yaml
+import ipaddress
 from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
 from pathlib import Path
 
+from token_health import token_expiry, describe_expiry
+
+def is_loopback(host: str) -> bool:
+    """True if the address only accepts connections from this machine"""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
 @dataclass
 class ProxyConfig:
     """Configuration for proxy settings"""
@@ -25,6 +38,97 @@ class DiscordConfig:
     mention_role_id: str = ""
     embed_color: int = 0x00ff00
 
+@dataclass
+class SocketConfig:
+    """Socket options for claim connections (False / 0 leaves the OS default)"""
+    tcp_nodelay: bool = True  # Send small requests immediately (no Nagle delay)
+    tcp_quickack: bool = True  # Acknowledge immediately instead of delaying ACKs (Linux)
+    busy_poll_us: int = 0  # SO_BUSY_POLL microseconds (Linux; may need CAP_NET_ADMIN)
+    send_buffer_bytes: int = 0
+    receive_buffer_bytes: int = 0
+    tcp_user_timeout_ms: int = 0  # Drop a connection when sent data stays unacknowledged this long (Linux)
+    
+    def __post_init__(self):
+        for name in ('busy_poll_us', 'send_buffer_bytes', 'receive_buffer_bytes', 'tcp_user_timeout_ms'):
+            if getattr(self, name) < 0:
+                raise ValueError(f"socket.{name} cannot be negative")
+
+@dataclass
+class DaemonConfig:
+    """Long-running daemon with a persistent job queue and a loopback control API"""
+    host: str = "127.0.0.1"  # Control API bind address - must be loopback (no authentication)
+    port: int = 8787
+    db_path: str = "sniper_jobs.db"  # SQLite job queue, survives restarts
+    warm_interval_seconds: float = 20.0  # Token checks / DNS refresh between bursts (below the 30s keep-alive)
+    
+    def __post_init__(self):
+        if self.warm_interval_seconds <= 0:
+            raise ValueError("daemon.warm_interval_seconds must be greater than 0")
+
+@dataclass
+class ClusterConfig:
+    """Coordinator/agent settings for sniping from several machines"""
+    host: str = "127.0.0.1"  # Coordinator bind address (use a private interface for remote agents)
+    port: int = 8790
+    secret: str = ""  # Shared secret agents must present - required whenever host is not loopback
+    tls_cert_file: str = ""  # Coordinator certificate (PEM) - serves wss://, required whenever host is not loopback
+    tls_key_file: str = ""  # Private key for tls_cert_file (empty if the certificate file holds it)
+    tls_ca_file: str = ""  # Agents: CA or self-signed certificate to trust for a wss:// coordinator
+    slot_ms: float = 10.0  # Interleaved time-slot length; 0 lets every node fire all the time
+    clock_samples: int = 8  # Clock probes per agent (the lowest-RTT one is used)
+    clock_tolerance_ms: float = 25.0  # Warn when an agent's own time sync disagrees by more than this
+    join_timeout_seconds: float = 60.0  # How long the coordinator waits for agents (and agents for it)
+    
+    def __post_init__(self):
+        if self.slot_ms < 0:
+            raise ValueError("cluster.slot_ms cannot be negative")
+        if self.clock_samples <= 0:
+            raise ValueError("cluster.clock_samples must be greater than 0")
+        if self.tls_key_file and not self.tls_cert_file:
+            raise ValueError("cluster.tls_key_file needs cluster.tls_cert_file")
+
+@dataclass
+class PreflightConfig:
+    """Go/no-go checks run in the background shortly before the drop"""
+    enabled: bool = False  # Opt in - sends token checks and a few API requests at lead_seconds
+    lead_seconds: float = 60.0  # Start the checks this long before the drop
+    max_clock_drift_ms: float = 50.0  # Offset change since the last sync that gets corrected (or fails if it cannot be)
+    max_clock_sample_error_ms: float = 25.0  # Largest error bound (half the round trip) of a sample allowed to correct the offset
+    max_loop_lag_ms: float = 20.0  # Event loop wake-up lag that counts as a failure
+    adjust_concurrency: bool = True  # Cap the worker count at the free file descriptors
+    abort_on_no_go: bool = False  # Skip the burst entirely on a no-go (otherwise fire with what is left)
+    
+    def __post_init__(self):
+        if self.lead_seconds <= 0:
+            raise ValueError("preflight.lead_seconds must be greater than 0")
+
+@dataclass
+class HistoryConfig:
+    """Run history database and regression checks against earlier runs"""
+    enabled: bool = False  # Opt in - the database is created at db_path
+    db_path: str = "snipe_history.db"
+    baseline_runs: int = 10  # Rolling baseline: median of this many previous runs
+    min_baseline_runs: int = 3  # Fewer earlier runs than this and nothing is flagged
+    regression_threshold_pct: float = 50.0  # Flag metrics this much worse than the baseline
+    
+    def __post_init__(self):
+        if self.baseline_runs <= 0:
+            raise ValueError("history.baseline_runs must be greater than 0")
+        if self.regression_threshold_pct <= 0:
+            raise ValueError("history.regression_threshold_pct must be greater than 0")
+
+@dataclass
+class MetricsConfig:
+    """Prometheus metrics endpoint served while the sniper runs"""
+    enabled: bool = False
+    host: str = "127.0.0.1"  # Keep it on loopback (no authentication)
+    port: int = 9464  # Shard N of a sharded run serves on port + N
+    loop_lag_interval_ms: float = 100.0  # How often event loop lag is sampled
+    
+    def __post_init__(self):
+        if self.loop_lag_interval_ms <= 0:
+            raise ValueError("metrics.loop_lag_interval_ms must be greater than 0")
+
 @dataclass
 class SnipeConfig:
     """Snipe configuration"""
@@ -34,13 +138,52 @@ class SnipeConfig:
     bearer_tokens: List[str] = None  # Multiple tokens for mass sniping
     start_sniping_at_seconds: int = 0  # Start exactly at drop time
     max_snipe_attempts: int = 3000  # Maximum attempts for competitive edge
+    attempt_budget_reserve: float = 0.5  # Share of max_snipe_attempts held back until the drop instant
     request_delay_ms: int = 8  # Ultra-fast requests
     concurrent_requests: int = 40  # Push Oracle VPS to limits
+    burst_duration_seconds: float = 10.1  # How long the burst keeps firing once started
+    window_merge_gap_seconds: float = 5.0  # Drop windows closer than this are merged into one continuous burst
+    stop_on_definitive_outcome: bool = True  # End the burst early once the name is taken/invalid
     
     # Rate limiting settings
     max_backoff_seconds: int = 5  # Maximum time to wait for rate limits
     adaptive_delays: bool = True  # Automatically adjust delays based on rate limits
     per_token_rate_limiting: bool = True  # Track rate limits per token
+    breaker_base_open_ms: int = 250  # First rest period after a transient token failure (doubles on repeats)
+    token_expiry_margin_seconds: float = 30.0  # Tokens must stay valid this long past the end of the burst
+    
+    # Multi-process sharding (each shard gets its own process, loop and token subset)
+    shards: int = 1
+    pin_shards_to_cores: bool = False
+    
+    # Critical-window memory mode (GC frozen and disabled from T-critical_window_seconds until the burst ends)
+    critical_memory_mode: bool = True
+    critical_window_seconds: float = 5.0
+    
+    # Quiet window (logs, notifications and health checks held back from T-quiet_window_seconds until the burst ends)
+    quiet_window_enabled: bool = True
+    quiet_window_seconds: float = 5.0
+    
+    # Reuse TLS sessions (tickets) so new connections resume with a one round trip handshake
+    tls_session_resumption: bool = True
+    
+    # Resolve and probe every API address ahead of the drop and pin the fastest
+    dns_pinning: bool = True
+    dns_pin_addresses: int = 2  # Fastest addresses kept (families interleaved for Happy Eyeballs)
+    dns_refresh_seconds: float = 10.0  # Re-resolve and re-probe this long before the drop
+    happy_eyeballs_delay_ms: int = 50  # Head start for each address before the next one is raced
+    
+    # Connection pool limits (0 = derived from concurrent_requests and the open file limit)
+    pool_limit: int = 0
+    pool_limit_per_host: int = 0
+    
+    # Per-attempt telemetry ring buffer in a memory-mapped file ("" = off; readable live with telemetry.py)
+    telemetry_path: str = ""
+    telemetry_capacity: int = 65536  # Records kept before the oldest are overwritten (72 bytes each)
+    
+    # API endpoints (override to point the sniper at a local mock server)
+    api_base_url: str = "https://api.minecraftservices.com"
+    profile_api_base_url: str = "https://api.mojang.com"
     
     # Internal flag to skip validation during initialization
     _skip_validation: bool = False
@@ -78,6 +221,9 @@ class SnipeConfig:
         for i, token in enumerate(self.bearer_tokens):
             if len(token) < 50:  # Bearer tokens are typically much longer
                 print(f"⚠️ Warning: Token #{i+1} seems too short ({len(token)} chars)")
+            expires_at = token_expiry(token)
+            if expires_at is not None and expires_at <= time.time() + 3600:
+                print(f"⚠️ Warning: Token #{i+1} {describe_expiry(expires_at)}")
         
         # Validate numeric settings
         if self.concurrent_requests <= 0:
@@ -88,6 +234,27 @@ class SnipeConfig:
         
         if self.max_snipe_attempts <= 0:
             raise ValueError("max_snipe_attempts must be greater than 0")
+        
+        if self.shards <= 0:
+            raise ValueError("shards must be greater than 0")
+        
+        if not 0 <= self.attempt_budget_reserve < 1:
+            raise ValueError("attempt_budget_reserve must be between 0 and 1")
+        
+        if self.burst_duration_seconds <= 0:
+            raise ValueError("burst_duration_seconds must be greater than 0")
+        
+        if self.window_merge_gap_seconds < 0:
+            raise ValueError("window_merge_gap_seconds cannot be negative")
+        
+        if self.critical_window_seconds < 0:
+            raise ValueError("critical_window_seconds cannot be negative")
+        
+        if self.quiet_window_seconds < 0:
+            raise ValueError("quiet_window_seconds cannot be negative")
+        
+        if self.dns_pin_addresses <= 0:
+            raise ValueError("dns_pin_addresses must be greater than 0")
     
     def validate(self):
         """Manually validate configuration after loading"""
@@ -122,8 +289,15 @@ class AppConfig:
     proxy: ProxyConfig = None
     discord: DiscordConfig = None
     notifications: NotificationSchedule = None
+    socket: SocketConfig = None
+    daemon: DaemonConfig = None
+    cluster: ClusterConfig = None
+    preflight: PreflightConfig = None
+    history: HistoryConfig = None
+    metrics: MetricsConfig = None
     debug_mode: bool = False
     log_level: str = "INFO"
+    event_loop: str = "auto"  # auto (uvloop if installed), uvloop or asyncio
     
     def __post_init__(self):
         if self.snipe is None:
@@ -134,6 +308,18 @@ class AppConfig:
             self.proxy = ProxyConfig()
         if self.notifications is None:
             self.notifications = NotificationSchedule()
+        if self.socket is None:
+            self.socket = SocketConfig()
+        if self.daemon is None:
+            self.daemon = DaemonConfig()
+        if self.cluster is None:
+            self.cluster = ClusterConfig()
+        if self.preflight is None:
+            self.preflight = PreflightConfig()
+        if self.history is None:
+            self.history = HistoryConfig()
+        if self.metrics is None:
+            self.metrics = MetricsConfig()
 
 class ConfigManager:
     """Manages application configuration loading and saving"""
@@ -158,6 +344,12 @@ class ConfigManager:
                 discord_data = data.get('discord', {})
                 snipe_data = data.get('snipe', {})
                 notifications_data = data.get('notifications', {})
+                socket_data = data.get('socket', {})
+                daemon_data = data.get('daemon', {})
+                cluster_data = data.get('cluster', {})
+                preflight_data = data.get('preflight', {})
+                history_data = data.get('history', {})
+                metrics_data = data.get('metrics', {})
                 
                 # Remove _skip_validation from snipe_data if present
                 snipe_data.pop('_skip_validation', None)
@@ -167,8 +359,15 @@ class ConfigManager:
                     discord=DiscordConfig(**discord_data),
                     snipe=SnipeConfig(_skip_validation=True, **snipe_data),
                     notifications=NotificationSchedule(**notifications_data),
+                    socket=SocketConfig(**socket_data),
+                    daemon=DaemonConfig(**daemon_data),
+                    cluster=ClusterConfig(**cluster_data),
+                    preflight=PreflightConfig(**preflight_data),
+                    history=HistoryConfig(**history_data),
+                    metrics=MetricsConfig(**metrics_data),
                     debug_mode=data.get('debug_mode', False),
-                    log_level=data.get('log_level', 'INFO')
+                    log_level=data.get('log_level', 'INFO'),
+                    event_loop=data.get('event_loop', 'auto')
                 )
                 
                 # Now validate the loaded config
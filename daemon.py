@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Long-running sniper daemon
+
+Jobs live in a SQLite queue that survives restarts and are served by one
+MultiTargetScheduler, so the HTTP session, time sync, pinned DNS addresses
+and token health stay warm between jobs instead of being rebuilt by a fresh
+process for every snipe. A loopback HTTP API adds, lists and cancels jobs;
+sniperctl.py is the matching thin client. The API has no authentication, so
+the daemon refuses to listen on anything but a loopback address.
+
+    GET    /status       daemon state (time sync, tokens, pinned addresses, current job)
+    GET    /jobs         every job (?all=0 for unfinished jobs only)
+    POST   /jobs         {"username", "drop_time" (ISO 8601 or NameMC format), "priority"}
+    DELETE /jobs/{id}    cancel a job
+"""
+
+import time
+import signal
+import sqlite3
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+from config import AppConfig, is_loopback
+from scheduler import MultiTargetScheduler, SnipeJob
+from time_sync import parse_namemc_time
+
+logger = logging.getLogger(__name__)
+
+# Job states stored in the queue
+QUEUED = "queued"
+RUNNING = "running"
+PAUSED = "paused"  # Pre-empted by a higher-priority burst, waiting for its next slot
+FINISHED = "finished"
+CANCELLED = "cancelled"
+MISSED = "missed"  # Drop time passed while the daemon was not running
+UNFINISHED = (QUEUED, RUNNING, PAUSED)
+
+# A warm-up pass (time sync, DNS refresh, token checks) is skipped when the
+# sniper takes over for the next burst within this many seconds
+WARM_GUARD_SECONDS = 15.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL,
+    drop_time TEXT NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'queued',
+    outcome TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    ready_ms REAL,
+    created_at TEXT NOT NULL,
+    finished_at TEXT
+)
+"""
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+def parse_drop_time(text: str) -> datetime:
+    """Accept ISO 8601 (naive = UTC) or the NameMC display format"""
+    if '•' in text:
+        return parse_namemc_time(text)
+    parsed = datetime.fromisoformat(text)
+    return parsed.replace(tzinfo=timezone.utc) if parsed.tzinfo is None else parsed.astimezone(timezone.utc)
+
+class JobStore:
+    """SQLite-backed job queue"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(SCHEMA)
+        self.db.commit()
+    
+    def add(self, username: str, drop_time: datetime, priority: int = 0) -> int:
+        cursor = self.db.execute(
+            "INSERT INTO jobs (username, drop_time, priority, created_at) VALUES (?, ?, ?, ?)",
+            (username, drop_time.isoformat(), priority, _now())
+        )
+        self.db.commit()
+        return cursor.lastrowid
+    
+    def get(self, job_id: int) -> Optional[dict]:
+        row = self.db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+    
+    def list(self, include_finished: bool = True) -> List[dict]:
+        query = "SELECT * FROM jobs"
+        if not include_finished:
+            query += f" WHERE status IN ({', '.join('?' * len(UNFINISHED))})"
+        rows = self.db.execute(query + " ORDER BY drop_time", () if include_finished else UNFINISHED).fetchall()
+        return [dict(row) for row in rows]
+    
+    def unfinished(self) -> List[dict]:
+        return self.list(include_finished=False)
+    
+    def update(self, job_id: int, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        self.db.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+        self.db.commit()
+    
+    def close(self):
+        self.db.close()
+
+class SniperDaemon:
+    """Serve jobs from the store through one warm scheduler and expose the control API"""
+    
+    def __init__(self, config: AppConfig, store: Optional[JobStore] = None):
+        self.config = config
+        self.store = store or JobStore(config.daemon.db_path)
+        self.scheduler = MultiTargetScheduler(config)
+        self.scheduler.on_job_update = self._on_job_update
+        self.sniper = self.scheduler.sniper
+        self.started_at = time.time()
+        self.last_warm = None
+        self.token_status = None
+        self._ready: Dict[int, asyncio.Future] = {}
+        self._runner: Optional[web.AppRunner] = None
+    
+    def app(self) -> web.Application:
+        """Build the control API application"""
+        app = web.Application()
+        app.router.add_get('/status', self.status)
+        app.router.add_get('/jobs', self.list_jobs)
+        app.router.add_post('/jobs', self.add_job)
+        app.router.add_delete('/jobs/{job_id}', self.cancel_job)
+        return app
+    
+    def _arm(self, row: dict) -> SnipeJob:
+        """Hand a stored job to the scheduler"""
+        return self.scheduler.add(row['username'], datetime.fromisoformat(row['drop_time']), row['priority'], job_id=row['id'])
+    
+    def _restore(self):
+        """Re-queue jobs that were waiting (or running) when the daemon last stopped
+        
+        Jobs whose drop time passed in the meantime are marked missed instead.
+        """
+        now = self.sniper.time_sync.get_accurate_time()
+        restored = 0
+        for row in self.store.unfinished():
+            if datetime.fromisoformat(row['drop_time']) <= now:
+                self.store.update(row['id'], status=MISSED, error="Drop time passed while the daemon was stopped", finished_at=_now())
+                logger.warning(f"⏭️ Job {row['id']} ({row['username']}) missed its drop while the daemon was stopped")
+                continue
+            self.store.update(row['id'], status=QUEUED)
+            self._arm(row)
+            restored += 1
+        if restored:
+            logger.info(f"♻️ Restored {restored} job(s) from {self.store.path}")
+    
+    def _on_job_update(self, job: SnipeJob, event: str):
+        if event == "ready":
+            self.store.update(job.job_id, ready_ms=round(job.ready_ms, 3))
+            future = self._ready.pop(job.job_id, None)
+            if future and not future.done():
+                future.set_result(job.ready_ms)
+        elif event == "running":
+            self.store.update(job.job_id, status=RUNNING)
+        elif event == "paused":
+            self.store.update(job.job_id, status=PAUSED)
+        elif event == "done":
+            result = job.result
+            self.store.update(
+                job.job_id,
+                status=FINISHED,
+                outcome=result.outcome or ("error" if result.error_message else None),
+                attempts=result.attempts,
+                error=result.error_message,
+                finished_at=_now()
+            )
+    
+    async def add_job(self, request: web.Request) -> web.Response:
+        """POST /jobs - store and arm a job, answering once the scheduler has planned it"""
+        # A JSON content type forces a CORS preflight, so web pages cannot queue jobs from a browser
+        if request.content_type != 'application/json':
+            return web.json_response({'error': "Expected a JSON body"}, status=415)
+        try:
+            body = await request.json()
+            username = str(body['username']).strip()
+            drop_time = parse_drop_time(str(body['drop_time']))
+            priority = int(body.get('priority', 0))
+        except (KeyError, TypeError, ValueError) as e:
+            return web.json_response({'error': f"Invalid job: {e}"}, status=400)
+        if not username:
+            return web.json_response({'error': "Invalid job: empty username"}, status=400)
+        if drop_time <= self.sniper.time_sync.get_accurate_time():
+            return web.json_response({'error': "Drop time is in the past"}, status=400)
+        
+        job_id = self.store.add(username, drop_time, priority)
+        ready = asyncio.get_running_loop().create_future()
+        self._ready[job_id] = ready
+        self._arm(self.store.get(job_id))
+        try:
+            await asyncio.wait_for(asyncio.shield(ready), timeout=1.0)
+        except asyncio.TimeoutError:
+            pass  # A burst is running - the job is planned as soon as it ends
+        finally:
+            self._ready.pop(job_id, None)
+        return web.json_response(self.store.get(job_id), status=201)
+    
+    async def list_jobs(self, request: web.Request) -> web.Response:
+        """GET /jobs"""
+        include_finished = request.query.get('all', '1') != '0'
+        return web.json_response(self.store.list(include_finished))
+    
+    async def cancel_job(self, request: web.Request) -> web.Response:
+        """DELETE /jobs/{id}"""
+        try:
+            job_id = int(request.match_info['job_id'])
+        except ValueError:
+            return web.json_response({'error': "Invalid job id"}, status=400)
+        row = self.store.get(job_id)
+        if not row:
+            return web.json_response({'error': "No such job"}, status=404)
+        if row['status'] not in UNFINISHED:
+            return web.json_response({'error': f"Job already {row['status']}"}, status=409)
+        current = self.scheduler.current
+        if current and current.job_id == job_id:
+            return web.json_response({'error': "Job is firing right now"}, status=409)
+        self.scheduler.cancel(job_id)
+        self.store.update(job_id, status=CANCELLED, finished_at=_now())
+        return web.json_response(self.store.get(job_id))
+    
+    async def status(self, request: web.Request) -> web.Response:
+        """GET /status"""
+        time_sync = self.sniper.time_sync
+        current = self.scheduler.current
+        return web.json_response({
+            'uptime_seconds': round(time.time() - self.started_at, 1),
+            'time_offset_seconds': round(time_sync.time_offset, 4),
+            'last_time_sync': time_sync.last_sync.isoformat() if time_sync.last_sync else None,
+            'last_warm': self.last_warm,
+            'tokens': self.token_status,
+            'pinned_addresses': [p.ip for p in self.sniper.address_pinner.pinned] if self.sniper.address_pinner else None,
+            'pending_jobs': len(self.scheduler.pending()),
+            'current_job': current.job_id if current else None,
+        })
+    
+    async def _keep_warm(self):
+        """Keep time sync, pinned addresses, token health and pooled connections fresh between bursts"""
+        interval = self.config.daemon.warm_interval_seconds
+        while True:
+            await asyncio.sleep(interval)
+            if self.sniper.is_running or self.scheduler.current or not self.sniper.session:
+                continue
+            # Never re-sync the clock or drop tokens while the next burst is being prepared
+            prepare_in = self.scheduler.next_prepare_in()
+            if prepare_in is not None and prepare_in < WARM_GUARD_SECONDS:
+                continue
+            try:
+                if self.sniper.time_sync.should_resync():
+                    await self.sniper.time_sync.sync_time()
+                await self.sniper._pin_addresses()
+                self.token_status = await self.sniper.check_tokens()
+                self.last_warm = _now()
+            except Exception as e:
+                logger.warning(f"Warm-up pass failed: {e}")
+    
+    async def run(self):
+        """Serve the control API and the job queue until SIGINT/SIGTERM"""
+        if not is_loopback(self.config.daemon.host):
+            raise ValueError(f"daemon.host {self.config.daemon.host} is not loopback - the control API has no authentication "
+                             f"(reach it through an SSH tunnel instead)")
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.scheduler.stop)
+            except NotImplementedError:
+                pass
+        
+        self._restore()
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, self.config.daemon.host, self.config.daemon.port).start()
+        logger.info(f"🛰️ Daemon listening on http://{self.config.daemon.host}:{self.config.daemon.port} (jobs in {self.store.path})")
+        
+        warm_task = asyncio.create_task(self._keep_warm())
+        try:
+            await self.scheduler.run(forever=True)
+        finally:
+            warm_task.cancel()
+            await self._runner.cleanup()
+            self.store.close()
+            logger.info("🛰️ Daemon stopped")
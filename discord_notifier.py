@@ -179,6 +179,34 @@ class DiscordNotifier:
         
         return await self.send_notification(title, description, color, fields, mention_role=True)
     
+    async def notify_preflight(self, username: str, go: bool, checks: list,
+                             planned_workers: int, workers: int) -> bool:
+        """Send the go/no-go preflight report"""
+        icons = {"pass": "✅", "warn": "⚠️", "fail": "❌"}
+        if go:
+            title = f"🚦 Preflight: GO"
+            color = 0x00ff00  # Green for go
+        else:
+            title = f"🛑 Preflight: NO-GO"
+            color = 0xff0000  # Red for no-go
+        description = f"Checks for **{username}** before the drop"
+        
+        fields = [
+            {
+                "name": f"{icons.get(status, '')} {name.capitalize()}",
+                "value": detail[:1024],
+                "inline": False
+            }
+            for name, status, detail in checks
+        ]
+        fields.append({
+            "name": "Workers",
+            "value": f"{workers}" if workers == planned_workers else f"{planned_workers} → {workers}",
+            "inline": True
+        })
+        
+        return await self.send_notification(title, description, color, fields, mention_role=not go)
+    
     async def notify_error(self, error_type: str, error_message: str) -> bool:
         """Send error notification"""
         title = f"⚠️ Error: {error_type}"
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Event loop selection - uvloop when it is available, asyncio's default loop otherwise
+"""
+
+import asyncio
+import logging
+from pathlib import Path
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+LOOP_CHOICES = ("auto", "uvloop", "asyncio")
+
+def install_event_loop(preference: str = "auto") -> str:
+    """Install the preferred event loop policy and return the name of the loop in use"""
+    if preference not in LOOP_CHOICES:
+        logger.warning(f"Unknown event loop '{preference}' - using auto")
+        preference = "auto"
+    
+    if preference == "asyncio":
+        asyncio.set_event_loop_policy(None)
+        return "asyncio"
+    
+    try:
+        import uvloop
+    except ImportError:
+        if preference == "uvloop":
+            logger.warning("uvloop requested but not installed - falling back to the default asyncio loop")
+        asyncio.set_event_loop_policy(None)
+        return "asyncio"
+    
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return "uvloop"
+
+def configured_loop(config_path: str = "config.yaml") -> str:
+    """Read the event_loop setting without loading (or creating) the full config"""
+    try:
+        with open(Path(config_path), 'r', encoding='utf-8') as f:
+            data = yaml.safe_load(f) or {}
+        return data.get('event_loop', "auto")
+    except (OSError, yaml.YAMLError):
+        return "auto"
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Run history across snipes
+
+Every burst is stored in a local SQLite database with a snapshot of the
+config, the environment it ran in (host, event loop, transport) and its
+timing metrics, so results outlive the process. Each new run is compared
+with a rolling baseline - the median of the runs before it - and
+regressions in launch latency, first-wave latency, throughput or clock
+accuracy are logged right after the burst (written from a worker thread, so
+the event loop stays free) and shown by `python Main.py history`.
+"""
+
+import json
+import socket
+import asyncio
+import logging
+import platform
+import sqlite3
+import statistics
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime, timezone
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    username TEXT NOT NULL,
+    drop_time TEXT,
+    mode TEXT NOT NULL,
+    outcome TEXT,
+    success INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    duration_seconds REAL NOT NULL,
+    launch_ms REAL,
+    first_wave_ms REAL,
+    throughput REAL,
+    clock_offset_ms REAL,
+    clock_error_ms REAL,
+    host TEXT NOT NULL,
+    event_loop TEXT,
+    transport TEXT,
+    config TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs (started_at);
+CREATE INDEX IF NOT EXISTS runs_by_target ON runs (username, started_at);
+"""
+
+@dataclass(frozen=True)
+class Metric:
+    """A run metric that is checked for regressions"""
+    column: str
+    label: str
+    unit: str
+    higher_is_worse: bool
+    min_change: float  # Smaller absolute changes are noise, whatever the percentage
+
+METRICS = (
+    Metric('launch_ms', "launch latency", "ms", True, 1.0),
+    Metric('first_wave_ms', "first-wave latency", "ms", True, 2.0),
+    Metric('throughput', "throughput", "/s", False, 10.0),
+    Metric('clock_error_ms', "clock error", "ms", True, 5.0),
+)
+
+# Settings that could leak credentials are never stored
+_SECRET_FIELDS = ('bearer_token', 'bearer_tokens', '_skip_validation')
+
+@dataclass
+class Regression:
+    """A run metric that is worse than its rolling baseline"""
+    metric: str
+    label: str
+    value: float
+    baseline: float
+    change_pct: float
+    unit: str
+    
+    def describe(self) -> str:
+        return f"{self.label} {self.value:g}{self.unit} vs baseline {self.baseline:g}{self.unit} ({self.change_pct:+.0f}%)"
+
+class HistoryStore:
+    """SQLite-backed run history"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=5.0)  # Shard processes may write at the same time
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        self.db.commit()
+    
+    def add(self, run: dict) -> int:
+        columns = ", ".join(run)
+        cursor = self.db.execute(
+            f"INSERT INTO runs ({columns}) VALUES ({', '.join('?' * len(run))})",
+            tuple(run.values())
+        )
+        self.db.commit()
+        return cursor.lastrowid
+    
+    def get(self, run_id: int) -> Optional[dict]:
+        row = self.db.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return dict(row) if row else None
+    
+    def runs(self, username: Optional[str] = None, since: Optional[float] = None,
+             until: Optional[float] = None, limit: Optional[int] = None) -> List[dict]:
+        """Runs in a time range (Unix time), oldest first; limit keeps the most recent ones"""
+        clauses, params = [], []
+        if username:
+            clauses.append("username = ?")
+            params.append(username)
+        if since is not None:
+            clauses.append("started_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("started_at < ?")
+            params.append(until)
+        query = "SELECT * FROM runs"
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY started_at DESC"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        rows = self.db.execute(query, params).fetchall()
+        return [dict(row) for row in reversed(rows)]
+    
+    def baseline(self, run: dict, count: int) -> List[dict]:
+        """The `count` runs that fired before `run` (every target - the metrics do not depend on the name)"""
+        rows = self.db.execute(
+            "SELECT * FROM runs WHERE started_at < ? AND attempts > 0 ORDER BY started_at DESC LIMIT ?",
+            (run['started_at'], count)
+        ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def close(self):
+        self.db.close()
+
+def detect_regressions(run: dict, baseline: List[dict], threshold_pct: float, min_runs: int = 3) -> List[Regression]:
+    """Metrics of `run` that are more than threshold_pct worse than the baseline median"""
+    regressions = []
+    for metric in METRICS:
+        value = run.get(metric.column)
+        history = [row[metric.column] for row in baseline if row.get(metric.column) is not None]
+        if value is None or len(history) < min_runs:
+            continue
+        median = statistics.median(history)
+        if median <= 0:
+            continue
+        change = (value - median) / median * 100
+        worse = change if metric.higher_is_worse else -change
+        if worse >= threshold_pct and abs(value - median) >= metric.min_change:
+            regressions.append(Regression(metric.column, metric.label, value, round(median, 3), round(change, 1), metric.unit))
+    return regressions
+
+def _event_loop_name() -> Optional[str]:
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+    return "uvloop" if type(loop).__module__.startswith("uvloop") else "asyncio"
+
+def config_snapshot(config) -> dict:
+    """Settings that shape a burst, without tokens"""
+    snipe = {name: value for name, value in asdict(config.snipe).items() if name not in _SECRET_FIELDS}
+    snipe['token_count'] = len(config.snipe.bearer_tokens)
+    return {
+        'snipe': snipe,
+        'socket': asdict(config.socket),
+        'preflight': asdict(config.preflight),
+        'proxies': len(config.proxy.proxies) if config.proxy.enabled else 0,
+        'event_loop': config.event_loop,
+    }
+
+def transport_snapshot(config, result) -> dict:
+    """How requests reached the API during the run"""
+    snipe = config.snipe
+    socket_profile = result.socket_profile or {}
+    return {
+        'proxied': bool(config.proxy.enabled and config.proxy.proxies),
+        'tls_resumption': snipe.tls_session_resumption,
+        'dns_pinning': snipe.dns_pinning,
+        'pinned_addresses': ((result.address_pinning or {}).get('pinned') or None),
+        'socket_options': socket_profile.get('applied'),
+        'new_connections': (result.pool_stats or {}).get('new_connections'),
+        'python': platform.python_version(),
+        'platform': platform.platform(terse=True),
+    }
+
+def run_record(config, result, drop_time: Optional[datetime] = None, mode: str = "single") -> dict:
+    """One history row for a finished burst"""
+    timing = result.timing or {}
+    return {
+        'started_at': time.time() - result.total_time,
+        'username': result.username,
+        'drop_time': drop_time.isoformat() if drop_time else None,
+        'mode': mode,
+        'outcome': result.outcome or ("error" if result.error_message else None),
+        'success': int(result.success),
+        'attempts': result.attempts,
+        'duration_seconds': round(result.total_time, 3),
+        'launch_ms': timing.get('launch_ms'),
+        'first_wave_ms': timing.get('first_wave_ms'),
+        'throughput': timing.get('throughput'),
+        'clock_offset_ms': timing.get('clock_offset_ms'),
+        'clock_error_ms': timing.get('clock_error_ms'),
+        'host': socket.gethostname(),
+        'event_loop': _event_loop_name(),
+        'transport': json.dumps(transport_snapshot(config, result), default=str),
+        'config': json.dumps(config_snapshot(config), default=str),
+    }
+
+def record_run(config, result, drop_time: Optional[datetime] = None, mode: str = "single") -> List[Regression]:
+    """Store a finished burst and log how it compares with the rolling baseline; never raises"""
+    settings = config.history
+    if not settings.enabled or not result.attempts:
+        return []
+    try:
+        store = HistoryStore(settings.db_path)
+        try:
+            run = run_record(config, result, drop_time, mode)
+            run['id'] = store.add(run)
+            baseline = store.baseline(run, settings.baseline_runs)
+        finally:
+            store.close()
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"Could not record run history in {settings.db_path}: {e}")
+        return []
+    
+    regressions = detect_regressions(run, baseline, settings.regression_threshold_pct, settings.min_baseline_runs)
+    for regression in regressions:
+        logger.warning(f"📉 Regression in run #{run['id']}: {regression.describe()}")
+    logger.debug(f"Run #{run['id']} recorded in {settings.db_path}")
+    return regressions
+
+async def record_run_async(config, result, drop_time: Optional[datetime] = None, mode: str = "single") -> List[Regression]:
+    """record_run on a worker thread, so the SQLite write never stalls the event loop"""
+    if not config.history.enabled or not result.attempts:
+        return []
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, record_run, config, result, drop_time, mode)
+
+def regressions_by_run(store: HistoryStore, runs: List[dict], settings) -> dict:
+    """Regressions of every run against the baseline that preceded it, by run id"""
+    return {
+        run['id']: detect_regressions(
+            run, store.baseline(run, settings.baseline_runs), settings.regression_threshold_pct, settings.min_baseline_runs
+        )
+        for run in runs
+    }
+
+def _flatten(data: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in data.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        else:
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+def _cell(value, unit: str = "", flagged: bool = False) -> str:
+    if value is None:
+        return "-"
+    text = f"{value:g}{unit}" if isinstance(value, (int, float)) else str(value)
+    return f"[red]{text}[/red]" if flagged else text
+
+def print_history(runs: List[dict], regressions: dict, console, baseline_runs: int):
+    """Table of runs with regressed metrics highlighted, followed by the current baseline"""
+    from rich.table import Table
+    
+    table = Table(title="Run history")
+    for header in ("#", "Started (UTC)", "Target", "Mode", "Outcome", "Attempts", "Launch", "First wave", "Throughput", "Clock err", "Host / loop"):
+        table.add_column(header, justify="right" if header in ("#", "Attempts") else "left")
+    for run in runs:
+        flagged = {regression.metric for regression in regressions.get(run['id'], [])}
+        table.add_row(
+            str(run['id']),
+            datetime.fromtimestamp(run['started_at'], timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+            run['username'],
+            run['mode'],
+            run['outcome'] or "-",
+            str(run['attempts']),
+            *(_cell(run[metric.column], metric.unit, metric.column in flagged) for metric in METRICS),
+            f"{run['host']} / {run['event_loop'] or '-'}"
+        )
+    console.print(table)
+    
+    for run in runs:
+        for regression in regressions.get(run['id'], []):
+            console.print(f"[red]📉 Run #{run['id']}: {regression.describe()}[/red]")
+    
+    recent = runs[-baseline_runs:]
+    medians = []
+    for metric in METRICS:
+        values = [run[metric.column] for run in recent if run[metric.column] is not None]
+        if values:
+            medians.append(f"{metric.label} {statistics.median(values):g}{metric.unit}")
+    if medians:
+        console.print(f"[dim]Median of the last {len(recent)} run(s) shown: {', '.join(medians)}[/dim]")
+
+def print_comparison(first: dict, second: dict, console):
+    """Metrics, environment and config of two runs side by side (only differing settings)"""
+    from rich.table import Table
+    
+    table = Table(title=f"Run #{first['id']} vs run #{second['id']}")
+    table.add_column("")
+    table.add_column(f"#{first['id']}", justify="right")
+    table.add_column(f"#{second['id']}", justify="right")
+    table.add_column("Change", justify="right")
+    for name in ('outcome', 'attempts', 'duration_seconds'):
+        table.add_row(name, _cell(first[name]), _cell(second[name]), "")
+    for metric in METRICS:
+        a, b = first[metric.column], second[metric.column]
+        change = ""
+        if a is not None and b is not None and a:
+            pct = (b - a) / a * 100
+            worse = pct if metric.higher_is_worse else -pct
+            change = f"[{'red' if worse > 0 else 'green'}]{pct:+.0f}%[/]"
+        table.add_row(metric.label, _cell(a, metric.unit), _cell(b, metric.unit), change)
+    
+    before = _flatten({'host': first['host'], 'event_loop': first['event_loop'],
+                       'transport': json.loads(first['transport'] or '{}'), 'config': json.loads(first['config'] or '{}')})
+    after = _flatten({'host': second['host'], 'event_loop': second['event_loop'],
+                      'transport': json.loads(second['transport'] or '{}'), 'config': json.loads(second['config'] or '{}')})
+    changed = [key for key in sorted(set(before) | set(after)) if before.get(key) != after.get(key)]
+    if changed:
+        table.add_section()
+        for key in changed:
+            table.add_row(f"[dim]{key}[/dim]", _cell(before.get(key)), _cell(after.get(key)), "")
+    console.print(table)
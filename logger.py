@@ -1,13 +1,21 @@
 import logging
+import logging.handlers
 import sys
+import time
+import queue
+import atexit
+import asyncio
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from colorama import Fore, Back, Style, init
 
 # Initialize colorama for Windows
 init(autoreset=True)
 
+# Background thread that formats and writes records handed over by the QueueHandler
+_listener: Optional[logging.handlers.QueueListener] = None
+
 class ColoredFormatter(logging.Formatter):
     """Custom formatter with colors for different log levels"""
     
@@ -34,8 +42,13 @@ class ColoredFormatter(logging.Formatter):
         return formatted
 
 def setup_logging(log_level: str = "INFO", log_file: Optional[str] = None, 
-                 debug_mode: bool = False) -> None:
-    """Setup logging configuration"""
+                 debug_mode: bool = False, use_queue: bool = True) -> None:
+    """Setup logging configuration
+    
+    With use_queue the root logger only gets a QueueHandler; formatting and
+    console/file writes happen on a QueueListener thread, off the event loop.
+    """
+    global _listener
     
     # Create logs directory if it doesn't exist
     if log_file:
@@ -50,7 +63,9 @@ def setup_logging(log_level: str = "INFO", log_file: Optional[str] = None,
     root_logger.setLevel(level)
     
     # Clear existing handlers
+    stop_logging()
     root_logger.handlers.clear()
+    handlers = []
     
     # Console handler with colors
     console_handler = logging.StreamHandler(sys.stdout)
@@ -60,7 +75,7 @@ def setup_logging(log_level: str = "INFO", log_file: Optional[str] = None,
     console_formatter = ColoredFormatter(console_format, datefmt="%H:%M:%S")
     console_handler.setFormatter(console_formatter)
     
-    root_logger.addHandler(console_handler)
+    handlers.append(console_handler)
     
     # File handler (if specified)
     if log_file:
@@ -71,7 +86,16 @@ def setup_logging(log_level: str = "INFO", log_file: Optional[str] = None,
         file_formatter = logging.Formatter(file_format, datefmt="%Y-%m-%d %H:%M:%S")
         file_handler.setFormatter(file_formatter)
         
-        root_logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    if use_queue:
+        log_queue = queue.SimpleQueue()
+        root_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+    else:
+        for handler in handlers:
+            root_logger.addHandler(handler)
     
     # Reduce noise from external libraries
     logging.getLogger("aiohttp").setLevel(logging.WARNING)
@@ -84,6 +108,80 @@ def setup_logging(log_level: str = "INFO", log_file: Optional[str] = None,
     if log_file:
         logger.info(f"Log file: {log_file}")
 
+def stop_logging() -> None:
+    """Flush queued records and stop the background logging thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(stop_logging)
+
+class AttemptLogAggregator:
+    """Turn per-attempt results into one summary per interval
+    
+    Workers call record() on every attempt (a dict increment); run() logs the
+    totals once per interval, with a per-worker breakdown at DEBUG level,
+    e.g. "Worker 7: 120 × 429" for the last second.
+    """
+    
+    def __init__(self, log: logging.Logger, interval: float = 1.0):
+        self.log = log
+        self.interval = interval
+        self._counts: Dict[Tuple[int, object], int] = {}
+        self._sampled: Dict[str, float] = {}
+        self._started = time.monotonic()
+    
+    def record(self, worker_number: int, status):
+        """Count one attempt (cheap - called on the hot path)"""
+        key = (worker_number, status)
+        self._counts[key] = self._counts.get(key, 0) + 1
+    
+    def sample(self, key: str) -> bool:
+        """True at most once per interval for each key - for messages that should not repeat per attempt"""
+        now = time.monotonic()
+        if now - self._sampled.get(key, 0.0) < self.interval:
+            return False
+        self._sampled[key] = now
+        return True
+    
+    async def run(self, stop_event: asyncio.Event):
+        """Log a summary every interval until stopped"""
+        self._started = time.monotonic()
+        try:
+            while not stop_event.is_set():
+                await asyncio.sleep(self.interval)
+                self.flush()
+        finally:
+            self.flush()
+    
+    def flush(self):
+        """Log and reset the counts gathered since the last flush"""
+        counts, self._counts = self._counts, {}
+        elapsed = time.monotonic() - self._started
+        self._started = time.monotonic()
+        if not counts:
+            return
+        
+        totals: Dict[object, int] = {}
+        per_worker: Dict[int, Dict[object, int]] = {}
+        for (worker, status), count in counts.items():
+            totals[status] = totals.get(status, 0) + count
+            per_worker.setdefault(worker, {})[status] = count
+        
+        self.log.info(
+            f"📊 {sum(totals.values())} attempts in last {elapsed:.1f}s: {_format_counts(totals)}"
+        )
+        if self.log.isEnabledFor(logging.DEBUG):
+            for worker in sorted(per_worker):
+                self.log.debug(f"Worker {worker}: {_format_counts(per_worker[worker])} in last {elapsed:.1f}s")
+
+def _format_counts(counts: Dict[object, int]) -> str:
+    """Render {status: count} as '120 × 429, 3 × 403'"""
+    return ", ".join(
+        f"{count} × {status}" for status, count in sorted(counts.items(), key=lambda item: -item[1])
+    )
+
 def get_logger(name: str) -> logging.Logger:
     """Get a logger instance"""
     return logging.getLogger(name)
@@ -0,0 +1,68 @@
+import gc
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CriticalMemoryWindow:
+    """Keep the garbage collector out of the way around the drop
+    
+    On entry a full collection runs, everything that survives is moved to the
+    permanent generation with gc.freeze() and automatic collection is turned
+    off. On exit the previous GC state is restored. Any collection that still
+    happens inside the window (explicit gc.collect() calls) is counted.
+    """
+    
+    def __init__(self):
+        self.active = False
+        self.collections = 0
+        self.frozen_objects = 0
+        self._was_enabled = True
+        self._entered_at = 0.0
+    
+    def _on_gc(self, phase: str, info: dict):
+        if phase == "start":
+            self.collections += 1
+    
+    def enter(self):
+        """Collect, freeze surviving objects and disable automatic GC"""
+        if self.active:
+            return
+        started = time.perf_counter()
+        gc.collect()
+        gc.freeze()
+        self.frozen_objects = gc.get_freeze_count()
+        self._was_enabled = gc.isenabled()
+        gc.disable()
+        
+        self.collections = 0
+        gc.callbacks.append(self._on_gc)
+        self.active = True
+        self._entered_at = time.perf_counter()
+        logger.info(
+            f"🧊 GC frozen ({self.frozen_objects} objects) and disabled "
+            f"in {(self._entered_at - started) * 1000:.1f}ms"
+        )
+    
+    def exit(self) -> int:
+        """Restore GC and return the number of collections seen inside the window"""
+        if not self.active:
+            return self.collections
+        gc.callbacks.remove(self._on_gc)
+        gc.unfreeze()
+        if self._was_enabled:
+            gc.enable()
+        self.active = False
+        logger.info(
+            f"♻️ GC restored after {time.perf_counter() - self._entered_at:.1f}s - "
+            f"{self.collections} collection(s) inside the critical window"
+        )
+        return self.collections
+    
+    def __enter__(self):
+        self.enter()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.exit()
+        return False
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Live metrics in the Prometheus text format
+
+An optional loopback HTTP endpoint (GET /metrics) that monitoring can scrape
+during the countdown and the burst. Attempt counters and histograms live in
+preallocated arrays that workers bump in place - one slot lookup and one
+bucket search per attempt, nothing appended or allocated. Everything else
+(token states, pool usage, clock offset) is read from the sniper only when a
+scrape arrives.
+"""
+
+import math
+import time
+import asyncio
+import logging
+from array import array
+from bisect import bisect_left
+from typing import Iterable, List, Optional, Tuple
+
+from aiohttp import web
+
+from token_health import TokenState
+
+logger = logging.getLogger(__name__)
+
+# Claim results get a counter slot each; anything else is counted as "other"
+STATUS_LABELS = (200, 400, 401, 403, 404, 429, 'timeout', 'network_error', 'unknown_error')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)  # Seconds
+LOOP_LAG_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1)  # Seconds
+
+TOKEN_STATES = (TokenState.CLOSED, TokenState.OPEN, TokenState.HALF_OPEN, TokenState.DEAD)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+class Histogram:
+    """Fixed-bucket histogram backed by preallocated arrays"""
+    __slots__ = ('bounds', 'counts', 'total')
+    
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = array('Q', bytes(8 * (len(bounds) + 1)))  # Last slot is +Inf
+        self.total = array('d', [0.0])
+    
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total[0] += value
+    
+    def render(self, name: str) -> List[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{le="{bound}"}} {cumulative}')
+        cumulative += self.counts[-1]
+        lines.append(f'{name}_bucket{{le="+Inf"}} {cumulative}')
+        lines.append(f"{name}_sum {self.total[0]!r}")
+        lines.append(f"{name}_count {cumulative}")
+        return lines
+
+class AttemptMetrics:
+    """Counters the workers update on every attempt"""
+    
+    def __init__(self):
+        self._slots = {status: i for i, status in enumerate(STATUS_LABELS)}
+        self._other = len(STATUS_LABELS)
+        self.attempts = array('Q', bytes(8 * (len(STATUS_LABELS) + 1)))
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.loop_lag = Histogram(LOOP_LAG_BUCKETS)
+        self.last_loop_lag = 0.0
+    
+    def observe(self, status, seconds: float):
+        """Count one attempt and its latency (hot path)"""
+        self.attempts[self._slots.get(status, self._other)] += 1
+        self.latency.observe(seconds)
+    
+    async def sample_loop_lag(self, interval: float):
+        """Measure how late the event loop wakes a sleeper, forever"""
+        while True:
+            expected = time.perf_counter() + interval
+            await asyncio.sleep(interval)
+            lag = max(0.0, time.perf_counter() - expected)
+            self.last_loop_lag = lag
+            self.loop_lag.observe(lag)
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _sample(name: str, value, **labels) -> str:
+    if labels:
+        rendered = ",".join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+        name = f"{name}{{{rendered}}}"
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return f"{name} NaN"
+    return f"{name} {value!r}"
+
+def _family(name: str, kind: str, help_text: str, samples: Iterable[str]) -> List[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", *samples]
+
+class MetricsServer:
+    """Serve a UsernameSniper's metrics on a loopback port"""
+    
+    def __init__(self, sniper, settings):
+        self.sniper = sniper
+        self.settings = settings
+        self.metrics: AttemptMetrics = sniper.metrics
+        self._runner: Optional[web.AppRunner] = None
+        self._lag_task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/metrics', self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        try:
+            await web.TCPSite(self._runner, self.settings.host, self.settings.port).start()
+        except OSError as e:
+            await self._runner.cleanup()
+            self._runner = None
+            logger.warning(f"Metrics endpoint not started on {self.settings.host}:{self.settings.port}: {e}")
+            return
+        self._lag_task = asyncio.create_task(self.metrics.sample_loop_lag(self.settings.loop_lag_interval_ms / 1000.0))
+        logger.info(f"📈 Metrics on http://{self.settings.host}:{self.settings.port}/metrics")
+    
+    async def stop(self):
+        if self._lag_task:
+            self._lag_task.cancel()
+            self._lag_task = None
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+    
+    async def handle(self, request: web.Request) -> web.Response:
+        """GET /metrics"""
+        return web.Response(body=self.render().encode(), headers={'Content-Type': CONTENT_TYPE})
+    
+    def render(self) -> str:
+        sniper = self.sniper
+        metrics = self.metrics
+        lines = []
+        
+        lines += _family("sniper_running", "gauge", "1 from the start of a snipe's countdown until its burst ends", [
+            _sample("sniper_running", int(sniper.is_running))
+        ])
+        lines += _family("sniper_drop_timestamp_seconds", "gauge", "Drop instant of the current or last burst (Unix time)", [
+            _sample("sniper_drop_timestamp_seconds", float(sniper._drop_at))
+        ])
+        lines += _family("sniper_burst_attempts", "gauge", "Attempts made in the current or last burst", [
+            _sample("sniper_burst_attempts", sniper._burst_attempts)
+        ])
+        
+        labels = [str(status) for status in STATUS_LABELS] + ["other"]
+        lines += _family("sniper_attempts_total", "counter", "Claim attempts by result", [
+            _sample("sniper_attempts_total", count, status=label) for label, count in zip(labels, metrics.attempts)
+        ])
+        lines += _family("sniper_attempt_latency_seconds", "histogram", "Claim request latency",
+                         metrics.latency.render("sniper_attempt_latency_seconds"))
+        
+        pool = sniper.pool_monitor
+        lines += _family("sniper_in_flight_requests", "gauge", "Requests currently in flight", [
+            _sample("sniper_in_flight_requests", count, host=host) for host, count in pool.in_flight.items()
+        ])
+        lines += _family("sniper_pool_connections", "gauge", "Connections opened or reused in the current or last burst", [
+            _sample("sniper_pool_connections", pool.new_connections, kind="new"),
+            _sample("sniper_pool_connections", pool.reused_connections, kind="reused")
+        ])
+        lines += _family("sniper_pool_waits", "gauge", "Requests that queued for a free connection in the current or last burst", [
+            _sample("sniper_pool_waits", pool.waited)
+        ])
+        if sniper.session is not None:
+            lines += _family("sniper_pool_limit", "gauge", "Connection pool limit", [
+                _sample("sniper_pool_limit", sniper.session.connector.limit)
+            ])
+        
+        health = sniper.token_health
+        if health is not None:
+            states, attempts, expiry = [], [], []
+            for token in health.health:
+                name = f"#{token.index + 1}"
+                states += [_sample("sniper_token_state", int(token.state == state), token=name, state=state) for state in TOKEN_STATES]
+                attempts.append(_sample("sniper_token_burst_attempts", token.attempts, token=name))
+                if token.expires_at is not None:
+                    expiry.append(_sample("sniper_token_expiry_timestamp_seconds", float(token.expires_at), token=name))
+            lines += _family("sniper_token_state", "gauge", "Circuit breaker state of each token", states)
+            lines += _family("sniper_token_burst_attempts", "gauge", "Attempts per token in the current or last burst", attempts)
+            lines += _family("sniper_token_expiry_timestamp_seconds", "gauge", "JWT expiry of each token (Unix time)", expiry)
+        
+        lines += _family("sniper_loop_lag_last_seconds", "gauge", "Event loop wake-up lag at the last sample", [
+            _sample("sniper_loop_lag_last_seconds", float(metrics.last_loop_lag))
+        ])
+        lines += _family("sniper_loop_lag_seconds", "histogram", "Event loop wake-up lag",
+                         metrics.loop_lag.render("sniper_loop_lag_seconds"))
+        
+        time_sync = sniper.time_sync
+        lines += _family("sniper_clock_offset_seconds", "gauge", "Correction applied to the local clock", [
+            _sample("sniper_clock_offset_seconds", float(time_sync.time_offset))
+        ])
+        lines += _family("sniper_clock_error_seconds", "gauge", "Error bound of the clock offset (NaN if unknown)", [
+            _sample("sniper_clock_error_seconds", time_sync.offset_error)
+        ])
+        if time_sync.last_sync:
+            lines += _family("sniper_clock_last_sync_timestamp_seconds", "gauge", "When the clock was last synced (Unix time)", [
+                _sample("sniper_clock_last_sync_timestamp_seconds", time_sync.last_sync.timestamp())
+            ])
+        
+        return "\n".join(lines) + "\n"
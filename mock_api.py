@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Local mock of the Minecraft name-change API for benchmarks and dry runs
+
+Point snipe.api_base_url and snipe.profile_api_base_url at the mock
+(e.g. http://127.0.0.1:8085) to exercise the sniper without touching
+the real API.
+"""
+
+import time
+import asyncio
+import argparse
+import logging
+from typing import Optional
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+class MockMinecraftAPI:
+    """In-memory stand-in for the claim, profile and owner lookup endpoints"""
+    
+    def __init__(self, available_at: Optional[float] = None, latency_ms: float = 0.0,
+                 rate_limit_per_second: int = 0, owner_uuid: str = "0" * 32):
+        self.available_at = available_at  # Epoch seconds the name drops (None = never)
+        self.latency = latency_ms / 1000.0
+        self.rate_limit_per_second = rate_limit_per_second
+        self.owner_uuid = owner_uuid
+        self.claimed_by = None
+        self.requests = 0
+        self._token_windows = {}
+    
+    def app(self) -> web.Application:
+        """Build the aiohttp application"""
+        app = web.Application()
+        app.router.add_put('/minecraft/profile/name/{name}', self.claim)
+        app.router.add_get('/minecraft/profile', self.profile)
+        app.router.add_get('/users/profiles/minecraft/{name}', self.owner)
+        return app
+    
+    def _token(self, request: web.Request) -> str:
+        return request.headers.get('Authorization', '')[len('Bearer '):]
+    
+    def _rate_limited(self, token: str) -> bool:
+        """Fixed one-second window per token"""
+        if not self.rate_limit_per_second:
+            return False
+        now = time.monotonic()
+        window_start, count = self._token_windows.get(token, (now, 0))
+        if now - window_start >= 1.0:
+            window_start, count = now, 0
+        count += 1
+        self._token_windows[token] = (window_start, count)
+        return count > self.rate_limit_per_second
+    
+    async def claim(self, request: web.Request) -> web.Response:
+        """PUT /minecraft/profile/name/{name}"""
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        
+        token = self._token(request)
+        if not token or token.startswith('expired'):
+            return web.json_response({'error': 'UNAUTHORIZED'}, status=401)
+        if token.startswith('noentitlement'):
+            return web.json_response({'error': 'NOT_FOUND'}, status=404)
+        if self._rate_limited(token):
+            return web.json_response({'error': 'TOO_MANY_REQUESTS'}, status=429, headers={'Retry-After': '1'})
+        
+        name = request.match_info['name']
+        available = self.available_at is not None and time.time() >= self.available_at
+        if available and self.claimed_by is None:
+            self.claimed_by = token
+            logger.info(f"Mock: {name} claimed by ...{token[-8:]}")
+            return web.json_response({'id': 'f' * 32, 'name': name})
+        
+        return web.json_response({
+            'path': f'/minecraft/profile/name/{name}',
+            'errorType': 'FORBIDDEN',
+            'details': {'status': 'DUPLICATE'}
+        }, status=403)
+    
+    async def profile(self, request: web.Request) -> web.Response:
+        """GET /minecraft/profile"""
+        token = self._token(request)
+        if not token or token.startswith('expired'):
+            return web.json_response({'error': 'UNAUTHORIZED'}, status=401)
+        if token.startswith('noentitlement'):
+            return web.json_response({'error': 'NOT_FOUND'}, status=404)
+        return web.json_response({'id': 'e' * 32, 'name': 'MockPlayer'})
+    
+    async def owner(self, request: web.Request) -> web.Response:
+        """GET /users/profiles/minecraft/{name}"""
+        owner = 'f' * 32 if self.claimed_by else self.owner_uuid
+        return web.json_response({'id': owner, 'name': request.match_info['name']})
+
+async def start_mock_server(host: str = "127.0.0.1", port: int = 8085, reuse_port: bool = False, **kwargs):
+    """Start the mock API in the running loop and return (runner, api)"""
+    api = MockMinecraftAPI(**kwargs)
+    runner = web.AppRunner(api.app(), access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port, reuse_port=reuse_port or None)
+    await site.start()
+    return runner, api
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the Minecraft name-change API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8085)
+    parser.add_argument('--drop-in', type=float, default=None, help='Seconds until the name becomes available (default: never)')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Artificial latency per claim request')
+    parser.add_argument('--rate-limit', type=int, default=0, help='Claims per token per second before 429 (0 = unlimited)')
+    args = parser.parse_args()
+    
+    api = MockMinecraftAPI(
+        available_at=time.time() + args.drop_in if args.drop_in is not None else None,
+        latency_ms=args.latency_ms,
+        rate_limit_per_second=args.rate_limit
+    )
+    print(f"🧪 Mock Minecraft API listening on http://{args.host}:{args.port}")
+    web.run_app(api.app(), host=args.host, port=args.port, access_log=None, print=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import time
+import asyncio
+import logging
+from typing import List, Optional
+from dataclasses import dataclass, asdict
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PacingSample:
+    """One step of the controller trajectory"""
+    t: float                 # Seconds since the burst started
+    delay_ms: float          # Pause each worker takes between healthy requests
+    concurrency: int         # Workers allowed to send
+    requests: int            # Requests completed in the last interval
+    rate_limited: float      # Share of those requests that returned 429
+    latency_ms: float        # Mean request latency in the last interval
+    loop_lag_ms: float       # Event loop wake-up lag measured in the last interval
+    action: str              # "increase", "decrease" or "hold"
+
+class AIMDController:
+    """Additive-increase / multiplicative-decrease pacing for the burst
+    
+    Every interval the controller looks at the 429 share, mean latency and
+    event loop lag observed since the last step. Healthy intervals shave a
+    little off the per-worker delay and re-admit one worker; congested
+    intervals multiply the delay up and cut the active worker count.
+    """
+    
+    def __init__(self, initial_delay: float, max_concurrency: int,
+                 min_delay: float = 0.001, max_delay: float = 0.5,
+                 additive_step: float = 0.001, decrease_factor: float = 0.5,
+                 interval: float = 0.25, max_429_share: float = 0.05,
+                 max_loop_lag: float = 0.02, latency_factor: float = 2.0):
+        self.delay = initial_delay
+        self.concurrency = max_concurrency
+        self.max_concurrency = max_concurrency
+        self.min_delay = min_delay
+        self.max_delay = max(max_delay, initial_delay)
+        self.additive_step = additive_step
+        self.decrease_factor = decrease_factor
+        self.interval = interval
+        self.max_429_share = max_429_share
+        self.max_loop_lag = max_loop_lag
+        self.latency_factor = latency_factor
+        
+        self.trajectory: List[PacingSample] = []
+        self._baseline_latency: Optional[float] = None
+        self._started = time.monotonic()
+        self._reset_window()
+    
+    def _reset_window(self):
+        self._requests = 0
+        self._rate_limited = 0
+        self._latency_total = 0.0
+        self._loop_lag = 0.0
+    
+    def record(self, status, latency: float):
+        """Record one completed request (cheap - called on the hot path)"""
+        self._requests += 1
+        self._latency_total += latency
+        if status == 429:
+            self._rate_limited += 1
+    
+    def allows(self, worker_number: int) -> bool:
+        """Check whether a worker is inside the current concurrency limit"""
+        return worker_number < self.concurrency
+    
+    async def run(self, stop_event: asyncio.Event):
+        """Measure loop lag and adjust pacing every interval until stopped"""
+        self._started = time.monotonic()
+        while not stop_event.is_set():
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self._loop_lag = max(0.0, time.monotonic() - expected)
+            self.step()
+    
+    def step(self) -> PacingSample:
+        """Apply one AIMD adjustment from the counters gathered since the last step"""
+        requests = self._requests
+        share_429 = self._rate_limited / requests if requests else 0.0
+        latency = self._latency_total / requests if requests else 0.0
+        loop_lag = self._loop_lag
+        
+        slow = (
+            self._baseline_latency is not None
+            and latency > self._baseline_latency * self.latency_factor
+        )
+        if share_429 > self.max_429_share or loop_lag > self.max_loop_lag or slow:
+            action = "decrease"
+            self.delay = min(self.max_delay, max(self.delay, self.min_delay) / self.decrease_factor)
+            self.concurrency = max(1, int(self.concurrency * self.decrease_factor))
+        elif requests:
+            action = "increase"
+            self.delay = max(self.min_delay, self.delay - self.additive_step)
+            self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+            # Track the healthy latency as a slow-moving baseline
+            if self._baseline_latency is None:
+                self._baseline_latency = latency
+            else:
+                self._baseline_latency = 0.8 * self._baseline_latency + 0.2 * latency
+        else:
+            action = "hold"
+        
+        sample = PacingSample(
+            t=round(time.monotonic() - self._started, 3),
+            delay_ms=round(self.delay * 1000, 2),
+            concurrency=self.concurrency,
+            requests=requests,
+            rate_limited=round(share_429, 3),
+            latency_ms=round(latency * 1000, 1),
+            loop_lag_ms=round(loop_lag * 1000, 2),
+            action=action
+        )
+        self.trajectory.append(sample)
+        logger.debug(
+            f"Pacing {action}: delay={sample.delay_ms}ms concurrency={sample.concurrency} "
+            f"429={sample.rate_limited:.1%} latency={sample.latency_ms}ms lag={sample.loop_lag_ms}ms"
+        )
+        self._reset_window()
+        return sample
+    
+    def summary(self) -> List[dict]:
+        """Controller trajectory for post-run analysis"""
+        return [asdict(sample) for sample in self.trajectory]
+
+class AttemptBudget:
+    """Shared pool of claim attempts that every worker draws from
+    
+    Workers share one event loop, so a draw is atomic as long as nothing is
+    awaited between the check and the increment. A share of the budget can
+    be reserved for the drop itself: attempts made before the drop instant
+    can never dip into it.
+    """
+    
+    def __init__(self, total: int, drop_at: float, reserve_fraction: float = 0.0):
+        self.total = total
+        self.drop_at = drop_at
+        self.reserve_fraction = reserve_fraction
+        self.reserved = int(total * reserve_fraction)
+        self.used = 0
+    
+    def rearm(self, drop_at: float):
+        """Move the drop instant and hold back the reserved share of what is left (for the next burst of a plan)"""
+        self.drop_at = drop_at
+        self.reserved = int(self.remaining * self.reserve_fraction)
+    
+    def try_acquire(self, now: Optional[float] = None) -> bool:
+        """Take one attempt from the budget, returning False if none is available right now"""
+        if self.used >= self.total:
+            return False
+        now = now if now is not None else time.time()
+        if now < self.drop_at and self.used >= self.total - self.reserved:
+            return False
+        self.used += 1
+        return True
+    
+    @property
+    def exhausted(self) -> bool:
+        """True once every attempt has been spent"""
+        return self.used >= self.total
+    
+    @property
+    def remaining(self) -> int:
+        """Attempts left in the budget"""
+        return max(0, self.total - self.used)
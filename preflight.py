@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Preflight checks ahead of the drop
+
+At preflight.lead_seconds before the drop a background task checks
+everything the burst relies on: every token is validated in parallel, a
+few requests exercise the connection pool, the clock offset is re-verified, the event
+loop lag is measured and the file descriptor limit is compared with the
+worker count. The result is a go/no-go report that is logged, sent to
+Discord and used to cap the worker count at the connections the process can
+still open. Workers are not cut when tokens fail: the rate limiter already
+spaces out each token, so the remaining tokens take over the dead ones' share.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import statistics
+from dataclasses import dataclass, field, asdict
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+import aiohttp
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from transport import FD_RESERVE
+
+logger = logging.getLogger(__name__)
+
+# Check states
+PASS = "pass"
+WARN = "warn"
+FAIL = "fail"
+
+STATUS_ICONS = {PASS: "✅", WARN: "⚠️", FAIL: "❌"}
+
+# Requests the connection check sends - enough to warm the pool and time the
+# round trip without adding a burst of traffic of its own
+CONNECTION_PROBES = 4
+
+# Loop lag is sampled with this many short sleeps once the network checks are done
+LAG_SAMPLES = 20
+LAG_INTERVAL = 0.01
+
+@dataclass
+class PreflightCheck:
+    """Outcome of one preflight check"""
+    name: str
+    status: str
+    detail: str
+
+@dataclass
+class PreflightReport:
+    """Go/no-go report for one snipe"""
+    username: str
+    seconds_before_drop: float
+    planned_workers: int
+    workers: int  # Worker count the burst will use
+    checks: List[PreflightCheck] = field(default_factory=list)
+    duration_ms: float = 0.0
+    
+    @property
+    def go(self) -> bool:
+        return all(check.status != FAIL for check in self.checks)
+    
+    def to_dict(self) -> dict:
+        report = asdict(self)
+        report['go'] = self.go
+        return report
+    
+    def log(self):
+        verdict = "GO" if self.go else "NO-GO"
+        logger.info(
+            f"🚦 Preflight for {self.username} at T-{self.seconds_before_drop:.0f}s: {verdict} "
+            f"({self.duration_ms:.0f}ms, workers {self.planned_workers} → {self.workers})"
+        )
+        for check in self.checks:
+            line = f"   {STATUS_ICONS[check.status]} {check.name}: {check.detail}"
+            if check.status == PASS:
+                logger.info(line)
+            else:
+                logger.warning(line)
+
+class Preflight:
+    """Run the preflight checks against a UsernameSniper's warm session, clock and tokens"""
+    
+    def __init__(self, sniper):
+        self.sniper = sniper
+        self.settings = sniper.config.preflight
+    
+    async def run(self, username: str, drop_time: datetime, burst_end: float) -> PreflightReport:
+        """Check everything and work out the worker count; burst_end is server Unix time"""
+        started = time.perf_counter()
+        planned = self.sniper.config.snipe.concurrent_requests
+        drop_in = (drop_time - self.sniper.time_sync.get_accurate_time()).total_seconds()
+        
+        tokens, connections, clock = await asyncio.gather(
+            self._check_tokens(burst_end),
+            self._check_connections(planned),
+            self._check_clock()
+        )
+        lag = await self._check_loop_lag()
+        fds, fd_workers = self._check_fds(planned)
+        
+        workers = planned
+        if self.settings.adjust_concurrency and fd_workers is not None:
+            workers = max(1, min(workers, fd_workers))
+        
+        return PreflightReport(
+            username=username,
+            seconds_before_drop=round(drop_in, 1),
+            planned_workers=planned,
+            workers=workers,
+            checks=[tokens, connections, clock, lag, fds],
+            duration_ms=round((time.perf_counter() - started) * 1000, 1)
+        )
+    
+    async def _check_tokens(self, burst_end: float) -> PreflightCheck:
+        """Expiry and a parallel profile request for every token still in the rotation"""
+        self.sniper._exclude_expiring_tokens(burst_end)
+        await self.sniper.check_tokens()
+        health = self.sniper.token_health
+        alive = len(health.alive_indices())
+        detail = f"{alive}/{len(health.tokens)} usable"
+        dead = [f"{h.label} {h.dead_reason}" for h in health.health if h.dead_reason]
+        if dead:
+            detail += " - " + ", ".join(dead)
+        if alive == 0:
+            return PreflightCheck("tokens", FAIL, detail)
+        return PreflightCheck("tokens", WARN if dead else PASS, detail)
+    
+    async def _check_connections(self, planned: int) -> PreflightCheck:
+        """Send a few requests over the connection pool the burst will use"""
+        session = self.sniper.session
+        if session is None:
+            return PreflightCheck("connections", FAIL, "no HTTP session")
+        count = min(planned, CONNECTION_PROBES)
+        monitor = self.sniper.pool_monitor
+        new_before = monitor.new_connections
+        
+        async def probe() -> Optional[float]:
+            sent = time.perf_counter()
+            try:
+                async with session.head(self.sniper.config.snipe.api_base_url) as response:
+                    await response.read()
+                return time.perf_counter() - sent
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                return None
+        
+        results = [r for r in await asyncio.gather(*(probe() for _ in range(count))) if r is not None]
+        opened = monitor.new_connections - new_before
+        if not results:
+            return PreflightCheck("connections", FAIL, f"0/{count} requests reached the API")
+        detail = f"{len(results)}/{count} answered, median {statistics.median(results) * 1000:.1f}ms, {opened} new"
+        return PreflightCheck("connections", PASS if len(results) == count else WARN, detail)
+    
+    async def _check_clock(self) -> PreflightCheck:
+        """Measure the offset again and compare it with the one the countdown has been using
+        
+        The countdown keeps its offset unless the new sample drifted past
+        max_clock_drift_ms and is precise enough to trust (error bound within
+        max_clock_sample_error_ms) - a single noisy sample must not move the
+        drop instant this close to the drop.
+        """
+        time_sync = self.sniper.time_sync
+        sample = await time_sync.measure_offset()
+        if sample is None:
+            return PreflightCheck("clock", WARN, f"no time source answered - keeping offset {time_sync.time_offset:+.3f}s")
+        offset, error = sample
+        error_ms = error * 1000
+        if not time_sync.last_sync:
+            time_sync.apply_offset(offset, error)
+            return PreflightCheck("clock", WARN if abs(offset) > 1.0 else PASS, f"offset {offset:+.3f}s (±{error_ms:.1f}ms)")
+        
+        previous = time_sync.time_offset
+        drift_ms = (offset - previous) * 1000
+        detail = f"offset {previous:+.3f}s, new sample {drift_ms:+.1f}ms away (±{error_ms:.1f}ms)"
+        if abs(drift_ms) <= self.settings.max_clock_drift_ms:
+            return PreflightCheck("clock", WARN if abs(previous) > 1.0 else PASS, detail)
+        if error_ms > self.settings.max_clock_sample_error_ms:
+            return PreflightCheck("clock", FAIL, detail + " - too noisy to correct, offset kept")
+        time_sync.apply_offset(offset, error)
+        return PreflightCheck("clock", WARN, detail + f" - corrected to {offset:+.3f}s")
+    
+    async def _check_loop_lag(self) -> PreflightCheck:
+        """Worst wake-up lag of a series of short sleeps"""
+        worst = 0.0
+        for _ in range(LAG_SAMPLES):
+            expected = time.perf_counter() + LAG_INTERVAL
+            await asyncio.sleep(LAG_INTERVAL)
+            worst = max(worst, time.perf_counter() - expected)
+        worst_ms = worst * 1000
+        detail = f"worst {worst_ms:.2f}ms over {LAG_SAMPLES} wake-ups"
+        return PreflightCheck("loop lag", FAIL if worst_ms > self.settings.max_loop_lag_ms else PASS, detail)
+    
+    def _check_fds(self, planned: int) -> Tuple[PreflightCheck, Optional[int]]:
+        """Free file descriptors against one connection per worker; also returns the worker cap"""
+        if resource is None:
+            return PreflightCheck("file descriptors", PASS, "no limit on this platform"), None
+        soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+        if soft == resource.RLIM_INFINITY:
+            return PreflightCheck("file descriptors", PASS, "unlimited"), None
+        try:
+            in_use = len(os.listdir('/proc/self/fd'))
+        except OSError:
+            in_use = 0
+        free = soft - in_use - FD_RESERVE
+        detail = f"{in_use}/{soft} in use, room for {max(0, free)} connections"
+        if free < 1:
+            return PreflightCheck("file descriptors", FAIL, detail), 1
+        return PreflightCheck("file descriptors", WARN if free < planned else PASS, detail), free
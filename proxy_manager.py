@@ -30,6 +30,9 @@ class ProxyManager:
         self.current_index = 0
         self.bad_proxies: Set[str] = set()
         
+        # Optional QuietWindow - health checks are deferred while it is active
+        self.quiet_window = None
+        
         # Initialize proxy info objects
         for proxy_url in proxy_list:
             self.proxies[proxy_url] = ProxyInfo(url=proxy_url)
@@ -54,7 +57,10 @@ class ProxyManager:
             if info.working and proxy not in self.bad_proxies
         ]
         
-        if not working_proxies:
+        if not working_proxies and self.quiet_window and self.quiet_window.active:
+            # No health checks during the burst - queue the recovery for afterwards
+            await self.quiet_window.submit("proxy_health_check", self._recover_proxies(), key="proxy_recovery")
+        elif not working_proxies:
             # Try to recover some bad proxies
             await self._recover_proxies()
             working_proxies = [
@@ -178,7 +184,10 @@ class ProxyManager:
         while True:
             try:
                 await asyncio.sleep(interval)
-                await self.test_all_proxies()
+                if self.quiet_window:
+                    await self.quiet_window.submit("proxy_health_check", self.test_all_proxies(), key="proxy_health_check")
+                else:
+                    await self.test_all_proxies()
             except Exception as e:
                 logger.error(f"Error in proxy health check: {e}")
                 await asyncio.sleep(60)  # Wait a minute before retrying
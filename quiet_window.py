@@ -0,0 +1,121 @@
+import time
+import asyncio
+import logging
+from collections import Counter
+from typing import Awaitable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class _DeferredLogHandler(logging.Handler):
+    """Root handler that holds records in memory while the quiet window is active"""
+    
+    def __init__(self, window: "QuietWindow"):
+        super().__init__(logging.NOTSET)
+        self.window = window
+        self.records: List[logging.LogRecord] = []
+    
+    def emit(self, record: logging.LogRecord):
+        if self.window._hold("log"):
+            self.records.append(record)
+
+class QuietWindow:
+    """Defer non-critical I/O from shortly before the drop until the burst ends
+    
+    While active, records sent to the root logger are held in memory instead of
+    being formatted and written, and notifications, proxy health checks and
+    other submitted coroutines are queued. release() replays the held log
+    records through the original handlers and then runs the queued work in
+    submission order, so during the burst the event loop only serves claims.
+    """
+    
+    def __init__(self, max_deferred: int = 100000):
+        self.max_deferred = max_deferred
+        self.active = False
+        self.depth = 0
+        self.dropped = 0
+        self.deferred = Counter()
+        self._queue: List[tuple] = []
+        self._keys = set()
+        self._log_handler: Optional[_DeferredLogHandler] = None
+        self._saved_handlers: List[logging.Handler] = []
+        self._entered_at = 0.0
+    
+    def _hold(self, kind: str) -> bool:
+        """Count one deferred item, returning False when the queue is full"""
+        if self.depth >= self.max_deferred:
+            self.dropped += 1
+            return False
+        self.depth += 1
+        self.deferred[kind] += 1
+        return True
+    
+    def enter(self):
+        """Start holding log output and queueing non-critical work"""
+        if self.active:
+            return
+        logger.info("🤫 Quiet window active - deferring logs, notifications and health checks")
+        self.depth = 0
+        self.dropped = 0
+        self.deferred = Counter()
+        
+        root_logger = logging.getLogger()
+        self._saved_handlers = list(root_logger.handlers)
+        self._log_handler = _DeferredLogHandler(self)
+        root_logger.handlers = [self._log_handler]
+        self._entered_at = time.perf_counter()
+        self.active = True
+    
+    async def submit(self, kind: str, work: Awaitable, key: Optional[str] = None):
+        """Run work now, or queue it until release() while the window is active
+        
+        Work submitted with a key that is already queued is discarded.
+        """
+        if not self.active:
+            await work
+            return
+        if (key is not None and key in self._keys) or not self._hold(kind):
+            if asyncio.iscoroutine(work):
+                work.close()
+            return
+        if key is not None:
+            self._keys.add(key)
+        self._queue.append((kind, work))
+    
+    async def release(self) -> Optional[dict]:
+        """Restore logging, run the deferred work and return what was held"""
+        if not self.active:
+            return None
+        self.active = False
+        held_for = time.perf_counter() - self._entered_at
+        
+        # Replay held records through the original handlers with their original timestamps
+        root_logger = logging.getLogger()
+        root_logger.handlers = self._saved_handlers
+        for record in self._log_handler.records:
+            for handler in self._saved_handlers:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+        self._log_handler = None
+        self._saved_handlers = []
+        
+        queue, self._queue = self._queue, []
+        self._keys.clear()
+        for kind, work in queue:
+            try:
+                await work
+            except Exception as e:
+                logger.warning(f"Deferred {kind} failed: {e}")
+        
+        report = {
+            'held_seconds': round(held_for, 3),
+            'depth': self.depth,
+            'dropped': self.dropped,
+            'deferred': dict(self.deferred),
+        }
+        logger.info(
+            f"🔊 Quiet window released after {held_for:.1f}s - deferred queue depth {self.depth} "
+            f"({', '.join(f'{count} {kind}' for kind, count in self.deferred.items()) or 'nothing deferred'})"
+            + (f", {self.dropped} dropped" if self.dropped else "")
+        )
+        self.depth = 0
+        return report
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Post-snipe analysis of attempt telemetry
+
+Loads one or more telemetry ring buffers (snipe.telemetry_path, one per
+shard) straight into NumPy structured arrays and works on whole columns, so
+sessions with millions of attempts are analysed in seconds:
+
+- latency percentiles by token, connection and status
+- attempts per second (and 429s) over time
+- first-wave arrival spread relative to the drop instant
+- 429 onset
+- achieved versus planned request rate
+
+Bursts are split using the marker record each burst writes, so a long
+multi-target session is reported burst by burst. NumPy (in requirements.txt)
+is only needed here, so the sniper itself still runs without it.
+"""
+
+import csv
+import json
+import logging
+from typing import List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from telemetry import BURST_MARKER, HEADER_SIZE, RECORD, TelemetryReader, status_name
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (50, 90, 99)
+
+def _record_dtype():
+    dtype = np.dtype([
+        ('seq', '<u8'), ('planned', '<f8'), ('sent', '<f8'), ('first_byte', '<f8'), ('completed', '<f8'),
+        ('status', '<i2'), ('token', '<u2'), ('worker', '<u2'), ('connection', '<u8'),
+        ('dns_ms', '<f4'), ('connect_ms', '<f4'), ('tls_ms', '<f4'), ('_pad', 'V6')
+    ])
+    assert dtype.itemsize == RECORD.size
+    return dtype
+
+def require_numpy():
+    if np is None:
+        raise RuntimeError("The report needs NumPy - install it with: pip install numpy")
+
+def load_attempts(path: str):
+    """All records still in one telemetry file (in slot order) with times converted to Unix time"""
+    require_numpy()
+    reader = TelemetryReader(path)
+    try:
+        header = reader.header()
+        raw = np.frombuffer(reader.buffer, dtype=_record_dtype(), count=header['capacity'], offset=HEADER_SIZE).copy()
+        written = reader.written()
+    finally:
+        reader.close()
+    
+    # Slots hold seq % capacity; anything outside the last `capacity` seqs was never written or got lapped
+    oldest = max(0, written - header['capacity'])
+    slots = np.arange(header['capacity'], dtype='<u8')
+    valid = (raw['seq'] >= oldest) & (raw['seq'] < written) & (raw['seq'] % header['capacity'] == slots)
+    records = raw[valid]
+    
+    t0_wall = header['t0_wall']
+    for name in ('planned', 'sent', 'first_byte'):
+        column = records[name]
+        column[column != 0] += t0_wall
+    records['completed'] += t0_wall
+    return records
+
+def _percentile_table(keys, latency, by_latency) -> List[dict]:
+    """Count and latency percentiles per distinct key
+    
+    by_latency is argsort(latency), shared by every breakdown; a stable sort of
+    the keys in that order leaves each group sorted by latency, so no group
+    needs a sort of its own.
+    """
+    if len(keys) == 0:
+        return []
+    order = by_latency[np.argsort(keys[by_latency], kind='stable')]
+    keys, latency = keys[order], latency[order]
+    unique, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+    rows = {'key': unique, 'count': counts}
+    for p in PERCENTILES:
+        rows[f'p{p}_ms'] = latency[starts + np.floor((counts - 1) * p / 100).astype(np.int64)]
+    rows['max_ms'] = latency[starts + counts - 1]
+    return [
+        {name: (value.item() if hasattr(value, 'item') else value) for name, value in zip(rows, values)}
+        for values in zip(*rows.values())
+    ]
+
+def _round(value: Optional[float], digits: int = 2) -> Optional[float]:
+    return None if value is None else round(float(value), digits)
+
+def analyse_burst(attempts, sources, marker, bin_seconds: float = 1.0) -> dict:
+    """Report for the attempts of one burst
+    
+    sources holds the telemetry file index of every attempt (workers are only
+    unique within one file); marker is the burst's marker record, or None when
+    it was already overwritten.
+    """
+    worker_keys = sources.astype(np.int64) * 0x10000 + attempts['worker']
+    sent = attempts['sent']
+    answered = attempts[sent != 0]
+    latency = (answered['completed'] - answered['sent']) * 1000
+    status = attempts['status']
+    
+    if marker is not None:
+        started, drop_at, ends = marker['planned'], marker['sent'], marker['completed']
+        # Shards of one run share the marker of whichever shard is kept; count every worker seen
+        workers, delay_ms = max(int(marker['worker']), int(np.unique(worker_keys).size)), float(marker['dns_ms'])
+    else:
+        started, drop_at, ends = float(attempts['planned'].min()), None, float(attempts['completed'].max())
+        workers, delay_ms = int(np.unique(worker_keys).size), None
+    
+    report = {
+        'started': _round(started, 3),
+        'drop_at': _round(drop_at, 3),
+        'attempts': int(len(attempts)),
+        'workers': workers,
+        'statuses': {status_name(int(code)): int(count) for code, count in zip(*np.unique(status, return_counts=True))},
+    }
+    if not len(attempts):
+        return report
+    
+    # Latency breakdowns
+    report['latency_ms'] = {f'p{p}': _round(np.percentile(latency, p)) for p in PERCENTILES} if len(latency) else {}
+    by_latency = np.argsort(latency)
+    report['by_token'] = _percentile_table(answered['token'].astype(np.int64), latency, by_latency)
+    report['by_status'] = _percentile_table(answered['status'].astype(np.int64), latency, by_latency)
+    for row in report['by_status']:
+        row['key'] = status_name(row['key'])
+    report['by_connection'] = _percentile_table(answered['connection'], latency, by_latency)
+    report['new_connections'] = int(np.count_nonzero(attempts['connect_ms']))
+    send_lag = (answered['sent'] - answered['planned']) * 1000
+    report['send_lag_ms'] = {f'p{p}': _round(np.percentile(send_lag, p)) for p in PERCENTILES} if len(send_lag) else {}
+    
+    # Attempts and 429s per time bin from the burst start
+    bins = np.floor((attempts['completed'] - started) / bin_seconds).clip(0).astype(np.int64)
+    per_bin = np.bincount(bins)
+    limited_bins = np.bincount(bins[status == 429], minlength=len(per_bin))
+    report['timeline'] = [
+        {'t': round(i * bin_seconds, 3), 'attempts': int(count), 'rate_limited': int(limited)}
+        for i, (count, limited) in enumerate(zip(per_bin, limited_bins))
+    ]
+    
+    # First wave: each worker's first attempt, arrival estimated halfway between send and first byte
+    reference = drop_at if drop_at is not None else started
+    planned_at = attempts['planned']
+    _, worker_index = np.unique(worker_keys, return_inverse=True)
+    first_planned = np.full(worker_index.max() + 1, np.inf)
+    np.minimum.at(first_planned, worker_index, planned_at)
+    wave = attempts[planned_at == first_planned[worker_index]]
+    wave = wave[(wave['sent'] != 0) & (wave['first_byte'] != 0)]
+    if len(wave):
+        arrival = ((wave['sent'] + wave['first_byte']) / 2 - reference) * 1000
+        report['first_wave'] = {
+            'workers': int(len(wave)),
+            'earliest_ms': _round(arrival.min()),
+            'median_ms': _round(np.median(arrival)),
+            'latest_ms': _round(arrival.max()),
+            'spread_ms': _round(arrival.max() - arrival.min()),
+            'relative_to': "drop instant" if drop_at is not None else "burst start",
+        }
+    
+    # 429 onset: first 429 and the first bin where most answers were 429s
+    limited = attempts['completed'][status == 429]
+    onset = None
+    if len(limited):
+        majority = np.nonzero((per_bin > 0) & (limited_bins * 2 >= per_bin))[0]
+        onset = {
+            'first_ms': _round((limited.min() - reference) * 1000),
+            'majority_bin_s': round(float(majority[0] * bin_seconds), 3) if len(majority) else None,
+        }
+    report['rate_limit_onset'] = onset
+    
+    # Achieved against planned rate (workers each sending once per request delay)
+    active = float(attempts['completed'].max() - max(started, float(attempts['planned'].min())))
+    achieved = len(attempts) / active if active > 0 else 0.0
+    planned = workers * 1000.0 / delay_ms if delay_ms else None
+    report['rate'] = {
+        'achieved_per_second': _round(achieved, 1),
+        'planned_per_second': _round(planned, 1),
+        'achieved_share': _round(achieved / planned, 3) if planned else None,
+        'planned_seconds': _round(ends - started, 3),
+    }
+    return report
+
+def build_report(paths: List[str], bin_seconds: float = 1.0) -> dict:
+    """Analyse every burst in the given telemetry files (shards of one run are merged by time)"""
+    require_numpy()
+    loaded = [load_attempts(path) for path in paths]
+    records = np.concatenate(loaded)
+    sources = np.concatenate([np.full(len(part), i, dtype=np.int64) for i, part in enumerate(loaded)])
+    is_marker = records['status'] == BURST_MARKER
+    markers = records[is_marker]
+    attempts, sources = records[~is_marker], sources[~is_marker]
+    
+    # Shards of one run each write a marker for the same burst; keep one per drop instant
+    if len(markers):
+        _, keep = np.unique(np.round(markers['sent'], 2), return_index=True)
+        markers = markers[keep]
+        markers = markers[np.argsort(markers['planned'], kind='stable')]
+    
+    bursts = []
+    if len(markers):
+        owner = np.searchsorted(markers['planned'], attempts['planned'], side='right') - 1
+        order = np.argsort(owner, kind='stable')
+        owner_sorted = owner[order]
+        # Attempts from before the oldest surviving marker belong to a burst whose marker was overwritten
+        orphans = order[:np.searchsorted(owner_sorted, 0)]
+        if len(orphans):
+            bursts.append(analyse_burst(attempts[orphans], sources[orphans], None, bin_seconds))
+        for i, marker in enumerate(markers):
+            lo, hi = np.searchsorted(owner_sorted, [i, i + 1])
+            members = order[lo:hi]
+            bursts.append(analyse_burst(attempts[members], sources[members], marker, bin_seconds))
+    elif len(attempts):
+        bursts.append(analyse_burst(attempts, sources, None, bin_seconds))
+    
+    return {
+        'files': list(paths),
+        'attempts': int(len(attempts)),
+        'bin_seconds': bin_seconds,
+        'bursts': bursts,
+    }
+
+def export_json(report: dict, path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+def export_csv(report: dict, prefix: str) -> List[str]:
+    """Write <prefix>.latency.csv (every breakdown row) and <prefix>.timeline.csv; returns the paths"""
+    latency_path, timeline_path = f"{prefix}.latency.csv", f"{prefix}.timeline.csv"
+    with open(latency_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['burst', 'group', 'key', 'count'] + [f'p{p}_ms' for p in PERCENTILES] + ['max_ms'])
+        for i, burst in enumerate(report['bursts']):
+            for group in ('by_token', 'by_status', 'by_connection'):
+                for row in burst.get(group, []):
+                    writer.writerow([i, group[3:], row['key'], row['count']] + [row[f'p{p}_ms'] for p in PERCENTILES] + [row['max_ms']])
+    with open(timeline_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['burst', 't', 'attempts', 'rate_limited'])
+        for i, burst in enumerate(report['bursts']):
+            for row in burst.get('timeline', []):
+                writer.writerow([i, row['t'], row['attempts'], row['rate_limited']])
+    return [latency_path, timeline_path]
+
+def print_report(report: dict, console, top: int = 10):
+    """Terminal summary with rich tables"""
+    from datetime import datetime, timezone
+    from rich.table import Table
+    
+    console.print(f"[bold]📈 {report['attempts']} attempts in {len(report['bursts'])} burst(s)[/bold] from {', '.join(report['files'])}")
+    for i, burst in enumerate(report['bursts'], 1):
+        when = datetime.fromtimestamp(burst['started'], timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')
+        console.print(f"\n[bold cyan]Burst {i}[/bold cyan] - {when}, {burst['attempts']} attempts, {burst['workers']} workers")
+        if not burst['attempts']:
+            continue
+        console.print("  Statuses: " + ", ".join(f"{count} × {name}" for name, count in burst['statuses'].items()))
+        latency = burst['latency_ms']
+        if latency:
+            console.print(f"  Latency: p50 {latency['p50']}ms  p90 {latency['p90']}ms  p99 {latency['p99']}ms")
+        lag = burst['send_lag_ms']
+        if lag:
+            console.print(f"  Send lag behind plan: p50 {lag['p50']}ms  p99 {lag['p99']}ms  ({burst['new_connections']} new connections)")
+        wave = burst.get('first_wave')
+        if wave:
+            console.print(
+                f"  First wave ({wave['workers']} workers, vs {wave['relative_to']}): {wave['earliest_ms']:+.1f}ms → "
+                f"{wave['latest_ms']:+.1f}ms, spread {wave['spread_ms']:.1f}ms"
+            )
+        onset = burst['rate_limit_onset']
+        if onset:
+            majority = f", mostly 429 from {onset['majority_bin_s']}s" if onset['majority_bin_s'] is not None else ""
+            console.print(f"  First 429 at {onset['first_ms']:+.0f}ms{majority}")
+        else:
+            console.print("  No 429s")
+        rate = burst['rate']
+        planned = f"{rate['planned_per_second']:.0f}/s planned ({rate['achieved_share']:.0%})" if rate['planned_per_second'] else "no planned limit (0ms delay)"
+        console.print(f"  Rate: {rate['achieved_per_second']:.0f}/s achieved, {planned}")
+        
+        for group, title in (('by_token', "Token"), ('by_status', "Status"), ('by_connection', "Slowest connections")):
+            rows = burst[group]
+            if group == 'by_connection':
+                rows = sorted(rows, key=lambda row: -row['p99_ms'])[:top]
+            table = Table(title=title, show_header=True, header_style="bold magenta")
+            for column in ("Key", "Count", "p50 ms", "p90 ms", "p99 ms", "Max ms"):
+                table.add_column(column, justify="left" if column == "Key" else "right")
+            for row in rows:
+                key = f"#{row['key'] + 1}" if group == 'by_token' else (f"{row['key']:x}"[-8:] if group == 'by_connection' else row['key'])
+                table.add_row(str(key), str(row['count']), *(f"{row[name]:.1f}" for name in ('p50_ms', 'p90_ms', 'p99_ms', 'max_ms')))
+            console.print(table)
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Multi-target scheduling
+
+One UsernameSniper serves many (username, drop time) jobs. The sniper's HTTP
+session, warm connections, time sync, TLS sessions and token health are
+shared by every job. Jobs wait in a priority queue of burst start deadlines;
+before each burst the scheduler lays all pending windows on one timeline and
+gives every instant to the highest-priority open window, so overlapping
+bursts are resolved by priority instead of by whichever process started
+first. A job that is interrupted by a higher-priority burst resumes for
+whatever is left of its own window afterwards.
+"""
+
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+from config import AppConfig
+from sniper import UsernameSniper, SnipeResult, SnipeOutcome
+from window_planner import DropWindow, BurstSegment
+
+logger = logging.getLogger(__name__)
+
+# How long before the burst starts the sniper takes over (setup, DNS refresh, quiet window, GC freeze)
+PREPARE_MARGIN_SECONDS = 5.0
+
+# Timeline slots shorter than this are not worth a burst of their own
+MIN_SLOT_SECONDS = 0.05
+
+@dataclass
+class SnipeJob:
+    """One username to claim at one drop time"""
+    username: str
+    drop_time: datetime
+    priority: int = 0  # Higher wins when bursts overlap
+    job_id: int = 0
+    start: Optional[datetime] = None  # Burst window, filled in by the scheduler
+    end: Optional[datetime] = None
+    results: List[SnipeResult] = field(default_factory=list)
+    done: bool = False
+    armed_at: float = 0.0  # perf_counter() when the job was added
+    ready_ms: Optional[float] = None  # Time from add() until the job was part of the plan
+    
+    def __lt__(self, other: "SnipeJob") -> bool:
+        return (self.start, -self.priority, self.job_id) < (other.start, -other.priority, other.job_id)
+    
+    @property
+    def result(self) -> SnipeResult:
+        """All bursts fired for this job combined into one result"""
+        if not self.results:
+            return SnipeResult(
+                success=False,
+                username=self.username,
+                attempts=0,
+                total_time=0,
+                error_message="Pre-empted by higher-priority targets",
+                outcome=SnipeOutcome.PREEMPTED
+            )
+        return replace(
+            self.results[-1],
+            attempts=sum(r.attempts for r in self.results),
+            total_time=sum(r.total_time for r in self.results)
+        )
+
+@dataclass
+class ScheduleSlot:
+    """A stretch of the timeline owned by one job"""
+    job: SnipeJob
+    start: datetime
+    end: datetime
+    
+    @property
+    def duration(self) -> float:
+        return (self.end - self.start).total_seconds()
+
+def plan_slots(jobs: List[SnipeJob], now: Optional[datetime] = None) -> List[ScheduleSlot]:
+    """Assign every instant of the combined timeline to the highest-priority open job
+    
+    Ties go to the earlier drop time. Jobs sorted by start are swept once while a
+    heap holds the jobs whose window is open, so planning is O(n log n).
+    """
+    ordered = sorted(jobs, key=lambda job: job.start)
+    boundaries = sorted({t for job in ordered for t in (job.start, job.end) if now is None or t > now})
+    if now is not None:
+        boundaries.insert(0, now)
+    
+    slots: List[ScheduleSlot] = []
+    open_jobs: List[tuple] = []
+    next_job = 0
+    for t, t_next in zip(boundaries, boundaries[1:]):
+        while next_job < len(ordered) and ordered[next_job].start <= t:
+            job = ordered[next_job]
+            heapq.heappush(open_jobs, (-job.priority, job.drop_time, job.job_id, job))
+            next_job += 1
+        while open_jobs and open_jobs[0][3].end <= t:
+            heapq.heappop(open_jobs)
+        if not open_jobs:
+            continue
+        
+        owner = open_jobs[0][3]
+        if slots and slots[-1].job is owner and slots[-1].end == t:
+            slots[-1].end = t_next
+        else:
+            slots.append(ScheduleSlot(owner, t, t_next))
+    return [slot for slot in slots if slot.duration >= MIN_SLOT_SECONDS]
+
+class MultiTargetScheduler:
+    """Run many snipe jobs through one warm sniper"""
+    
+    def __init__(self, config: AppConfig, sniper: Optional[UsernameSniper] = None):
+        self.config = config
+        self.sniper = sniper or UsernameSniper(config)
+        self.lead = timedelta(milliseconds=400)
+        self.burst = timedelta(seconds=config.snipe.burst_duration_seconds)
+        self.jobs: Dict[int, SnipeJob] = {}
+        self._deadlines: List[SnipeJob] = []  # heap ordered by burst start
+        self._ids = itertools.count(1)
+        self._changed = asyncio.Event()
+        self._stopping = False
+        self.current: Optional[SnipeJob] = None
+        
+        # Called with (job, event) for "ready", "running", "paused" (pre-empted, waiting for its next slot) and "done"
+        self.on_job_update: Optional[Callable[[SnipeJob, str], None]] = None
+    
+    def add(self, username: str, drop_time: datetime, priority: int = 0, job_id: Optional[int] = None) -> SnipeJob:
+        """Queue a job; it is picked up at the next planning step even while another burst runs"""
+        start = drop_time - self.lead
+        job = SnipeJob(
+            username=username,
+            drop_time=drop_time,
+            priority=priority,
+            job_id=job_id if job_id is not None else next(self._ids),
+            start=start,
+            end=start + self.burst,
+            armed_at=time.perf_counter()
+        )
+        self.jobs[job.job_id] = job
+        heapq.heappush(self._deadlines, job)
+        self._changed.set()
+        logger.info(f"📥 Job {job.job_id}: {username} at {drop_time.strftime('%Y-%m-%d %H:%M:%S UTC')} (priority {priority})")
+        return job
+    
+    def cancel(self, job_id: int) -> bool:
+        """Drop a job that has not finished; a burst already running for it is not interrupted"""
+        job = self.jobs.get(job_id)
+        if not job or job.done:
+            return False
+        job.done = True
+        self._changed.set()
+        logger.info(f"🗑️ Job {job_id} ({job.username}) cancelled")
+        return True
+    
+    def _notify(self, job: SnipeJob, event: str):
+        if self.on_job_update:
+            try:
+                self.on_job_update(job, event)
+            except Exception as e:
+                logger.warning(f"Job update handler failed for job {job.job_id}: {e}")
+    
+    def stop(self):
+        """Make run() return once the current burst (if any) ends"""
+        self._stopping = True
+        self._changed.set()
+    
+    def pending(self) -> List[SnipeJob]:
+        """Jobs still waiting, earliest burst first"""
+        while self._deadlines and self._deadlines[0].done:
+            heapq.heappop(self._deadlines)
+        return sorted(job for job in self._deadlines if not job.done)
+    
+    async def _wait(self, seconds: float) -> bool:
+        """Sleep up to `seconds`; True if the job set changed in the meantime"""
+        self._changed.clear()
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout=max(0.0, seconds))
+            return True
+        except asyncio.TimeoutError:
+            return False
+    
+    def _prepare_lead(self) -> float:
+        """Seconds before a burst the sniper must take over"""
+        leads = [lead for lead, _ in self.sniper._critical_phases()]
+        return max(leads, default=0.0) + PREPARE_MARGIN_SECONDS
+    
+    def next_prepare_in(self) -> Optional[float]:
+        """Seconds until the sniper takes over for the earliest pending burst (None if nothing is pending)"""
+        pending = self.pending()
+        if not pending:
+            return None
+        now = self.sniper.time_sync.get_accurate_time()
+        return (pending[0].start - now).total_seconds() - self._prepare_lead()
+    
+    def _expire(self, now: datetime):
+        """Finish jobs whose whole window passed without getting a slot"""
+        for job in self.pending():
+            if job.end <= now:
+                job.done = True
+                if not job.results:
+                    logger.warning(f"⏭️ Job {job.job_id} ({job.username}) never got a burst - pre-empted by higher-priority targets")
+                self._notify(job, "done")
+    
+    async def run(self, forever: bool = False) -> List[SnipeResult]:
+        """Serve queued jobs until none are left (or until stop() when forever is set)"""
+        async with self.sniper:
+            if self.sniper.time_sync.should_resync():
+                await self.sniper.time_sync.sync_time()
+            
+            while not self._stopping:
+                now = self.sniper.time_sync.get_accurate_time()
+                self._expire(now)
+                pending = self.pending()
+                if not pending:
+                    if not forever:
+                        break
+                    await self._wait(3600)
+                    continue
+                
+                slots = plan_slots(pending, now)
+                for job in pending:
+                    if job.ready_ms is None:
+                        job.ready_ms = (time.perf_counter() - job.armed_at) * 1000
+                        self._notify(job, "ready")
+                if not slots:
+                    await self._wait(MIN_SLOT_SECONDS)
+                    continue
+                
+                # Sleep until the sniper must take over; a new or cancelled job means re-planning
+                slot = slots[0]
+                wake_in = (slot.start - now).total_seconds() - self._prepare_lead()
+                if wake_in > 0:
+                    await self._wait(wake_in)
+                    continue
+                
+                await self._run_slot(slot)
+        
+        return [job.result for job in self.jobs.values()]
+    
+    async def _run_slot(self, slot: ScheduleSlot):
+        """Fire one burst for the slot owner and decide whether its job is finished"""
+        job = slot.job
+        self.current = job
+        window = DropWindow(drop_time=job.drop_time, start=slot.start, end=slot.end)
+        logger.info(
+            f"🎯 Job {job.job_id} ({job.username}): burst {slot.start.strftime('%H:%M:%S.%f')[:-3]} → "
+            f"{slot.end.strftime('%H:%M:%S.%f')[:-3]} ({slot.duration:.1f}s)"
+        )
+        self._notify(job, "running")
+        try:
+            result = await self.sniper.snipe_at_time(job.drop_time, job.username, segment=BurstSegment(windows=[window]))
+        finally:
+            self.current = None
+        job.results.append(result)
+        
+        # Tokens that just claimed a name must not change their name again for another job
+        if result.success and self.sniper.claimed_token is not None:
+            self.sniper.token_health.kill(self.sniper.claimed_token, f"now owns {job.username}")
+        
+        if result.outcome != SnipeOutcome.WINDOW_ELAPSED or slot.end >= job.end:
+            job.done = True
+            logger.info(f"🏁 Job {job.job_id} ({job.username}) finished: {result.outcome}")
+            self._notify(job, "done")
+        else:
+            self._notify(job, "paused")
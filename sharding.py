@@ -0,0 +1,411 @@
+#!/usr/bin/env python3
+"""
+Multi-process sharded sniping
+
+Each shard is a separate process with its own event loop, HTTP session and
+token subset. Shards are coordinated through shared memory: a common
+monotonic launch deadline, a shared stop flag and per-shard attempt counters.
+"""
+
+import os
+import copy
+import time
+import queue
+import asyncio
+import logging
+import multiprocessing
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from config import AppConfig
+from sniper import UsernameSniper, SnipeResult, SnipeOutcome, lookup_owner
+from time_sync import TimeSync
+from telemetry import shard_path
+from history import record_run_async
+
+logger = logging.getLogger(__name__)
+
+# Outcomes that end every shard when any one of them sees it (shared flag value = index + 1)
+SHARED_OUTCOMES = [SnipeOutcome.CLAIMED, SnipeOutcome.TAKEN, SnipeOutcome.NAME_INVALID]
+
+# Seconds shards are given to start up before the launch deadline
+SHARD_STARTUP_SECONDS = 3.0
+
+# How often a shard publishes its counters and checks for a sibling's stop during the burst
+SHARED_STATE_POLL_SECONDS = 0.01
+
+class ShardState:
+    """Shared-memory state visible to every shard process"""
+    
+    def __init__(self, ctx, shard_count: int, launch_deadline: float, drop_at: float):
+        self.launch_deadline = ctx.Value('d', launch_deadline, lock=False)  # time.monotonic()
+        self.drop_at = ctx.Value('d', drop_at, lock=False)  # time.time()
+        self.stop_code = ctx.Value('i', 0)
+        self.stop_shard = ctx.Value('i', -1, lock=False)
+        self.attempts = ctx.Array('q', shard_count, lock=False)
+    
+    def publish_stop(self, outcome: str, shard_index: int) -> bool:
+        """Set the shared stop flag if nobody has yet; returns True if this shard won the race"""
+        with self.stop_code.get_lock():
+            if self.stop_code.value:
+                return False
+            self.stop_code.value = SHARED_OUTCOMES.index(outcome) + 1
+            self.stop_shard.value = shard_index
+            return True
+    
+    def total_attempts(self) -> int:
+        """Attempts made by all shards so far"""
+        return sum(self.attempts)
+
+class _ShardSniper(UsernameSniper):
+    """UsernameSniper that mirrors its stop decisions through shared memory"""
+    
+    def __init__(self, config: AppConfig, shard_index: int, state: ShardState, original_owner: Optional[str] = None):
+        super().__init__(config)
+        self.shard_index = shard_index
+        self.state = state
+        self.original_owner = original_owner  # Looked up once by the parent; None = look it up here
+    
+    def _finish(self, outcome: str, detail: str):
+        if outcome in SHARED_OUTCOMES:
+            self.state.publish_stop(outcome, self.shard_index)
+        super()._finish(outcome, detail)
+    
+    async def _watch_shared_state(self):
+        """Publish this shard's counters and stop when a sibling reports a definitive outcome"""
+        while True:
+            self.state.attempts[self.shard_index] = self._burst_attempts
+            code = self.state.stop_code.value
+            if code and self._stop_event and not self._stop_event.is_set():
+                outcome = SHARED_OUTCOMES[code - 1]
+                super()._finish(outcome, f"Stopped by shard {self.state.stop_shard.value} ({outcome})")
+            await asyncio.sleep(SHARED_STATE_POLL_SECONDS)
+    
+    async def run(self, username: str) -> SnipeResult:
+        """Open connections, wait for the shared launch deadline and run the burst"""
+        await self._open_session()
+        await self._start_metrics()
+        try:
+            self._prepare_claims(username)
+            # Needed to tell a post-drop DUPLICATE apart from the old owner before publishing TAKEN
+            if self.original_owner is not None:
+                self._known_owners[username] = self.original_owner
+            await self._record_original_owner(username)
+            await self._pin_addresses()
+            for lead_seconds, enter in self._critical_phases():
+                await _sleep_until_monotonic(self.state.launch_deadline.value - lead_seconds)
+                await self._enter_phase(enter)
+            await _sleep_until_monotonic(self.state.launch_deadline.value)
+            woke_late = time.monotonic() - self.state.launch_deadline.value
+            watcher = asyncio.create_task(self._watch_shared_state())
+            try:
+                result = await self._start_sniping(username, self.state.drop_at.value, woke_late=woke_late)
+            finally:
+                watcher.cancel()
+            self.state.attempts[self.shard_index] = self._burst_attempts
+            await self._end_critical_phases(result)
+            return result
+        finally:
+            await self._end_critical_phases()
+            await self._stop_metrics()
+            await self.session.close()
+            if self.telemetry:
+                self.telemetry.close()
+                self.telemetry = None
+
+async def _sleep_until_monotonic(deadline: float):
+    """Coarse sleep followed by short sleeps to land close to a monotonic deadline"""
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        await asyncio.sleep(remaining - 0.05 if remaining > 0.1 else min(remaining, 0.001))
+
+async def _reap(processes, timeout: float = 1.0):
+    """Give the shard processes `timeout` seconds to exit, then terminate the rest (without blocking the loop)"""
+    deadline = time.monotonic() + timeout
+    while any(process.is_alive() for process in processes) and time.monotonic() < deadline:
+        await asyncio.sleep(0.01)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+        process.join(timeout=0)
+
+def _shard_main(shard_index: int, config: AppConfig, username: str, state: ShardState,
+                results, core: Optional[int], original_owner: Optional[str] = None):
+    """Entry point of a shard process"""
+    from logger import setup_logging, stop_logging
+    from event_loop import install_event_loop
+    
+    if core is not None and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, {core})
+        except OSError as e:
+            print(f"⚠️ Shard {shard_index}: could not pin to core {core}: {e}")
+    
+    setup_logging(log_level=config.log_level, debug_mode=config.debug_mode)
+    
+    install_event_loop(config.event_loop)
+    try:
+        result = asyncio.run(_ShardSniper(config, shard_index, state, original_owner).run(username))
+    except Exception as e:
+        result = SnipeResult(success=False, username=username, attempts=0, total_time=0.0, error_message=str(e))
+    stop_logging()
+    results.put((shard_index, asdict(result)))
+
+def merge_results(username: str, results: Dict[int, SnipeResult], expected: int, stop_index: int,
+                  attempts: int, unit: str = "shard") -> SnipeResult:
+    """Combine per-shard (or per-node) results into one SnipeResult"""
+    if not results:
+        return SnipeResult(
+            success=False,
+            username=username,
+            attempts=attempts,
+            total_time=0.0,
+            error_message=f"No {unit} reported a result"
+        )
+    
+    # The shard that raised the shared stop decided the outcome; otherwise the one that ran longest
+    origin = results.get(stop_index)
+    if origin is None:
+        origin = max(results.values(), key=lambda r: r.total_time)
+    
+    collections = [r.gc_collections for r in results.values() if r.gc_collections is not None]
+    
+    token_stats = []
+    for index in sorted(results):
+        for stats in results[index].token_stats or []:
+            token_stats.append(dict(stats, **{unit: index}))
+    
+    missing = expected - len(results)
+    error_message = origin.error_message
+    if missing:
+        error_message = f"{error_message or 'Completed'} ({missing} {unit}(s) did not report)"
+    
+    return SnipeResult(
+        success=any(r.success for r in results.values()),
+        username=username,
+        attempts=sum(r.attempts for r in results.values()),
+        total_time=max(r.total_time for r in results.values()),
+        error_message=None if origin.success else error_message,
+        outcome=origin.outcome,
+        token_stats=token_stats,
+        gc_collections=sum(collections) if collections else None,
+        deferred_work=_merge_deferred(results),
+        tls_stats=_merge_tls(results),
+        address_pinning=origin.address_pinning,
+        socket_profile=origin.socket_profile,
+        pool_stats=_merge_pool(results, unit),
+        timing=_merge_timing(results)
+    )
+
+def _merge_timing(results: Dict[int, SnipeResult]) -> Optional[dict]:
+    """Slowest shard's launch and first-wave latency, summed throughput and the worst clock error"""
+    timings = [r.timing for r in results.values() if r.timing]
+    if not timings:
+        return None
+    
+    def worst(key: str) -> Optional[float]:
+        values = [t[key] for t in timings if t[key] is not None]
+        return max(values) if values else None
+    
+    return {
+        'launch_ms': worst('launch_ms'),
+        'first_wave_ms': worst('first_wave_ms'),
+        'first_wave_spread_ms': worst('first_wave_spread_ms'),
+        'throughput': round(sum(t['throughput'] for t in timings), 1),
+        'clock_offset_ms': timings[0]['clock_offset_ms'],
+        'clock_error_ms': worst('clock_error_ms')
+    }
+
+def _merge_pool(results: Dict[int, SnipeResult], unit: str = "shard") -> Optional[dict]:
+    """Sum per-shard connection pool counters"""
+    stats = [r.pool_stats for r in results.values() if r.pool_stats]
+    if not stats:
+        return None
+    waited = sum(s['waited_for_connection'] for s in stats)
+    return {
+        'requests': sum(s['requests'] for s in stats),
+        'new_connections': sum(s['new_connections'] for s in stats),
+        'reused_connections': sum(s['reused_connections'] for s in stats),
+        'waited_for_connection': waited,
+        'mean_wait_ms': round(sum(s['mean_wait_ms'] * s['waited_for_connection'] for s in stats) / waited, 2) if waited else 0.0,
+        'max_wait_ms': max(s['max_wait_ms'] for s in stats),
+        'flagged_requests': [dict(r, **{unit: i}) for i, s in enumerate(stats) for r in s['flagged_requests']],
+    }
+
+def _merge_tls(results: Dict[int, SnipeResult]) -> Optional[dict]:
+    """Combine per-shard TLS resumption statistics"""
+    stats = [r.tls_stats for r in results.values() if r.tls_stats]
+    if not stats:
+        return None
+    handshakes = sum(s['handshakes'] for s in stats)
+    resumed = sum(s['resumed'] for s in stats)
+    return {
+        'handshakes': handshakes,
+        'resumed': resumed,
+        'hit_rate': round(resumed / handshakes, 3) if handshakes else 0.0,
+        'saved_ms': round(sum(s['saved_ms'] for s in stats), 1)
+    }
+
+def _merge_deferred(results: Dict[int, SnipeResult]) -> Optional[dict]:
+    """Sum what each shard's quiet window held back"""
+    reports = [r.deferred_work for r in results.values() if r.deferred_work]
+    if not reports:
+        return None
+    deferred = {}
+    for report in reports:
+        for kind, count in report['deferred'].items():
+            deferred[kind] = deferred.get(kind, 0) + count
+    return {
+        'held_seconds': max(report['held_seconds'] for report in reports),
+        'depth': sum(report['depth'] for report in reports),
+        'dropped': sum(report['dropped'] for report in reports),
+        'deferred': deferred
+    }
+
+def split_config(config: AppConfig, shards: int) -> List[AppConfig]:
+    """Give each shard a token subset plus a matching share of workers and attempt budget"""
+    tokens = config.snipe.bearer_tokens
+    configs = []
+    for i in range(shards):
+        shard_tokens = tokens[i::shards]
+        share = len(shard_tokens) / len(tokens)
+        
+        shard_config = copy.deepcopy(config)
+        shard_config.snipe.bearer_tokens = shard_tokens
+        shard_config.snipe.bearer_token = shard_tokens[0]
+        shard_config.snipe.concurrent_requests = max(1, round(config.snipe.concurrent_requests * share))
+        shard_config.snipe.max_snipe_attempts = max(1, int(config.snipe.max_snipe_attempts * share))
+        # Notifications are sent once by the parent
+        shard_config.discord.enabled = False
+        if config.snipe.telemetry_path:
+            shard_config.snipe.telemetry_path = shard_path(config.snipe.telemetry_path, i)
+        shard_config.metrics.port = config.metrics.port + i
+        configs.append(shard_config)
+    return configs
+
+class ShardedSniper:
+    """Run a snipe across several processes and merge the results"""
+    
+    def __init__(self, config: AppConfig, shards: Optional[int] = None, pin_cores: Optional[bool] = None):
+        self.config = config
+        requested = shards or config.snipe.shards
+        token_count = len(config.snipe.bearer_tokens)
+        self.shards = max(1, min(requested, token_count))
+        if self.shards < requested:
+            logger.warning(f"Only {token_count} tokens configured - running {self.shards} shards instead of {requested}")
+        self.pin_cores = config.snipe.pin_shards_to_cores if pin_cores is None else pin_cores
+        self.time_sync = TimeSync()
+    
+    async def snipe_at_time(self, drop_time: datetime, username: str) -> SnipeResult:
+        """Snipe a username at the specified time using every shard"""
+        await self.time_sync.sync_time()
+        launch_time = drop_time - timedelta(milliseconds=400)
+        launch_in = (launch_time - self.time_sync.get_accurate_time()).total_seconds()
+        if launch_in < SHARD_STARTUP_SECONDS:
+            logger.warning(f"Only {launch_in:.1f}s until launch - shards may start late")
+        original_owner = await self._resolve_owner(username)
+        result = await self.run(username, launch_in, launch_in + 0.4, original_owner)
+        if result.timing:
+            # Shards never sync their own clocks; the launch deadline came from this one
+            result.timing['clock_offset_ms'] = round(self.time_sync.time_offset * 1000, 3)
+            error = self.time_sync.offset_error
+            result.timing['clock_error_ms'] = round(error * 1000, 3) if error is not None else None
+        await record_run_async(self.config, result, drop_time, mode="sharded")
+        await self._notify_result(result)
+        return result
+    
+    async def _resolve_owner(self, username: str) -> Optional[str]:
+        """Look up the current owner once here instead of once per shard"""
+        if self.config.snipe.target_uuid:
+            return self.config.snipe.target_uuid.replace('-', '').lower()
+        async with aiohttp.ClientSession() as session:
+            return await lookup_owner(session, self.config.snipe.profile_api_base_url, username)
+    
+    async def run(self, username: str, launch_in: float, drop_in: Optional[float] = None,
+                  original_owner: Optional[str] = None) -> SnipeResult:
+        """Start the shard processes, wait for them and merge their results
+        
+        original_owner is the UUID holding the name ('' if unowned); when None each shard looks it up.
+        """
+        drop_in = launch_in if drop_in is None else drop_in
+        ctx = multiprocessing.get_context('spawn')
+        state = ShardState(ctx, self.shards, time.monotonic() + launch_in, time.time() + drop_in)
+        results = ctx.Queue()
+        cores = self._shard_cores()
+        
+        logger.info(f"🧩 Starting {self.shards} shard processes (launch in {launch_in:.1f}s)")
+        processes = []
+        for index, shard_config in enumerate(split_config(self.config, self.shards)):
+            process = ctx.Process(
+                target=_shard_main,
+                args=(index, shard_config, username, state, results, cores[index] if cores else None, original_owner),
+                name=f"sniper-shard-{index}",
+                daemon=True
+            )
+            process.start()
+            processes.append(process)
+        
+        monitor = asyncio.create_task(self._monitor(state, launch_in))
+        collected: Dict[int, SnipeResult] = {}
+        loop = asyncio.get_running_loop()
+        wait_seconds = launch_in + self.config.snipe.burst_duration_seconds + 30
+        try:
+            for _ in processes:
+                try:
+                    index, data = await loop.run_in_executor(None, results.get, True, wait_seconds)
+                except queue.Empty:
+                    logger.error("Timed out waiting for shard results")
+                    break
+                collected[index] = SnipeResult(**data)
+        finally:
+            monitor.cancel()
+            await _reap(processes)
+        
+        return self._merge(username, collected, state)
+    
+    def _shard_cores(self) -> Optional[List[int]]:
+        """Cores to pin shards to, round-robin over the cores this process may use"""
+        if not self.pin_cores or not hasattr(os, 'sched_getaffinity'):
+            return None
+        available = sorted(os.sched_getaffinity(0))
+        return [available[i % len(available)] for i in range(self.shards)]
+    
+    async def _monitor(self, state: ShardState, launch_in: float):
+        """Log aggregated attempt counters once the shards have launched"""
+        await asyncio.sleep(max(0.0, launch_in))
+        while True:
+            await asyncio.sleep(1)
+            logger.info(f"🧩 Shards: {state.total_attempts()} attempts so far")
+    
+    def _merge(self, username: str, results: Dict[int, SnipeResult], state: ShardState) -> SnipeResult:
+        """Combine per-shard results into one SnipeResult"""
+        return merge_results(username, results, self.shards, state.stop_shard.value, state.total_attempts())
+    
+    async def _notify_result(self, result: SnipeResult):
+        """Send the merged result to Discord"""
+        if not (self.config.discord.enabled and self.config.discord.webhook_url):
+            return
+        from discord_notifier import DiscordNotifier
+        
+        notifier = DiscordNotifier(
+            webhook_url=self.config.discord.webhook_url,
+            mention_role_id=self.config.discord.mention_role_id,
+            embed_color=self.config.discord.embed_color
+        )
+        try:
+            await notifier.notify_snipe_result(
+                username=result.username,
+                success=result.success,
+                attempts=result.attempts,
+                response_time=0,
+                error_message=result.error_message
+            )
+        except Exception as e:
+            logger.warning(f"Failed to send final Discord notification: {e}")
+        finally:
+            await notifier.close()
@@ -1,7 +1,12 @@
 import asyncio
 import aiohttp
+import copy
+import heapq
+import inspect
+import json
 import time
 import logging
+import statistics
 from datetime import datetime, timezone, timedelta
 from typing import Optional, List
 from dataclasses import dataclass
@@ -9,42 +14,190 @@ from dataclasses import dataclass
 from discord_notifier import DiscordNotifier
 from config import AppConfig
 from time_sync import TimeSync, AccurateTimer
-from collections import defaultdict
+from token_health import TokenHealthRegistry, TokenState, PERMANENT_FAILURES
+from pacing import AIMDController, AttemptBudget
+from memory_window import CriticalMemoryWindow
+from logger import AttemptLogAggregator
+from transport import (
+    AddressPinner, PinnedResolver, PoolMonitor, ResumingSSLContext, SocketTuner, TracedResponse, create_connector, pool_limits
+)
+from quiet_window import QuietWindow
+from window_planner import WindowPlanner, BurstSegment
+from preflight import Preflight, PreflightReport
+from telemetry import TelemetryWriter, AttemptTrace
+from history import record_run_async
+from metrics import AttemptMetrics, MetricsServer
 
 logger = logging.getLogger(__name__)
 
+# Minimum spacing between ownership lookups used to confirm a post-drop DUPLICATE
+OWNER_RECHECK_INTERVAL = 0.5
+
+# Longest a worker waiting on a held token sleeps before looking again
+ACQUIRE_POLL_SECONDS = 0.005
+
+# Claim requests are built once per burst and fixed-shape results are shared,
+# so the hot path allocates as little as possible while GC is disabled
+CLAIM_TIMEOUT = aiohttp.ClientTimeout(total=2)
+CLAIM_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+def _claim_headers(token: str) -> dict:
+    """Request headers for a claim made with the given token"""
+    return {
+        'Authorization': f'Bearer {token}',
+        'User-Agent': CLAIM_USER_AGENT,
+        'Content-Type': 'application/json',
+        'Accept': 'application/json'
+    }
+
+def _name_status(response_text: str) -> str:
+    """Extract the name status (DUPLICATE, NOT_ALLOWED, ...) from a claim response body"""
+    try:
+        data = json.loads(response_text)
+        details = data.get('details') if isinstance(data, dict) else None
+        if isinstance(details, dict) and details.get('status'):
+            return str(details['status']).upper()
+    except (ValueError, TypeError):
+        pass
+    
+    upper_text = (response_text or "").upper()
+    for status in ('DUPLICATE', 'NOT_ALLOWED'):
+        if status in upper_text:
+            return status
+    return ""
+
 class RateLimitTracker:
-    """Track rate limits per token to optimize request distribution"""
+    """Schedule tokens by the time they next become available
+    
+    Tokens are keyed by their index in the configured list and kept in a
+    min-heap of (ready_at, index) entries, so every attempt can pick the
+    token that is ready soonest in O(log n). Entries are invalidated lazily:
+    an entry is only honoured if it still matches the token's ready time.
+    """
     
-    def __init__(self):
-        self.token_limits = defaultdict(lambda: {'last_limited': 0, 'backoff_until': 0})
+    def __init__(self, token_count: int = 0, min_interval: float = 0.0):
+        self.reset(token_count, min_interval)
     
-    def is_token_limited(self, token: str) -> bool:
+    def reset(self, token_count: int, min_interval: float = 0.0):
+        """Start a new schedule with every token immediately available"""
+        self.min_interval = min_interval
+        self.intervals = [min_interval] * token_count
+        self.ready_at = [0.0] * token_count
+        self.last_limited = [0.0] * token_count
+        self.removed = [False] * token_count
+        self.held = [False] * token_count
+        self._heap = [(0.0, i) for i in range(token_count)]
+        heapq.heapify(self._heap)
+    
+    def is_token_limited(self, index: int) -> bool:
         """Check if a token is currently rate limited"""
-        token_key = token[-8:] if token else "default"
-        return time.time() < self.token_limits[token_key]['backoff_until']
+        return time.time() < self.ready_at[index]
     
-    def record_rate_limit(self, token: str, retry_after: float):
+    def record_rate_limit(self, index: int, retry_after: float):
         """Record a rate limit for a token"""
-        token_key = token[-8:] if token else "default"
-        self.token_limits[token_key]['last_limited'] = time.time()
-        self.token_limits[token_key]['backoff_until'] = time.time() + retry_after
-        logger.debug(f"Token ...{token_key} rate limited until {self.token_limits[token_key]['backoff_until']}")
+        now = time.time()
+        self.last_limited[index] = now
+        self.defer(index, now + retry_after)
+        logger.debug(f"Token #{index + 1} rate limited until {self.ready_at[index]:.3f}")
     
-    def get_best_token(self, tokens: list) -> str:
-        """Get the token with the least recent rate limiting"""
-        if not tokens:
-            return None
-        
-        # Filter out currently rate limited tokens
-        available_tokens = [t for t in tokens if not self.is_token_limited(t)]
-        
-        if not available_tokens:
-            # All tokens are rate limited, return the one that recovers soonest
-            return min(tokens, key=lambda t: self.token_limits[t[-8:]]['backoff_until'])
+    def defer(self, index: int, until: float):
+        """Keep a token out of the rotation until the given time"""
+        if self.removed[index] or until <= self.ready_at[index]:
+            return
+        self.ready_at[index] = until
+        heapq.heappush(self._heap, (until, index))
+    
+    def hold(self, index: int):
+        """Keep a token out of the rotation until release() - e.g. while its probe is in flight"""
+        self.held[index] = True
+    
+    def release(self, index: int):
+        """Make a token held back by hold() or defer() available again right away"""
+        self.held[index] = False
+        if self.removed[index]:
+            return
+        self.ready_at[index] = time.time()
+        heapq.heappush(self._heap, (self.ready_at[index], index))
+    
+    def remove(self, index: int):
+        """Take a token out of the rotation for good"""
+        self.removed[index] = True
+        self.held[index] = False
+    
+    def penalize(self, index: int, factor: float = 2.0, max_interval: float = 1.0):
+        """Multiplicatively widen the spacing between uses of a token"""
+        base = max(self.intervals[index], self.min_interval, 0.001)
+        self.intervals[index] = min(max_interval, base * factor)
+    
+    def relax(self, index: int, step: float = 0.001):
+        """Additively tighten a token's spacing back towards the base interval"""
+        self.intervals[index] = max(self.min_interval, self.intervals[index] - step)
+    
+    def get_best_token(self) -> Optional[int]:
+        """Get the index of the token that becomes available soonest"""
+        heap = self._heap
+        while heap:
+            ready_at, index = heap[0]
+            if self.removed[index] or self.held[index] or ready_at != self.ready_at[index]:
+                heapq.heappop(heap)  # Stale entry; release() pushes a held token back
+                continue
+            return index
+        return None
+    
+    async def acquire(self, deadline: float) -> Optional[int]:
+        """Wait for the next ready token and reserve it for one attempt
         
-        # Return token with oldest rate limit (or never limited)
-        return min(available_tokens, key=lambda t: self.token_limits[t[-8:]]['last_limited'])
+        Waits until the deadline while tokens are resting or held, since a release()
+        can bring one back early. Returns None once the deadline passes or every
+        token has been removed.
+        """
+        while True:
+            now = time.time()
+            if now >= deadline:
+                return None
+            
+            index = self.get_best_token()
+            if index is None:
+                if not any(self.held):
+                    return None
+                await asyncio.sleep(min(ACQUIRE_POLL_SECONDS, deadline - now))
+                continue
+            
+            ready_at = self.ready_at[index]
+            if ready_at > now:
+                wake = min(ready_at, deadline) - now
+                if any(self.held):
+                    # Check back often - the held token can come back before the resting ones
+                    wake = min(wake, ACQUIRE_POLL_SECONDS)
+                await asyncio.sleep(wake)
+                continue
+            
+            # Space out consecutive uses of the same token
+            heapq.heappop(self._heap)
+            self.ready_at[index] = now + self.intervals[index]
+            heapq.heappush(self._heap, (self.ready_at[index], index))
+            return index
+
+class SnipeOutcome:
+    """Reasons a burst ended, reported in SnipeResult.outcome"""
+    CLAIMED = "claimed"
+    TAKEN = "taken"  # Another account owns the name after the drop
+    NAME_INVALID = "name_invalid"  # Name rejected by the API (bad format / NOT_ALLOWED)
+    NO_ENTITLEMENT = "no_entitlement"  # No configured token owns Minecraft
+    TOKENS_EXHAUSTED = "tokens_exhausted"  # Every token was removed from the rotation
+    BUDGET_EXHAUSTED = "budget_exhausted"  # max_snipe_attempts were all spent
+    WINDOW_ELAPSED = "window_elapsed"  # Burst ran for its full duration
+    PREEMPTED = "preempted"  # A higher-priority target's burst covered this whole window
+    NO_GO = "no_go"  # Preflight failed and preflight.abort_on_no_go is set
+
+# Preallocated results for fixed-shape claim responses - shared, so never mutate them
+_RESULT_NAME_INVALID = {'success': False, 'error': 'Bad request - username invalid', 'status': 400, 'outcome': SnipeOutcome.NAME_INVALID}
+_RESULT_UNAUTHORIZED = {'success': False, 'error': 'Invalid bearer token', 'status': 401}
+_RESULT_TAKEN = {'success': False, 'error': 'Username taken', 'status': 403, 'outcome': SnipeOutcome.TAKEN}
+_RESULT_NOT_ALLOWED = {'success': False, 'error': 'Username not allowed', 'status': 403, 'outcome': SnipeOutcome.NAME_INVALID}
+_RESULT_COOLDOWN = {'success': False, 'error': 'Account on cooldown or username unavailable', 'status': 403}
+_RESULT_NO_ENTITLEMENT = {'success': False, 'error': 'Account does not own Minecraft', 'status': 404, 'outcome': SnipeOutcome.NO_ENTITLEMENT}
+_RESULT_TIMEOUT = {'success': False, 'error': 'Request timeout', 'status': 'timeout'}
 
 @dataclass
 class SnipeResult:
@@ -54,9 +207,45 @@ class SnipeResult:
     attempts: int
     total_time: float
     error_message: Optional[str] = None
+    outcome: Optional[str] = None
+    token_stats: Optional[List[dict]] = None
+    pacing_trajectory: Optional[List[dict]] = None
+    gc_collections: Optional[int] = None  # Collections inside the critical memory window
+    deferred_work: Optional[dict] = None  # What the quiet window held back during the burst
+    tls_stats: Optional[dict] = None  # TLS session resumption hit rate and handshake time saved
+    address_pinning: Optional[dict] = None  # Resolved API addresses, their connect latency and the pinned set
+    socket_profile: Optional[dict] = None  # Socket options configured and what each did on this host
+    pool_stats: Optional[dict] = None  # Connection pool usage, including requests that waited for a connection
+    setup_seconds: Optional[float] = None  # Time from the call until the sniper started waiting for the window
+    windows: Optional[List[dict]] = None  # Per-burst setup cost, attempts and outcome of a fallback run
+    cluster_nodes: Optional[List[dict]] = None  # Per-node clock offset, tokens, attempts and outcome of a cluster run
+    preflight: Optional[dict] = None  # Go/no-go report from the checks run ahead of the drop
+    timing: Optional[dict] = None  # Launch lag, first-wave latency, throughput and clock accuracy of the burst
+
+async def lookup_owner(session: aiohttp.ClientSession, profile_api_base_url: str, username: str) -> Optional[str]:
+    """Return the UUID owning a username, '' if it is unowned, or None if the lookup failed"""
+    url = f"{profile_api_base_url}/users/profiles/minecraft/{username}"
+    try:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=2)) as response:
+            if response.status == 200:
+                data = await response.json(content_type=None)
+                owner = (data or {}).get('id', '')
+                return owner.replace('-', '').lower() or None
+            if response.status in (204, 404):
+                return ""
+            logger.debug(f"Owner lookup for {username} returned {response.status}")
+    except Exception as e:
+        logger.debug(f"Owner lookup for {username} failed: {e}")
+    return None
 
 class UsernameSniper:
-    """Simple username sniper - countdown and claim"""
+    """Simple username sniper - countdown and claim
+    
+    Used as an async context manager the HTTP and Discord sessions stay open
+    across snipe_at_time calls, so later windows reuse warm connections, the
+    time sync, owner lookup and token health of earlier ones. Without it every
+    call opens and closes its own sessions.
+    """
     
     def __init__(self, config: AppConfig):
         self.config = config
@@ -64,6 +253,7 @@ class UsernameSniper:
         self.session = None
         self.proxy_manager = None
         self.is_running = False
+        self._opened = False
         
         # Initialize time synchronization
         self.time_sync = TimeSync()
@@ -72,8 +262,80 @@ class UsernameSniper:
         # Initialize rate limiting tracker
         self.rate_limit_tracker = RateLimitTracker()
         
+        # Per-token circuit breakers (created for the configured tokens at burst start)
+        self.token_health = None
+        
+        # AIMD pacing controller (only when adaptive_delays is enabled)
+        self.pacing = None
+        
+        # Shared attempt budget enforcing max_snipe_attempts across all workers
+        # (kept across every burst of a multi-window plan while _share_budget is set)
+        self.budget = None
+        self._share_budget = False
+        self._plan_budget = None
+        
+        # GC freeze and deferred non-critical I/O around the drop, and the claim URL/headers prepared before it
+        self.memory_window = CriticalMemoryWindow()
+        self.quiet_window = QuietWindow()
+        
+        # TLS sessions are kept for the sniper's lifetime so every new connection can resume
+        self.tls_context = ResumingSSLContext() if self.config.snipe.tls_session_resumption else None
+        
+        # Socket options applied to every claim connection, and trace hooks watching the pool
+        self.socket_tuner = SocketTuner(self.config.socket)
+        self.pool_monitor = PoolMonitor()
+        
+        # API addresses are resolved and probed ahead of the drop so the burst never waits on DNS
+        # (replace address_pinner.lookup to resolve through a stub)
+        self.resolver = None
+        self.address_pinner = None
+        if self.config.snipe.dns_pinning:
+            self.resolver = PinnedResolver()
+            self.address_pinner = AddressPinner(
+                self.config.snipe.api_base_url,
+                self.resolver,
+                ssl_context=self.tls_context,
+                pin_count=self.config.snipe.dns_pin_addresses
+            )
+        
+        # Per-attempt results are counted and logged as one summary per second
+        self.attempt_log = AttemptLogAggregator(logger)
+        
+        # Every attempt's timings go to a memory-mapped ring buffer when telemetry_path is set
+        self.telemetry = None
+        
+        # Prometheus counters bumped by the workers, served while the sessions are open
+        self.metrics = AttemptMetrics() if self.config.metrics.enabled else None
+        self.metrics_server = None
+        self._claim_target = None
+        self._claim_url = None
+        self._claim_headers = {}
+        
         # Track sent notifications to prevent duplicates
         self.sent_notifications = set()
+        self._known_owners = {}
+        
+        # Burst state - reset at the start of every burst
+        self._stop_event = None
+        self._outcome = None
+        self._outcome_detail = None
+        self._burst_attempts = 0
+        self._drop_at = 0.0
+        self._burst_started = 0.0
+        self._first_wave = []  # (sent, completed) perf_counter() of each worker's first attempt
+        self.claimed_token = None  # Index of the token that won the last successful burst
+        
+        # Burst segment being fired when several drop windows were merged
+        self._segment = None
+        self._segment_started = 0.0
+        
+        # Interleaved time slots shared with other cluster nodes (set by a cluster agent)
+        self.time_slots = None
+        
+        # Ownership tracking used to confirm that a DUPLICATE means "taken by someone else"
+        self._original_owner = None
+        self._owner_check = None
+        self._last_owner_check = 0.0
         
         # Initialize proxy manager if enabled
         if self.config.proxy.enabled and self.config.proxy.proxies:
@@ -84,6 +346,7 @@ class UsernameSniper:
                     rotation_enabled=self.config.proxy.rotation_enabled,
                     timeout=self.config.proxy.timeout
                 )
+                self.proxy_manager.quiet_window = self.quiet_window
                 logger.info("Proxy manager initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize proxy manager: {e}")
@@ -98,8 +361,48 @@ class UsernameSniper:
                 embed_color=self.config.discord.embed_color
             )
     
-    async def snipe_with_fallback(self, drop_times: List[datetime], username: str) -> SnipeResult:
-        """Snipe a username with multiple fallback drop times"""
+    async def __aenter__(self):
+        await self.open()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+        return False
+    
+    async def open(self):
+        """Open the HTTP and Discord sessions once for every window this sniper runs"""
+        if self._opened:
+            return
+        await self._open_session()
+        await self._start_metrics()
+        if self.discord_notifier:
+            await self.discord_notifier.__aenter__()
+        self._opened = True
+    
+    async def close(self):
+        """Close everything opened by open()"""
+        self._opened = False
+        if self.session:
+            await self.session.close()
+            self.session = None
+        if self.discord_notifier:
+            await self.discord_notifier.close()
+        if self.telemetry:
+            self.telemetry.close()
+            self.telemetry = None
+        await self._stop_metrics()
+        if self.proxy_manager and hasattr(self.proxy_manager, 'close'):
+            try:
+                await self.proxy_manager.close()
+            except Exception as e:
+                logger.warning(f"Error closing proxy manager: {e}")
+    
+    async def snipe_with_fallback(self, drop_times: List[datetime], username: str, weights: Optional[List[float]] = None) -> SnipeResult:
+        """Snipe a username with multiple fallback drop times
+        
+        Overlapping or closely spaced drop windows are merged into continuous
+        bursts by WindowPlanner; every burst draws from one attempt budget.
+        """
         if not drop_times:
             logger.error("No drop times provided")
             return SnipeResult(
@@ -113,45 +416,105 @@ class UsernameSniper:
         logger.info(f"Starting fallback sniper for username: {username}")
         logger.info(f"Drop times: {[dt.isoformat() for dt in drop_times]}")
         
-        # Try each drop time in order
-        for i, drop_time in enumerate(drop_times, 1):
-            logger.info(f"🎯 Attempting drop window {i}/{len(drop_times)}: {drop_time.isoformat()}")
-            
-            if self.discord_notifier:
-                try:
-                    await self.discord_notifier.notify_status_update(
-                        f"🎯 **Drop Window {i}/{len(drop_times)}**\n"
-                        f"Username: **{username}**\n"
-                        f"Drop time: {drop_time.strftime('%Y-%m-%d %H:%M:%S UTC')}"
-                    )
-                except Exception as e:
-                    logger.warning(f"Failed to send fallback window notification: {e}")
-            
-            result = await self.snipe_at_time(drop_time, username)
-            
-            if result.success:
-                logger.info(f"🎉 SUCCESS on drop window {i}!")
-                return result
-            else:
-                logger.warning(f"❌ Drop window {i} failed: {result.error_message}")
+        planner = WindowPlanner(
+            lead_seconds=0.4,
+            burst_seconds=self.config.snipe.burst_duration_seconds,
+            min_gap=self.config.snipe.window_merge_gap_seconds
+        )
+        try:
+            segments = planner.plan(drop_times, weights)
+        except ValueError as e:
+            logger.error(f"Invalid drop window weights: {e}")
+            return SnipeResult(
+                success=False,
+                username=username,
+                attempts=0,
+                total_time=0,
+                error_message=str(e)
+            )
+        
+        # Try each burst in order on the same sessions, sharing one attempt budget across all of them
+        attempts = 0
+        total_time = 0.0
+        windows = []
+        owns_resources = not self._opened
+        self._share_budget = True
+        self._plan_budget = None
+        try:
+            await self.open()
+            for i, segment in enumerate(segments, 1):
+                covered = ", ".join(window.drop_time.strftime('%H:%M:%S') for window in segment.windows)
+                logger.info(f"🎯 Attempting burst {i}/{len(segments)} covering drop time(s) {covered}")
+                
+                if self.discord_notifier:
+                    try:
+                        await self.discord_notifier.notify_status_update(
+                            f"🎯 **Drop Window {i}/{len(segments)}**\n"
+                            f"Username: **{username}**\n"
+                            f"Drop time(s): {covered} UTC ({segment.duration:.1f}s burst)"
+                        )
+                    except Exception as e:
+                        logger.warning(f"Failed to send fallback window notification: {e}")
                 
-                # If there are more drop times, wait a bit before next attempt
-                if i < len(drop_times):
-                    logger.info(f"⏳ Preparing for next drop window in 5 seconds...")
-                    await asyncio.sleep(5)
+                result = await self.snipe_at_time(segment.drop_time, username, segment=segment)
+                attempts += result.attempts
+                total_time += result.total_time
+                windows.append({
+                    'burst': i,
+                    'drop_times': covered,
+                    'setup_ms': round((result.setup_seconds or 0) * 1000, 1),
+                    'attempts': result.attempts,
+                    'outcome': result.outcome,
+                })
+                
+                if result.success:
+                    logger.info(f"🎉 SUCCESS on burst {i}!")
+                    result.windows = windows
+                    return result
+                logger.warning(f"❌ Burst {i} failed: {result.error_message}")
+                if result.outcome not in (None, SnipeOutcome.WINDOW_ELAPSED):
+                    result.attempts = attempts
+                    result.total_time = total_time
+                    result.windows = windows
+                    return result
+        except Exception as e:
+            logger.error(f"Error in fallback sniper: {e}")
+            return SnipeResult(
+                success=False,
+                username=username,
+                attempts=attempts,
+                total_time=total_time,
+                error_message=str(e),
+                windows=windows
+            )
+        finally:
+            self._share_budget = False
+            self._plan_budget = None
+            self._log_window_summary(windows)
+            if owns_resources:
+                await self.close()
         
         # All drop windows failed
         logger.error(f"❌ All {len(drop_times)} drop windows failed for {username}")
         return SnipeResult(
             success=False,
             username=username,
-            attempts=0,
-            total_time=0,
-            error_message=f"All {len(drop_times)} drop windows failed"
+            attempts=attempts,
+            total_time=total_time,
+            error_message=f"All {len(drop_times)} drop windows failed",
+            windows=windows
         )
+    
+    def _log_window_summary(self, windows: List[dict]):
+        """Log the setup cost each fallback burst paid before it started waiting"""
+        for window in windows:
+            logger.info(
+                f"🪟 Burst {window['burst']} ({window['drop_times']}): setup {window['setup_ms']:.0f}ms, "
+                f"{window['attempts']} attempts, {window['outcome']}"
+            )
 
-    async def snipe_at_time(self, drop_time: datetime, username: str) -> SnipeResult:
-        """Snipe a username at the specified time"""
+    async def snipe_at_time(self, drop_time: datetime, username: str, segment: Optional[BurstSegment] = None) -> SnipeResult:
+        """Snipe a username at the specified time, or across a planned burst segment"""
         if self.is_running:
             logger.warning("Sniper is already running")
             return SnipeResult(
@@ -169,6 +532,10 @@ class UsernameSniper:
         logger.info(f"Starting sniper for username: {username}")
         logger.info(f"Drop time: {drop_time.isoformat()}")
         
+        owns_resources = not self._opened
+        setup_started = time.perf_counter()
+        base_config = self.config
+        preflight_task = None
         try:
             # Check bearer token
             if not self.config.snipe.bearer_token or self.config.snipe.bearer_token == "your_minecraft_bearer_token_here":
@@ -181,35 +548,8 @@ class UsernameSniper:
                     error_message="Bearer token not configured"
                 )
             
-            # Initialize HTTP session with aggressive settings
-            try:
-                connector = aiohttp.TCPConnector(
-                    limit=500,  # Increased connection limit
-                    limit_per_host=100,
-                    ttl_dns_cache=300,
-                    use_dns_cache=True,
-                    keepalive_timeout=30,
-                    enable_cleanup_closed=True
-                )
-                timeout_seconds = self.config.proxy.timeout if self.proxy_manager else 5
-                timeout = aiohttp.ClientTimeout(total=timeout_seconds)
-                self.session = aiohttp.ClientSession(
-                    connector=connector,
-                    timeout=timeout
-                )
-                logger.info("HTTP session initialized successfully")
-                
-                if self.proxy_manager:
-                    logger.info(f"Proxy support enabled with {len(self.config.proxy.proxies)} proxies")
-                else:
-                    logger.info("Using direct connection (no proxies configured)")
-            except Exception as e:
-                logger.error(f"Failed to initialize HTTP session: {e}")
-                raise
-            
-            # Initialize Discord session
-            if self.discord_notifier:
-                await self.discord_notifier.__aenter__()
+            # Initialize HTTP and Discord sessions (already open and warm inside `async with`)
+            await self.open()
             
             # Send Discord notification
             if self.discord_notifier:
@@ -222,18 +562,68 @@ class UsernameSniper:
                 except Exception as e:
                     logger.warning(f"Failed to send Discord notification: {e}")
             
-            # Sync time first
-            await self.time_sync.sync_time()
+            # Sync time first (kept from an earlier window unless it is getting stale)
+            if self.time_sync.should_resync():
+                await self.time_sync.sync_time()
+            
+            # Tokens whose JWT runs out before the burst ends would only burn worker slots on 401s
+            snipe_start_time = segment.start if segment else drop_time - timedelta(milliseconds=400)
+            burst_end = segment.end if segment else snipe_start_time + timedelta(seconds=self.config.snipe.burst_duration_seconds)
+            self._exclude_expiring_tokens(burst_end.timestamp())
+            
+            # Remember who holds the name now so a post-drop DUPLICATE can be attributed
+            await self._record_original_owner(username)
+            
+            # Resolve and probe every API address now; refreshed again shortly before launch
+            await self._pin_addresses()
             
             # Wait until snipe time with accurate timer (start 0.4s early for competitive edge)
-            snipe_start_time = drop_time - timedelta(milliseconds=400)
+            self._prepare_claims(username)
+            setup_seconds = time.perf_counter() - setup_started
+            logger.info(f"⏱️ Window setup took {setup_seconds * 1000:.0f}ms ({'cold' if owns_resources else 'warm'} sessions)")
+            
+            # Go/no-go checks run alongside the countdown and may shrink the worker count
+            if self.config.preflight.enabled:
+                preflight_task = asyncio.create_task(self._run_preflight(username, drop_time, burst_end.timestamp()))
+            
+            # Enter the quiet window and freeze GC a few seconds out so nothing pauses the first wave
+            for lead_seconds, enter in self._critical_phases():
+                phase_at = drop_time - timedelta(seconds=lead_seconds)
+                if phase_at >= snipe_start_time:
+                    continue
+                lead = (snipe_start_time - phase_at).total_seconds()
+                await self.timer.wait_until(
+                    phase_at,
+                    callback=lambda remaining, current, target: self._handle_countdown(remaining + lead, current, snipe_start_time, username)
+                )
+                await self._enter_phase(enter)
+            
             await self.timer.wait_until(
                 snipe_start_time, 
                 callback=lambda remaining, current, target: self._handle_countdown(remaining, current, target, username)
             )
             
+            preflight = await self._finish_preflight(preflight_task)
+            if preflight and not preflight.go and self.config.preflight.abort_on_no_go:
+                logger.error("🛑 Preflight returned NO-GO - skipping the burst")
+                return SnipeResult(
+                    success=False,
+                    username=username,
+                    attempts=0,
+                    total_time=0,
+                    error_message="Preflight checks failed",
+                    outcome=SnipeOutcome.NO_GO,
+                    preflight=preflight.to_dict()
+                )
+            
             # Start sniping
-            result = await self._start_sniping(username)
+            now = self.time_sync.get_accurate_time()
+            drop_at = time.time() + (drop_time - now).total_seconds()
+            result = await self._start_sniping(username, drop_at, segment, woke_late=(now - snipe_start_time).total_seconds())
+            result.setup_seconds = round(setup_seconds, 3)
+            result.preflight = preflight.to_dict() if preflight else None
+            await self._end_critical_phases(result)
+            await record_run_async(self.config, result, drop_time)
             
             # Send final notification
             if self.discord_notifier:
@@ -261,15 +651,110 @@ class UsernameSniper:
             )
         finally:
             self.is_running = False
-            if self.session:
-                await self.session.close()
-            if self.discord_notifier:
-                await self.discord_notifier.close()
-            if self.proxy_manager and hasattr(self.proxy_manager, 'close'):
-                try:
-                    await self.proxy_manager.close()
-                except Exception as e:
-                    logger.warning(f"Error closing proxy manager: {e}")
+            self.config = base_config
+            if preflight_task and not preflight_task.done():
+                preflight_task.cancel()
+            await self._end_critical_phases()
+            if owns_resources:
+                await self.close()
+    
+    async def _run_preflight(self, username: str, drop_time: datetime, burst_end: float) -> PreflightReport:
+        """Wait for T-lead, run the checks, report them and apply the adjusted worker count"""
+        delay = (drop_time - self.time_sync.get_accurate_time()).total_seconds() - self.config.preflight.lead_seconds
+        if delay > 0:
+            await asyncio.sleep(delay)
+        
+        report = await Preflight(self).run(username, drop_time, burst_end)
+        report.log()
+        if report.workers != self.config.snipe.concurrent_requests:
+            # Only for this snipe - snipe_at_time restores the configured count afterwards
+            self.config = copy.copy(self.config)
+            self.config.snipe = copy.copy(self.config.snipe)
+            self.config.snipe.concurrent_requests = report.workers
+        if self.discord_notifier:
+            await self.quiet_window.submit("notification", self._send_preflight_notification(report))
+        return report
+    
+    async def _finish_preflight(self, task: Optional[asyncio.Task]) -> Optional[PreflightReport]:
+        """The preflight report, or None if preflight is off or did not finish before launch"""
+        if task is None:
+            return None
+        if not task.done():
+            task.cancel()
+            logger.warning("⚠️ Preflight was still running at launch - firing without it")
+            return None
+        try:
+            return task.result()
+        except asyncio.CancelledError:
+            return None
+        except Exception as e:
+            logger.warning(f"Preflight failed: {e}")
+            return None
+    
+    async def _send_preflight_notification(self, report: PreflightReport):
+        try:
+            await self.discord_notifier.notify_preflight(
+                username=report.username,
+                go=report.go,
+                checks=[(check.name, check.status, check.detail) for check in report.checks],
+                planned_workers=report.planned_workers,
+                workers=report.workers
+            )
+        except Exception as e:
+            logger.warning(f"Failed to send preflight notification: {e}")
+    
+    async def _open_session(self):
+        """Create the HTTP session used for claim requests"""
+        try:
+            limit, limit_per_host = pool_limits(
+                self.config.snipe.concurrent_requests,
+                self.config.snipe.pool_limit,
+                self.config.snipe.pool_limit_per_host
+            )
+            connector = create_connector(
+                self.tls_context,
+                socket_tuner=self.socket_tuner,
+                limit=limit,
+                limit_per_host=limit_per_host,
+                resolver=self.resolver,
+                use_dns_cache=self.resolver is None,
+                happy_eyeballs_delay=self.config.snipe.happy_eyeballs_delay_ms / 1000.0,
+                interleave=1
+            )
+            timeout_seconds = self.config.proxy.timeout if self.proxy_manager else 5
+            timeout = aiohttp.ClientTimeout(total=timeout_seconds)
+            trace_configs = [self.pool_monitor.trace_config()]
+            if self.config.snipe.telemetry_path:
+                if self.telemetry is None:
+                    self.telemetry = TelemetryWriter(self.config.snipe.telemetry_path, self.config.snipe.telemetry_capacity)
+                    logger.info(f"📼 Recording attempt telemetry to {self.telemetry.path}")
+                trace_configs.append(self.telemetry.trace_config())
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                trace_configs=trace_configs,
+                response_class=TracedResponse if self.telemetry else aiohttp.ClientResponse
+            )
+            logger.info(f"HTTP session initialized successfully (pool limit {limit}, {limit_per_host} per host)")
+            
+            if self.proxy_manager:
+                logger.info(f"Proxy support enabled with {len(self.config.proxy.proxies)} proxies")
+            else:
+                logger.info("Using direct connection (no proxies configured)")
+        except Exception as e:
+            logger.error(f"Failed to initialize HTTP session: {e}")
+            raise
+    
+    async def _start_metrics(self):
+        """Serve the metrics endpoint when metrics are enabled"""
+        if self.metrics and self.metrics_server is None:
+            self.metrics_server = MetricsServer(self, self.config.metrics)
+            await self.metrics_server.start()
+    
+    async def _stop_metrics(self):
+        if self.metrics_server:
+            await self.metrics_server.stop()
+            self.metrics_server = None
     
     async def _handle_countdown(self, time_remaining: float, current_time: datetime, target_time: datetime, username: str):
         """Handle countdown notifications with accurate timing"""
@@ -281,7 +766,7 @@ class UsernameSniper:
             # Check if we're within 0.5 seconds of the notification time
             if abs(time_remaining - interval) <= 0.5 and interval not in self.sent_notifications:
                 self.sent_notifications.add(interval)
-                await self._send_countdown_notification(interval, target_time, username)
+                await self.quiet_window.submit("notification", self._send_countdown_notification(interval, target_time, username))
                 break
         
         # Show console countdown for last 60 seconds
@@ -313,14 +798,37 @@ class UsernameSniper:
         except Exception as e:
             logger.warning(f"Failed to send countdown notification: {e}")
     
-    async def _start_sniping(self, username: str) -> SnipeResult:
-        """Start the sniping process"""
+    async def _start_sniping(self, username: str, drop_at: Optional[float] = None, segment: Optional[BurstSegment] = None,
+                             woke_late: float = 0.0) -> SnipeResult:
+        """Start the sniping process (woke_late: how far past the planned launch the countdown returned, in seconds)"""
         logger.info("🚨 Starting sniping process!")
         
         start_time = time.time()
-        stop_time = start_time + 10.1  # Snipe for 10.1 seconds
-        attempts = 0
-        success = False
+        self._burst_started = time.perf_counter()
+        self._first_wave = []
+        stop_time = start_time + (segment.duration if segment else self.config.snipe.burst_duration_seconds)
+        self._drop_at = drop_at if drop_at is not None else start_time
+        self._stop_event = asyncio.Event()
+        self._segment = segment
+        self._segment_started = start_time
+        if self._plan_budget:
+            # Later bursts of a plan keep the shared budget but hold back a reserve for their own drop
+            self.budget = self._plan_budget
+            self.budget.rearm(self._drop_at)
+        else:
+            self.budget = AttemptBudget(
+                total=self.config.snipe.max_snipe_attempts,
+                drop_at=self._drop_at,
+                reserve_fraction=self.config.snipe.attempt_budget_reserve
+            )
+        if self._share_budget:
+            self._plan_budget = self.budget
+        self._check_budget(start_time)
+        self._outcome = None
+        self._outcome_detail = None
+        self._burst_attempts = 0
+        self._last_owner_check = 0.0
+        self.claimed_token = None
         
         # Create workers - distributed across multiple tokens
         worker_count = self.config.snipe.concurrent_requests
@@ -338,87 +846,465 @@ class UsernameSniper:
                 error_message="No bearer tokens configured"
             )
         
-        logger.info(f"🔥 Using {len(tokens)} tokens with {worker_count} total workers")
+        # Token health persists between bursts so dead tokens stay out of the rotation
+        if not self._ensure_token_health(tokens):
+            self.token_health.reset()
+        
+        # Checked again at launch - a long countdown can outlast a token
+        self._exclude_expiring_tokens(self.time_sync.get_accurate_time().timestamp() + (stop_time - start_time))
+        
+        if self.token_health.all_dead():
+            return self._tokens_exhausted_result(username)
+        
+        # Workers pick whichever token is ready next instead of being pinned to one
+        alive = self.token_health.alive_indices()
+        min_interval = (self.config.snipe.request_delay_ms / 1000.0) * len(alive) / worker_count
+        self.rate_limit_tracker.reset(len(tokens), min_interval)
+        for index in range(len(tokens)):
+            if index not in alive:
+                self.rate_limit_tracker.remove(index)
+        
+        logger.info(f"🔥 Using {len(alive)} tokens with {worker_count} total workers")
+        if self.telemetry:
+            burst_started = time.perf_counter()
+            self.telemetry.begin_burst(
+                burst_started, self._drop_at, burst_started + (stop_time - start_time),
+                worker_count, self.config.snipe.request_delay_ms
+            )
+        self.pool_monitor.reset()
+        self._prepare_claims(username)
+        
+        pacing_task = None
+        self.pacing = None
+        if self.config.snipe.adaptive_delays:
+            self.pacing = AIMDController(
+                initial_delay=self.config.snipe.request_delay_ms / 1000.0,
+                max_concurrency=worker_count
+            )
+            pacing_task = asyncio.create_task(self.pacing.run(self._stop_event))
+        attempt_log_task = asyncio.create_task(self.attempt_log.run(self._stop_event))
         
         for i in range(worker_count):
-            # Distribute workers evenly across available tokens
-            token = tokens[i % len(tokens)]
-            worker = asyncio.create_task(self._snipe_worker(username, stop_time, token))
+            worker = asyncio.create_task(self._snipe_worker(username, stop_time, i))
             workers.append(worker)
         
         try:
-            # Wait for workers
-            results = await asyncio.gather(*workers, return_exceptions=True)
+            # Wait for the burst window to run out or for a definitive outcome to end it early
+            all_workers = asyncio.gather(*workers, return_exceptions=True)
+            stop_waiter = asyncio.create_task(self._stop_event.wait())
+            await asyncio.wait({all_workers, stop_waiter}, return_when=asyncio.FIRST_COMPLETED)
             
-            # Process results
-            for result in results:
-                if isinstance(result, dict):
-                    attempts += result.get('attempts', 0)
-                    if result.get('success'):
-                        success = True
-                        logger.info(f"🎉 Successfully claimed username: {username}")
+            if not all_workers.done():
+                logger.info(f"🛑 Ending burst early: {self._outcome_detail}")
+                for worker in workers:
+                    worker.cancel()
+            stop_waiter.cancel()
+            await all_workers
         
         except Exception as e:
             logger.error(f"Sniping error: {e}")
+        finally:
+            if self._owner_check and not self._owner_check.done():
+                self._owner_check.cancel()
+            if pacing_task:
+                pacing_task.cancel()
+            attempt_log_task.cancel()
+        
+        if self.pacing:
+            self._log_pacing_summary()
         
         total_time = time.time() - start_time
+        success = self._outcome == SnipeOutcome.CLAIMED
+        if success:
+            logger.info(f"🎉 Successfully claimed username: {username}")
+        
+        outcome = self._outcome or SnipeOutcome.WINDOW_ELAPSED
+        error_message = None
+        if not success:
+            error_message = self._outcome_detail or "Failed to claim username"
         
         return SnipeResult(
             success=success,
             username=username,
-            attempts=attempts,
+            attempts=self._burst_attempts,
             total_time=total_time,
-            error_message=None if success else "Failed to claim username"
+            error_message=error_message,
+            outcome=outcome,
+            token_stats=self.token_health.summary(),
+            pacing_trajectory=self.pacing.summary() if self.pacing else None,
+            tls_stats=self._tls_summary(),
+            address_pinning=self.address_pinner.summary() if self.address_pinner else None,
+            socket_profile=self._socket_summary(),
+            pool_stats=self._pool_summary(),
+            timing=self._timing_summary(woke_late, total_time)
+        )
+    
+    def _ensure_token_health(self, tokens: List[str]) -> bool:
+        """Create the token health registry if the configured tokens changed; True if it was created"""
+        if self.token_health is not None and self.token_health.tokens == tokens:
+            return False
+        self.token_health = TokenHealthRegistry(
+            tokens,
+            base_open_seconds=self.config.snipe.breaker_base_open_ms / 1000.0,
+            max_open_seconds=self.config.snipe.max_backoff_seconds
         )
+        return True
+    
+    def _check_budget(self, start_time: float):
+        """Warn when the attempts made before the drop would leave less than one wave of the budget for the drop itself"""
+        lead = self._drop_at - start_time
+        if lead <= 0:
+            return
+        workers = self.config.snipe.concurrent_requests
+        delay = self.config.snipe.request_delay_ms / 1000.0
+        budget = self.budget
+        before_drop = budget.remaining - budget.reserved
+        expected = lead * workers / delay if delay > 0 else float('inf')
+        at_drop = budget.remaining - min(expected, before_drop)
+        if at_drop < workers:
+            logger.warning(f"💸 The {lead:.2f}s pre-drop lead may spend {before_drop} of the {budget.remaining} remaining attempts, "
+                           f"leaving {int(at_drop)} for the drop - raise max_snipe_attempts or attempt_budget_reserve")
+    
+    def _exclude_expiring_tokens(self, burst_end: float) -> List[int]:
+        """Drop tokens whose JWT expires before burst_end (server Unix time) plus the configured margin"""
+        self._ensure_token_health(self.config.snipe.bearer_tokens)
+        now = self.time_sync.get_accurate_time().timestamp()
+        excluded = self.token_health.exclude_expiring(burst_end + self.config.snipe.token_expiry_margin_seconds, now)
+        if excluded:
+            alive = len(self.token_health.alive_indices())
+            logger.warning(f"⌛ {len(excluded)} token(s) expire before the burst ends - their workers move to the {alive} remaining")
+        return excluded
+    
+    async def check_tokens(self) -> dict:
+        """Validate every live token against the profile endpoint between bursts
+        
+        Tokens are checked in parallel and the ones the API rejects permanently
+        are removed from the rotation before the next burst; the requests also
+        keep pooled connections to the API warm.
+        """
+        self._ensure_token_health(self.config.snipe.bearer_tokens)
+        await asyncio.gather(*(self._check_token(index) for index in self.token_health.alive_indices()))
+        alive = len(self.token_health.alive_indices())
+        return {'alive': alive, 'dead': len(self.token_health.tokens) - alive}
+    
+    async def _check_token(self, index: int):
+        url = f"{self.config.snipe.api_base_url}/minecraft/profile"
+        try:
+            async with self.session.get(url, headers=_claim_headers(self.token_health.tokens[index])) as response:
+                await response.read()
+                if response.status in PERMANENT_FAILURES:
+                    self.token_health.kill(index, PERMANENT_FAILURES[response.status])
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.debug(f"Token check failed for {self.token_health.health[index].label}: {e}")
+    
+    def _critical_phases(self) -> List[tuple]:
+        """(seconds before the drop, enter callback) for each enabled critical-window mode, earliest first"""
+        phases = []
+        if self.address_pinner:
+            phases.append((self.config.snipe.dns_refresh_seconds, self._pin_addresses))
+        if self.config.snipe.quiet_window_enabled:
+            phases.append((self.config.snipe.quiet_window_seconds, self.quiet_window.enter))
+        if self.config.snipe.critical_memory_mode:
+            phases.append((self.config.snipe.critical_window_seconds, self.memory_window.enter))
+        return sorted(phases, key=lambda phase: -phase[0])
+    
+    async def _enter_phase(self, enter):
+        """Run a phase callback, awaiting it if it is a coroutine"""
+        outcome = enter()
+        if inspect.isawaitable(outcome):
+            await outcome
+    
+    async def _pin_addresses(self):
+        """Resolve the API host, probe each address and pin the fastest ones"""
+        if not self.address_pinner:
+            return
+        try:
+            await self.address_pinner.prepare()
+        except Exception as e:
+            logger.warning(f"Address pinning failed - using normal DNS: {e}")
     
-    async def _snipe_worker(self, username: str, stop_time: float, bearer_token: str = None) -> dict:
-        """Individual sniping worker with optional token"""
+    async def _end_critical_phases(self, result: Optional[SnipeResult] = None):
+        """Restore GC and release deferred I/O, recording both on the result"""
+        if self.memory_window.active:
+            collections = self.memory_window.exit()
+            if result:
+                result.gc_collections = collections
+        deferred = await self.quiet_window.release()
+        if result and deferred is not None:
+            result.deferred_work = deferred
+    
+    def _prepare_claims(self, username: str):
+        """Build the claim URL and per-token headers once, ahead of the burst"""
+        if username == self._claim_target and list(self._claim_headers) == self.config.snipe.bearer_tokens:
+            return
+        self._claim_target = username
+        self._claim_url = f"{self.config.snipe.api_base_url}/minecraft/profile/name/{username}"
+        self._claim_headers = {token: _claim_headers(token) for token in self.config.snipe.bearer_tokens}
+    
+    def _tls_summary(self) -> Optional[dict]:
+        """Log and return TLS session resumption statistics for this session"""
+        if not self.tls_context:
+            return None
+        stats = self.tls_context.session_cache.summary()
+        if stats['handshakes']:
+            logger.info(
+                f"🔐 TLS: {stats['resumed']}/{stats['handshakes']} handshakes resumed "
+                f"({stats['hit_rate']:.0%}), ~{stats['saved_ms']:.0f}ms of handshake time saved"
+            )
+        return stats
+    
+    def _socket_summary(self) -> dict:
+        """Log and return the socket profile in effect"""
+        report = self.socket_tuner.report()
+        if report['applied']:
+            logger.info("🔧 Socket options: " + ", ".join(f"{name}={state}" for name, state in report['applied'].items()))
+        return report
+    
+    def _pool_summary(self) -> dict:
+        """Log and return connection pool usage for the burst"""
+        stats = self.pool_monitor.summary()
+        logger.info(
+            f"🏊 Pool: {stats['new_connections']} new / {stats['reused_connections']} reused connections, "
+            f"peak in flight {stats['peak_in_flight']}"
+        )
+        if stats['waited_for_connection']:
+            logger.warning(
+                f"⚠️ {stats['waited_for_connection']} request(s) waited for a free connection "
+                f"(mean {stats['mean_wait_ms']}ms, max {stats['max_wait_ms']}ms) - pool limit too low?"
+            )
+        return stats
+    
+    def _timing_summary(self, woke_late: float, total_time: float) -> dict:
+        """Launch lag and first-wave latency of the burst (medians over workers), throughput and clock accuracy"""
+        sent = [first[0] for first in self._first_wave]
+        time_sync = self.time_sync
+        return {
+            'launch_ms': round((woke_late + statistics.median(sent) - self._burst_started) * 1000, 3) if sent else None,
+            'first_wave_ms': round(statistics.median(done - started for started, done in self._first_wave) * 1000, 3) if sent else None,
+            'first_wave_spread_ms': round((max(sent) - min(sent)) * 1000, 3) if sent else None,
+            'throughput': round(self._burst_attempts / total_time, 1) if total_time > 0 else 0.0,
+            'clock_offset_ms': round(time_sync.time_offset * 1000, 3),
+            'clock_error_ms': round(time_sync.offset_error * 1000, 3) if time_sync.offset_error is not None else None
+        }
+    
+    def _log_pacing_summary(self):
+        """Log where the adaptive controller ended up"""
+        trajectory = self.pacing.trajectory
+        decreases = sum(1 for sample in trajectory if sample.action == "decrease")
+        logger.info(
+            f"📉 Adaptive pacing: {len(trajectory)} steps, {decreases} backoffs, "
+            f"final delay {self.pacing.delay * 1000:.1f}ms with {self.pacing.concurrency} active workers"
+        )
+    
+    def _tokens_exhausted_result(self, username: str) -> SnipeResult:
+        """Result for a burst that cannot run because every token is dead"""
+        logger.error("❌ Every bearer token has been removed from the rotation")
+        return SnipeResult(
+            success=False,
+            username=username,
+            attempts=0,
+            total_time=0.0,
+            error_message="No healthy bearer tokens left",
+            outcome=SnipeOutcome.TOKENS_EXHAUSTED,
+            token_stats=self.token_health.summary()
+        )
+    
+    def _finish(self, outcome: str, detail: str):
+        """Record a definitive outcome and stop every worker"""
+        if self._stop_event is None or self._stop_event.is_set():
+            return
+        self._outcome = outcome
+        self._outcome_detail = detail
+        self._stop_event.set()
+    
+    async def _snipe_worker(self, username: str, stop_time: float, worker_number: int = 0) -> dict:
+        """Individual sniping worker that takes the next ready token for every attempt"""
         attempts = 0
         worker_id = id(asyncio.current_task())
-        token_info = f" (Token: ...{bearer_token[-8:]})" if bearer_token else ""
+        health = self.token_health
+        tracker = self.rate_limit_tracker
+        pacing = self.pacing
+        segment = self._segment
+        time_slots = self.time_slots
+        telemetry = self.telemetry
+        trace = AttemptTrace() if telemetry else None
+        metrics = self.metrics
+        planned = 0.0  # When this worker meant to send its next attempt
         
-        logger.info(f"Worker {worker_id}{token_info} started sniping {username}")
+        logger.info(f"Worker {worker_id} started sniping {username}")
         
-        while time.time() < stop_time:
+        while not self._stop_event.is_set() and time.time() < stop_time:
+            # Sit out while the adaptive controller has cut concurrency below this worker
+            if pacing and not pacing.allows(worker_number):
+                await asyncio.sleep(pacing.interval / 4)
+                continue
+            
+            # Sit out the time slots that belong to other cluster nodes
+            if time_slots:
+                wait = time_slots.wait_seconds(time.time())
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                    continue
+            
+            # Sit out while the open drop windows of a merged burst need fewer workers
+            if segment and worker_number >= segment.active_workers(time.time() - self._segment_started, self.config.snipe.concurrent_requests):
+                await asyncio.sleep(0.005)
+                continue
+            
+            if not planned:
+                planned = time.perf_counter()
+            token_index = await tracker.acquire(stop_time)
+            if token_index is None:
+                break
+            
+            # Draw from the shared budget only once a token is in hand, so waiting workers hold
+            # no draws; a refused draw hands the token's rate slot back. The reserved share
+            # only opens at the drop instant
+            if not self.budget.try_acquire():
+                tracker.release(token_index)
+                if self.budget.exhausted:
+                    # Attempts still in flight get their answer; the burst ends as the workers run out
+                    if not self._outcome:
+                        self._outcome = SnipeOutcome.BUDGET_EXHAUSTED
+                        self._outcome_detail = f"Attempt budget of {self.budget.total} exhausted"
+                    break
+                await asyncio.sleep(max(0.0, self._drop_at - time.time()))
+                continue
+            
+            # A token back from its rest sends a single probe; the token is held out of the
+            # rotation until its answer while the other workers carry on with the rest
+            probe = health.start_probe(token_index)
+            if probe:
+                tracker.hold(token_index)
+            
+            sent_at = time.time()
+            request_start = time.perf_counter()
             try:
-                result = await self._claim_username(username, bearer_token)
-                attempts += 1
-                
-                # Log every 10th attempt to show progress
-                if attempts % 10 == 0:
-                    logger.info(f"Worker {worker_id}: {attempts} attempts made")
-                
-                if result.get('success'):
-                    logger.info(f"🎉 Worker {worker_id} SUCCESS after {attempts} attempts!")
-                    return {'success': True, 'attempts': attempts}
-                
-                # Handle rate limiting intelligently
-                if result.get('status') == 429:
-                    retry_after = result.get('retry_after', 1.0)
-                    # Cap backoff at configured maximum to avoid missing the drop window
-                    max_backoff = getattr(self.config.snipe, 'max_backoff_seconds', 5)
-                    backoff_time = min(retry_after, max_backoff)
-                    logger.warning(f"Worker {worker_id} backing off for {backoff_time:.1f}s")
-                    await asyncio.sleep(backoff_time)
-                elif result.get('status') == 403:
-                    # Account cooldown - longer delay
-                    logger.warning(f"Worker {worker_id} hit account cooldown, waiting 2s")
-                    await asyncio.sleep(2.0)
-                else:
-                    # Use configured delay for normal requests
-                    delay_seconds = self.config.snipe.request_delay_ms / 1000.0
-                    await asyncio.sleep(delay_seconds)
-                
+                result = await self._claim_username(username, health.tokens[token_index], trace)
             except Exception as e:
                 logger.error(f"Worker {worker_id} error: {e}")
-                attempts += 1
-                await asyncio.sleep(0.1)
+                result = {'success': False, 'error': str(e), 'status': 'unknown_error'}
+            
+            status = result.get('status', result.get('status_code', 200 if result.get('success') else 'unknown_error'))
+            if pacing:
+                pacing.record(status, time.perf_counter() - request_start)
+            if metrics:
+                metrics.observe(status, time.perf_counter() - request_start)
+            if telemetry:
+                telemetry.record(planned, trace, time.perf_counter(), status, token_index, worker_number)
+                trace.reset()
+            planned = 0.0
+            if not attempts:
+                self._first_wave.append((request_start, time.perf_counter()))
+            
+            attempts += 1
+            self._burst_attempts += 1
+            self.attempt_log.record(worker_number, status)
+            state = health.record(token_index, result, sent_at=sent_at)
+            if probe:
+                tracker.release(token_index)
+            
+            if result.get('success'):
+                logger.info(f"🎉 Worker {worker_id} SUCCESS after {attempts} attempts!")
+                self.claimed_token = token_index
+                self._finish(SnipeOutcome.CLAIMED, f"Claimed by worker {worker_id} after {attempts} attempts")
+                return {'success': True, 'attempts': attempts}
+            
+            if state == TokenState.DEAD:
+                tracker.remove(token_index)
+                if health.all_dead():
+                    self._finish_tokens_exhausted()
+                    break
+            elif state == TokenState.OPEN:
+                # Rest the token; this worker moves straight on to whichever token is ready
+                open_until = health.health[token_index].open_until
+                if result.get('status') == 429:
+                    limited = [token_index] if self.config.snipe.per_token_rate_limiting else health.alive_indices()
+                    for index in limited:
+                        tracker.record_rate_limit(index, open_until - time.time())
+                        if pacing:
+                            tracker.penalize(index)
+                else:
+                    tracker.defer(token_index, open_until)
+                continue
+            
+            outcome = result.get('outcome')
+            if outcome and self.config.snipe.stop_on_definitive_outcome:
+                self._handle_definitive_outcome(username, outcome)
+                if self._stop_event.is_set():
+                    break
+            
+            # Pause between healthy requests - adaptive when the controller is running
+            if pacing:
+                tracker.relax(token_index)
+                delay_seconds = pacing.delay
+            else:
+                delay_seconds = self.config.snipe.request_delay_ms / 1000.0
+            planned = time.perf_counter() + delay_seconds
+            await asyncio.sleep(delay_seconds)
         
         logger.info(f"Worker {worker_id} finished with {attempts} attempts (no success)")
         return {'success': False, 'attempts': attempts}
     
-    async def _claim_username(self, username: str, bearer_token: str = None) -> dict:
-        """Try to claim a username with specified token"""
+    def _finish_tokens_exhausted(self):
+        """Stop the burst once no token is left in the rotation"""
+        if self.token_health.dead_reasons() == {"no_entitlement"}:
+            self._finish(SnipeOutcome.NO_ENTITLEMENT, "None of the configured accounts own Minecraft")
+        else:
+            self._finish(SnipeOutcome.TOKENS_EXHAUSTED, "Every bearer token was removed from the rotation (expired or no entitlement)")
+    
+    def _handle_definitive_outcome(self, username: str, outcome: str):
+        """React to a terminal response from the claim endpoint"""
+        if outcome == SnipeOutcome.NAME_INVALID:
+            self._finish(outcome, f"Username '{username}' is invalid or not allowed")
+        
+        elif outcome == SnipeOutcome.TAKEN:
+            # DUPLICATE is expected before the drop while the old owner still holds the name
+            now = time.time()
+            if now < self._drop_at:
+                return
+            if self._owner_check and not self._owner_check.done():
+                return
+            if now - self._last_owner_check < OWNER_RECHECK_INTERVAL:
+                return
+            self._last_owner_check = now
+            self._owner_check = asyncio.create_task(self._confirm_taken(username))
+    
+    async def _record_original_owner(self, username: str):
+        """Look up who owns the username before the drop (kept for later windows once known)"""
+        if username in self._known_owners:
+            self._original_owner = self._known_owners[username]
+            return
+        if self.config.snipe.target_uuid:
+            self._original_owner = self.config.snipe.target_uuid.replace('-', '').lower()
+        else:
+            self._original_owner = await self._lookup_owner(username)
+        if self._original_owner is not None:
+            self._known_owners[username] = self._original_owner
+        
+        if self._original_owner:
+            logger.info(f"Current owner of {username}: {self._original_owner}")
+        elif self._original_owner == "":
+            logger.info(f"{username} has no current owner")
+        else:
+            logger.warning(f"Could not determine current owner of {username} - DUPLICATE responses will not end the burst")
+    
+    async def _confirm_taken(self, username: str):
+        """Confirm a post-drop DUPLICATE by checking whether a new account owns the name"""
+        owner = await self._lookup_owner(username)
+        if owner and self._original_owner is not None and owner != self._original_owner:
+            self._finish(SnipeOutcome.TAKEN, f"Username '{username}' was taken by another account ({owner})")
+        elif owner:
+            logger.debug(f"{username} is still held by its original owner")
+    
+    async def _lookup_owner(self, username: str) -> Optional[str]:
+        """Return the UUID owning a username, '' if it is unowned, or None if the lookup failed"""
+        if not self.session:
+            return None
+        return await lookup_owner(self.session, self.config.snipe.profile_api_base_url, username)
+    
+    async def _claim_username(self, username: str, bearer_token: str = None, trace: Optional[AttemptTrace] = None) -> dict:
+        """Try to claim a username with specified token (timings go into trace when telemetry is on)"""
         # Safety check for session
         if not self.session:
             logger.error("HTTP session is None - cannot make request")
@@ -427,13 +1313,12 @@ class UsernameSniper:
         # Use provided token or fall back to primary token
         token = bearer_token or self.config.snipe.bearer_token
         
-        url = f"https://api.minecraftservices.com/minecraft/profile/name/{username}"
-        headers = {
-            'Authorization': f'Bearer {token}',
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Content-Type': 'application/json',
-            'Accept': 'application/json'
-        }
+        # Use the URL and headers prepared for the burst when they match
+        if username == self._claim_target:
+            url = self._claim_url
+        else:
+            url = f"{self.config.snipe.api_base_url}/minecraft/profile/name/{username}"
+        headers = self._claim_headers.get(token) or _claim_headers(token)
         
         # Get proxy for this request if proxy manager is available
         proxy = None
@@ -446,33 +1331,44 @@ class UsernameSniper:
                 logger.warning(f"Failed to get proxy: {e}")
         
         try:
-            async with self.session.put(url, headers=headers, proxy=proxy, timeout=aiohttp.ClientTimeout(total=2)) as response:
+            async with self.session.put(url, headers=headers, proxy=proxy, timeout=CLAIM_TIMEOUT, trace_request_ctx=trace) as response:
+                if trace is not None:
+                    trace.first_byte = time.perf_counter()
+                    trace.observe(response)
                 response_text = await response.text()
                 
-                # Log detailed response for debugging
-                proxy_info = f" via {proxy}" if proxy else " (direct)"
-                logger.info(f"Claim attempt{proxy_info} - Status: {response.status}")
+                # Per-attempt outcomes are summarised by the AttemptLogAggregator
+                if logger.isEnabledFor(logging.DEBUG):
+                    proxy_info = f" via {proxy}" if proxy else " (direct)"
+                    logger.debug(f"Claim attempt{proxy_info} - Status: {response.status}")
                 
                 if response.status == 200:
                     logger.info(f"🎉 SUCCESS! Claimed username: {username}")
                     logger.info(f"Response: {response_text}")
                     return {'success': True, 'response': response_text}
                 elif response.status == 400:
-                    logger.warning(f"Bad request (400) - Username might be taken or invalid")
+                    logger.warning(f"Bad request (400) - Username is invalid")
                     logger.debug(f"Response: {response_text}")
-                    return {'success': False, 'error': 'Bad request - username taken or invalid', 'status': 400}
+                    return _RESULT_NAME_INVALID
                 elif response.status == 401:
                     logger.error(f"Unauthorized (401) - Bearer token is invalid or expired")
                     logger.debug(f"Response: {response_text}")
-                    return {'success': False, 'error': 'Invalid bearer token', 'status': 401}
+                    return _RESULT_UNAUTHORIZED
                 elif response.status == 403:
-                    logger.warning(f"Forbidden (403) - Account on cooldown or username unavailable")
+                    name_status = _name_status(response_text)
                     logger.debug(f"Response: {response_text}")
-                    return {'success': False, 'error': 'Account on cooldown or username unavailable', 'status': 403}
+                    if name_status == 'DUPLICATE':
+                        logger.debug(f"Forbidden (403) - Username is currently owned (DUPLICATE)")
+                        return _RESULT_TAKEN
+                    if name_status == 'NOT_ALLOWED':
+                        logger.warning(f"Forbidden (403) - Username is not allowed")
+                        return _RESULT_NOT_ALLOWED
+                    logger.debug(f"Forbidden (403) - Account on cooldown or username unavailable")
+                    return _RESULT_COOLDOWN
                 elif response.status == 404:
                     logger.error(f"Not found (404) - Account doesn't own Minecraft")
                     logger.debug(f"Response: {response_text}")
-                    return {'success': False, 'error': 'Account does not own Minecraft', 'status': 404}
+                    return _RESULT_NO_ENTITLEMENT
                 elif response.status == 429:
                     # Extract retry-after header if present
                     retry_after = response.headers.get('Retry-After', '1')
@@ -481,13 +1377,9 @@ class UsernameSniper:
                     except (ValueError, TypeError):
                         retry_seconds = 1.0
                     
-                    logger.warning(f"Rate limited (429) - Backing off for {retry_seconds}s")
+                    logger.debug(f"Rate limited (429) - Backing off for {retry_seconds}s")
                     logger.debug(f"Response: {response_text}")
                     
-                    # Record rate limit for this token
-                    if hasattr(self, 'rate_limit_tracker') and token:
-                        self.rate_limit_tracker.record_rate_limit(token, retry_seconds)
-                    
                     # Return rate limit info for intelligent handling
                     return {
                         'success': False, 
@@ -496,7 +1388,8 @@ class UsernameSniper:
                         'retry_after': retry_seconds
                     }
                 else:
-                    logger.warning(f"Unexpected status {response.status}: {response_text}")
+                    if self.attempt_log.sample('unexpected_status'):
+                        logger.warning(f"Unexpected status {response.status}: {response_text}")
                 
                 return {
                     'success': response.status == 200,
@@ -505,11 +1398,13 @@ class UsernameSniper:
                     'response': response_text
                 }
         except asyncio.TimeoutError:
-            logger.warning(f"Timeout claiming {username}")
-            return {'success': False, 'error': 'Request timeout', 'status': 'timeout'}
+            logger.debug(f"Timeout claiming {username}")
+            return _RESULT_TIMEOUT
         except aiohttp.ClientError as e:
-            logger.error(f"Network error claiming {username}: {e}")
+            if self.attempt_log.sample('network_error'):
+                logger.error(f"Network error claiming {username}: {e}")
             return {'success': False, 'error': f'Network error: {str(e)}', 'status': 'network_error'}
         except Exception as e:
-            logger.error(f"Unexpected error claiming {username}: {e}")
+            if self.attempt_log.sample('unknown_error'):
+                logger.error(f"Unexpected error claiming {username}: {e}")
             return {'success': False, 'error': str(e), 'status': 'unknown_error'}
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Thin client for the sniper daemon (python Main.py daemon)
+
+Only the standard library is imported so commands return in milliseconds;
+all the work happens in the already-warm daemon.
+
+    python sniperctl.py add Notch "12/25/2024 • 3∶30∶00 PM" --priority 1
+    python sniperctl.py list
+    python sniperctl.py cancel 3
+    python sniperctl.py status
+"""
+
+import os
+import sys
+import json
+import argparse
+import urllib.error
+import urllib.request
+
+DEFAULT_URL = os.environ.get("SNIPER_DAEMON_URL", "http://127.0.0.1:8787")
+
+def request(url: str, method: str = "GET", body: dict = None):
+    """Call the control API and return the decoded JSON body"""
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(req, timeout=10) as response:
+            return json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        payload = json.loads(e.read() or b'{}')
+        sys.exit(f"❌ {payload.get('error', e.reason)}")
+    except urllib.error.URLError as e:
+        sys.exit(f"❌ Daemon not reachable at {url}: {e.reason} (start it with: python Main.py daemon)")
+
+def print_jobs(jobs: list):
+    if not jobs:
+        print("No jobs")
+        return
+    print(f"{'ID':>4}  {'Username':<16} {'Drop time (UTC)':<20} {'Pri':>3}  {'Status':<9} {'Outcome':<16} {'Attempts':>8} {'Ready':>8}")
+    for job in jobs:
+        ready = f"{job['ready_ms']:.1f}ms" if job['ready_ms'] is not None else "-"
+        print(
+            f"{job['id']:>4}  {job['username']:<16} {job['drop_time'][:19].replace('T', ' '):<20} {job['priority']:>3}  "
+            f"{job['status']:<9} {job['outcome'] or '-':<16} {job['attempts']:>8} {ready:>8}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Control a running sniper daemon")
+    parser.add_argument('--url', default=DEFAULT_URL, help='Daemon control API (default: $SNIPER_DAEMON_URL or http://127.0.0.1:8787)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    add = subparsers.add_parser('add', help='Queue a username at a drop time')
+    add.add_argument('username')
+    add.add_argument('drop_time', help='NameMC format "M/D/YYYY • H∶MM∶SS AM/PM" (local) or ISO 8601 (UTC if no offset)')
+    add.add_argument('--priority', '-p', type=int, default=0, help='Higher wins when bursts overlap')
+    
+    jobs = subparsers.add_parser('list', help='Show jobs')
+    jobs.add_argument('--pending', action='store_true', help='Only unfinished jobs')
+    
+    cancel = subparsers.add_parser('cancel', help='Cancel a queued job')
+    cancel.add_argument('job_id', type=int)
+    
+    subparsers.add_parser('status', help='Daemon health and warm state')
+    
+    args = parser.parse_args()
+    base = args.url.rstrip('/')
+    
+    if args.command == 'add':
+        job = request(f"{base}/jobs", "POST", {'username': args.username, 'drop_time': args.drop_time, 'priority': args.priority})
+        ready = f" - armed and ready in {job['ready_ms']:.1f}ms" if job['ready_ms'] is not None else " - armed (planned after the running burst)"
+        print(f"✅ Job {job['id']}: {job['username']} at {job['drop_time']}{ready}")
+    elif args.command == 'list':
+        print_jobs(request(f"{base}/jobs?all={0 if args.pending else 1}"))
+    elif args.command == 'cancel':
+        job = request(f"{base}/jobs/{args.job_id}", "DELETE")
+        print(f"🗑️ Job {job['id']} ({job['username']}) cancelled")
+    elif args.command == 'status':
+        print(json.dumps(request(f"{base}/status"), indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,22 @@ Speed test for NameMC Sniper - Test your setup's performance
 import asyncio
 import aiohttp
 import time
+import argparse
 import statistics
 from datetime import datetime
 
+from config import SocketConfig
+from transport import ResumingSSLContext, SocketTuner, create_connector
+
+# Socket profiles compared by --profiles (aiohttp always enables TCP_NODELAY itself)
+SOCKET_PROFILES = {
+    "baseline": SocketConfig(tcp_nodelay=False, tcp_quickack=False),
+    "default": SocketConfig(),
+    "+busy-poll": SocketConfig(busy_poll_us=50),
+    "+buffers": SocketConfig(send_buffer_bytes=256 * 1024, receive_buffer_bytes=256 * 1024),
+    "+user-timeout": SocketConfig(tcp_user_timeout_ms=2000),
+}
+
 async def test_minecraft_api_speed(bearer_token: str, num_tests: int = 10):
     """Test speed to Minecraft API"""
     print(f"🚀 Testing Minecraft API speed with {num_tests} requests...")
@@ -119,6 +132,88 @@ async def test_concurrent_requests(bearer_token: str, concurrent: int = 50):
         else:
             print("  🔴 POOR - May struggle against fast snipers")
 
+async def test_tls_resumption(bearer_token: str, connections: int = 10):
+    """Open fresh connections and measure how many TLS handshakes resume a cached session"""
+    print(f"\n🔐 Testing TLS session resumption over {connections} fresh connections...")
+    
+    url = "https://api.minecraftservices.com/minecraft/profile"
+    headers = {'Authorization': f'Bearer {bearer_token}'}
+    tls_context = ResumingSSLContext()
+    
+    # force_close gives every request a new connection and therefore a new handshake
+    async with aiohttp.ClientSession(connector=create_connector(tls_context, force_close=True)) as session:
+        for i in range(connections):
+            try:
+                async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                    await response.read()
+            except Exception as e:
+                print(f"  Connection {i+1}: FAILED - {e}")
+    
+    stats = tls_context.session_cache.summary()
+    print(f"📊 TLS Resumption Results:")
+    print(f"  Resumed: {stats['resumed']}/{stats['handshakes']} ({stats['hit_rate']:.0%})")
+    if stats['full_handshake_ms'] is not None:
+        print(f"  Full handshake: {stats['full_handshake_ms']:.1f}ms")
+    if stats['resumed_handshake_ms'] is not None:
+        print(f"  Resumed handshake: {stats['resumed_handshake_ms']:.1f}ms")
+        print(f"  Handshake time saved: {stats['saved_ms']:.0f}ms")
+    else:
+        print("  🔴 No handshake was resumed - the server may not issue session tickets")
+
+async def _profile_latency(url: str, headers: dict, profile: SocketConfig, requests: int, concurrency: int) -> tuple:
+    """Request latencies (ms) through a connector using one socket profile, plus what it applied"""
+    tuner = SocketTuner(profile)
+    tls_context = ResumingSSLContext() if url.startswith('https') else None
+    latencies = []
+    remaining = requests
+    
+    async def worker(session):
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                    await response.read()
+                latencies.append((time.perf_counter() - start) * 1000)
+            except Exception:
+                pass
+    
+    async with aiohttp.ClientSession(connector=create_connector(tls_context, socket_tuner=tuner)) as session:
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+    return sorted(latencies), tuner.applied
+
+async def compare_socket_profiles(url: str, headers: dict, requests: int, concurrency: int):
+    """Print p50/p99 latency for each socket profile against one endpoint"""
+    print(f"\n🔧 Socket profiles against {url} ({requests} requests, {concurrency} concurrent):")
+    for name, profile in SOCKET_PROFILES.items():
+        latencies, applied = await _profile_latency(url, headers, profile, requests, concurrency)
+        if not latencies:
+            print(f"  {name:<13} all requests failed")
+            continue
+        p50 = statistics.median(latencies)
+        p99 = latencies[max(0, int(len(latencies) * 0.99) - 1)]
+        options = ", ".join(f"{option}={state}" for option, state in applied.items()) or "OS defaults"
+        print(f"  {name:<13} p50 {p50:>7.2f}ms  p99 {p99:>7.2f}ms  ({len(latencies)} ok)  [{options}]")
+
+async def profiles_main(bearer_token: str, requests: int, concurrency: int):
+    """Compare socket profiles on the loopback mock and, with a token, on the real API"""
+    from benchmark import mock_servers
+    
+    with mock_servers(8096, processes=1) as base_url:
+        await compare_socket_profiles(f"{base_url}/minecraft/profile", {'Authorization': 'Bearer mock'}, requests, concurrency)
+    
+    if bearer_token:
+        # Keep real-API traffic light to stay clear of rate limits
+        await compare_socket_profiles(
+            "https://api.minecraftservices.com/minecraft/profile",
+            {'Authorization': f'Bearer {bearer_token}'},
+            min(requests, 20),
+            min(concurrency, 2)
+        )
+    else:
+        print("\n💡 Enter a bearer token to compare profiles on the real API path too")
+
 def test_system_clock():
     """Test system clock accuracy"""
     print(f"\n🕐 System Clock Test:")
@@ -144,6 +239,9 @@ async def main():
     # Test concurrent performance
     await test_concurrent_requests(bearer_token, 25)
     
+    # Test TLS session resumption
+    await test_tls_resumption(bearer_token, 10)
+    
     # Test system clock
     test_system_clock()
     
@@ -155,4 +253,14 @@ async def main():
     print("  5. Sync system clock with NTP servers")
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="NameMC Sniper speed test")
+    parser.add_argument('--profiles', action='store_true', help='Compare socket profiles on the loopback mock and the real API')
+    parser.add_argument('--requests', type=int, default=500, help='Requests per profile (--profiles)')
+    parser.add_argument('--concurrency', type=int, default=10, help='Concurrent requests (--profiles)')
+    args = parser.parse_args()
+    
+    if args.profiles:
+        token = input("Enter your bearer token (blank = loopback mock only): ").strip()
+        asyncio.run(profiles_main(token, args.requests, args.concurrency))
+    else:
+        asyncio.run(main())
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Per-attempt telemetry in a memory-mapped ring buffer
+
+Every claim attempt is packed into a fixed-size binary record in an mmap'd
+file: no Python objects are kept per attempt and nothing is logged. The file
+is a small header followed by `capacity` record slots; once they are full the
+oldest records are overwritten. Because the pages are shared with the kernel
+the buffer survives a crash of the sniper, and another process can read it
+while the burst is running:
+
+    python telemetry.py telemetry.bin            # summary of what is in the buffer
+    python telemetry.py telemetry.bin --follow   # per-second summary of new attempts
+    python telemetry.py telemetry.bin --csv      # every record
+
+Times are seconds on the writer's perf_counter() clock relative to the
+header's t0; t0_wall converts them to Unix time. Only the standard library
+is needed to read the buffer.
+"""
+
+import os
+import sys
+import mmap
+import time
+import struct
+import zlib
+import argparse
+import statistics
+from collections import Counter
+from typing import List, Optional, Tuple
+
+MAGIC = b"SNPTLM01"
+VERSION = 1
+
+# magic, version, record size, capacity, records written, t0 (perf_counter), t0 (Unix time),
+# burst start, drop instant and burst end (relative to t0), workers, request delay (ms)
+HEADER = struct.Struct('<8sHHIQdddddIf')
+HEADER_SIZE = 128
+WRITTEN_OFFSET = 16
+WRITTEN = struct.Struct('<Q')
+BURST_OFFSET = 40
+BURST = struct.Struct('<dddIf')
+
+# seq, planned send, actual send, first byte, completion, status, token index, worker,
+# connection id (local address and port), DNS / connect / TLS milliseconds (0 when the connection was reused)
+RECORD = struct.Struct('<QddddhHHQfff6x')
+RECORD_FIELDS = (
+    'seq', 'planned', 'sent', 'first_byte', 'completed', 'status', 'token', 'worker',
+    'connection', 'dns_ms', 'connect_ms', 'tls_ms'
+)
+
+# Claim results without an HTTP status are stored as negative codes
+STATUS_CODES = {'timeout': -1, 'network_error': -2, 'unknown_error': -3}
+
+# Every burst also writes one marker record carrying its plan: planned = burst start,
+# sent = drop instant, completed = burst end, worker = worker count, dns_ms = request delay
+BURST_MARKER = -100
+
+STATUS_NAMES = {code: name for name, code in STATUS_CODES.items()}
+STATUS_NAMES[BURST_MARKER] = "burst"
+
+def shard_path(path: str, index: int) -> str:
+    """Telemetry file for one shard or cluster node ("run.bin" -> "run.shard2.bin")"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.shard{index}{ext}"
+
+def connection_id(sockname) -> int:
+    """Stable id of a connection from its local socket address: port in the low 16 bits, address hash above"""
+    return zlib.crc32(str(sockname[0]).encode()) << 16 | sockname[1]
+
+class AttemptTrace:
+    """Per-worker scratch filled by the trace hooks during one request, reused for every attempt"""
+    __slots__ = ('sent', 'first_byte', 'dns_started', 'dns', 'connect_started', 'connect', 'connection', 'tls')
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        self.sent = 0.0
+        self.first_byte = 0.0
+        self.dns_started = 0.0
+        self.dns = 0.0
+        self.connect_started = 0.0
+        self.connect = 0.0
+        self.connection = 0
+        self.tls = 0.0
+    
+    def observe(self, response):
+        """Note which pooled connection answered (a transport.TracedResponse) and, for a new one, its TLS handshake time"""
+        if response.sockname:
+            self.connection = connection_id(response.sockname)
+        if self.connect:
+            self.tls = getattr(response.ssl_object, 'handshake_seconds', 0.0)
+
+class TelemetryWriter:
+    """Writes attempt records into the ring buffer file (one writer per file)"""
+    
+    def __init__(self, path: str, capacity: int = 65536):
+        self.path = path
+        self.capacity = capacity
+        self.written = 0
+        self.t0 = time.perf_counter()
+        size = HEADER_SIZE + capacity * RECORD.size
+        with open(path, 'wb') as f:
+            f.truncate(size)
+        self._file = open(path, 'r+b')
+        self.buffer = mmap.mmap(self._file.fileno(), size)
+        HEADER.pack_into(
+            self.buffer, 0, MAGIC, VERSION, RECORD.size, capacity, 0,
+            self.t0, time.time(), 0.0, 0.0, 0.0, 0, 0.0
+        )
+    
+    def begin_burst(self, started: float, drop_at: float, ends: float, workers: int, request_delay_ms: float):
+        """Store the burst plan in the header and as a marker record; started/ends are perf_counter(), drop_at is Unix time"""
+        drop_at_perf = started + (drop_at - time.time())
+        BURST.pack_into(
+            self.buffer, BURST_OFFSET,
+            started - self.t0, drop_at_perf - self.t0, ends - self.t0, workers, request_delay_ms
+        )
+        seq = self.written
+        RECORD.pack_into(
+            self.buffer, HEADER_SIZE + (seq % self.capacity) * RECORD.size,
+            seq, started - self.t0, drop_at_perf - self.t0, 0.0, ends - self.t0,
+            BURST_MARKER, 0, min(workers, 0xFFFF), 0, request_delay_ms, 0.0, 0.0
+        )
+        self.written = seq + 1
+        WRITTEN.pack_into(self.buffer, WRITTEN_OFFSET, seq + 1)
+    
+    def record(self, planned: float, trace: AttemptTrace, completed: float, status, token: int, worker: int):
+        """Pack one attempt into the next slot; times are perf_counter() values"""
+        seq = self.written
+        t0 = self.t0
+        RECORD.pack_into(
+            self.buffer, HEADER_SIZE + (seq % self.capacity) * RECORD.size,
+            seq,
+            planned - t0,
+            trace.sent - t0 if trace.sent else 0.0,
+            trace.first_byte - t0 if trace.first_byte else 0.0,
+            completed - t0,
+            status if status.__class__ is int else STATUS_CODES.get(status, -3),
+            token,
+            worker,
+            trace.connection,
+            trace.dns * 1000,
+            trace.connect * 1000,
+            trace.tls * 1000
+        )
+        self.written = seq + 1
+        WRITTEN.pack_into(self.buffer, WRITTEN_OFFSET, seq + 1)
+    
+    def trace_config(self):
+        """aiohttp TraceConfig that fills the AttemptTrace passed as trace_request_ctx"""
+        import aiohttp  # Readers of the buffer only need the standard library
+        
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_headers_sent.append(_on_headers_sent)
+        trace_config.on_dns_resolvehost_start.append(_on_dns_start)
+        trace_config.on_dns_resolvehost_end.append(_on_dns_end)
+        trace_config.on_connection_create_start.append(_on_connect_start)
+        trace_config.on_connection_create_end.append(_on_connect_end)
+        return trace_config
+    
+    def close(self):
+        if self.buffer.closed:
+            return
+        self.buffer.flush()
+        self.buffer.close()
+        self._file.close()
+
+async def _on_headers_sent(session, ctx, params):
+    trace = ctx.trace_request_ctx
+    if trace is not None:
+        trace.sent = time.perf_counter()
+
+async def _on_dns_start(session, ctx, params):
+    trace = ctx.trace_request_ctx
+    if trace is not None:
+        trace.dns_started = time.perf_counter()
+
+async def _on_dns_end(session, ctx, params):
+    trace = ctx.trace_request_ctx
+    if trace is not None and trace.dns_started:
+        trace.dns = time.perf_counter() - trace.dns_started
+
+async def _on_connect_start(session, ctx, params):
+    trace = ctx.trace_request_ctx
+    if trace is not None:
+        trace.connect_started = time.perf_counter()
+
+async def _on_connect_end(session, ctx, params):
+    trace = ctx.trace_request_ctx
+    if trace is not None and trace.connect_started:
+        trace.connect = time.perf_counter() - trace.connect_started
+
+class TelemetryReader:
+    """Read a telemetry buffer, also while the sniper is still writing it"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = self.header()
+        if header['magic'] != MAGIC:
+            raise ValueError(f"{path} is not a telemetry buffer")
+        if header['version'] != VERSION or header['record_size'] != RECORD.size:
+            raise ValueError(f"{path} uses telemetry format {header['version']} - this reader expects {VERSION}")
+        self.capacity = header['capacity']
+    
+    def header(self) -> dict:
+        names = (
+            'magic', 'version', 'record_size', 'capacity', 'written', 't0', 't0_wall',
+            'burst_started', 'drop_at', 'burst_end', 'workers', 'request_delay_ms'
+        )
+        return dict(zip(names, HEADER.unpack_from(self.buffer, 0)))
+    
+    def written(self) -> int:
+        return WRITTEN.unpack_from(self.buffer, WRITTEN_OFFSET)[0]
+    
+    def records(self, since: int = 0) -> Tuple[List[tuple], int]:
+        """Records with seq >= since that are still in the buffer, and the seq to continue from"""
+        written = self.written()
+        start = max(since, written - self.capacity)
+        records = []
+        for seq in range(start, written):
+            record = RECORD.unpack_from(self.buffer, HEADER_SIZE + (seq % self.capacity) * RECORD.size)
+            if record[0] == seq:
+                records.append(record)
+        # Drop anything the writer lapped while it was being read
+        oldest = self.written() - self.capacity
+        if records and records[0][0] < oldest:
+            records = [record for record in records if record[0] >= oldest]
+        return records, written
+    
+    def close(self):
+        self.buffer.close()
+        self._file.close()
+
+def status_name(code: int) -> str:
+    return STATUS_NAMES.get(code, str(code))
+
+def summarize(records: List[tuple]) -> str:
+    """One line: attempts, status mix and send -> completion latency"""
+    records = [record for record in records if record[5] != BURST_MARKER]
+    if not records:
+        return "0 attempts"
+    statuses = Counter(status_name(record[5]) for record in records)
+    latencies = sorted((record[4] - record[2]) * 1000 for record in records if record[2])
+    line = f"{len(records)} attempts  " + ", ".join(f"{count} × {status}" for status, count in statuses.most_common())
+    if latencies:
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        line += f"  latency p50 {statistics.median(latencies):.1f}ms p99 {p99:.1f}ms"
+    new_connections = sum(1 for record in records if record[10])
+    return line + f"  {new_connections} new connection(s)"
+
+def main():
+    parser = argparse.ArgumentParser(description="Read a sniper telemetry ring buffer")
+    parser.add_argument('path', help="Telemetry file (snipe.telemetry_path)")
+    parser.add_argument('--follow', '-f', action='store_true', help="Keep printing new attempts once per interval")
+    parser.add_argument('--interval', type=float, default=1.0)
+    parser.add_argument('--csv', action='store_true', help="Print every record as CSV")
+    args = parser.parse_args()
+    
+    try:
+        reader = TelemetryReader(args.path)
+    except (OSError, ValueError) as e:
+        sys.exit(f"❌ {e}")
+    
+    header = reader.header()
+    records, seq = reader.records()
+    if args.csv:
+        print(",".join(RECORD_FIELDS))
+        for record in records:
+            print(",".join(status_name(value) if i == 5 else str(value) for i, value in enumerate(record)))
+        return
+    
+    print(f"📼 {args.path}: {header['written']} attempts written, {len(records)} in the buffer (capacity {header['capacity']})")
+    print(f"   {summarize(records)}")
+    if not args.follow:
+        return
+    try:
+        while True:
+            time.sleep(args.interval)
+            records, seq = reader.records(seq)
+            print(f"{time.strftime('%H:%M:%S')}  {summarize(records)}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+if __name__ == "__main__":
+    main()
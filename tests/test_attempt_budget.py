@@ -0,0 +1,42 @@
+from pacing import AttemptBudget
+
+DROP = 1000.0
+
+def draws(budget: AttemptBudget, now: float, tries: int = 1000) -> int:
+    return sum(budget.try_acquire(now) for _ in range(tries))
+
+def test_budget_without_reserve_is_spent_in_full_before_the_drop():
+    budget = AttemptBudget(100, drop_at=DROP)
+    assert draws(budget, DROP - 1) == 100
+    assert budget.exhausted
+    assert budget.remaining == 0
+    assert not budget.try_acquire(DROP + 1)
+
+def test_reserve_only_opens_at_the_drop_instant():
+    budget = AttemptBudget(100, drop_at=DROP, reserve_fraction=0.3)
+    assert budget.reserved == 30
+    assert draws(budget, DROP - 0.001) == 70
+    assert not budget.exhausted
+    assert draws(budget, DROP) == 30
+    assert budget.exhausted
+
+def test_reserve_is_untouched_when_the_lead_draws_little():
+    budget = AttemptBudget(100, drop_at=DROP, reserve_fraction=0.5)
+    assert draws(budget, DROP - 1, tries=10) == 10
+    assert draws(budget, DROP + 1) == 90
+
+def test_rearm_reserves_a_share_of_what_is_left_for_the_next_drop():
+    budget = AttemptBudget(100, drop_at=DROP, reserve_fraction=0.5)
+    assert draws(budget, DROP + 1, tries=60) == 60
+    
+    budget.rearm(DROP + 30)
+    assert budget.reserved == 20
+    assert draws(budget, DROP + 20) == 20
+    assert draws(budget, DROP + 30) == 20
+    assert budget.exhausted
+
+def test_rearm_without_reserve_leaves_the_rest_available():
+    budget = AttemptBudget(10, drop_at=DROP)
+    draws(budget, DROP, tries=4)
+    budget.rearm(DROP + 30)
+    assert draws(budget, DROP + 10) == 6
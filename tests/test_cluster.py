@@ -0,0 +1,31 @@
+import pytest
+
+from cluster import TimeSlots, exposure_problem
+from config import ClusterConfig
+
+def owner(slots_by_node, now: float) -> list:
+    return [slots.index for slots in slots_by_node if slots.wait_seconds(now) == 0.0]
+
+def test_each_instant_belongs_to_exactly_one_node_in_turn():
+    nodes = [TimeSlots(base=100.0, slot_seconds=0.01, index=i, count=3) for i in range(3)]
+    for step in range(30):
+        now = 100.0 + step * 0.01 + 0.005
+        assert owner(nodes, now) == [step % 3]
+
+def test_wait_is_the_time_until_the_nodes_next_slot():
+    slots = TimeSlots(base=100.0, slot_seconds=1.0, index=2, count=3)
+    assert slots.wait_seconds(100.25) == pytest.approx(1.75)
+    assert slots.wait_seconds(101.5) == pytest.approx(0.5)
+    assert slots.wait_seconds(102.5) == 0.0
+    assert slots.wait_seconds(103.0) == pytest.approx(2.0)
+
+def test_single_node_and_times_before_the_base_never_wait():
+    assert TimeSlots(base=100.0, slot_seconds=1.0).wait_seconds(150.5) == 0.0
+    assert TimeSlots(base=100.0, slot_seconds=1.0, index=1, count=2).wait_seconds(99.0) == 0.0
+
+def test_coordinator_only_listens_off_loopback_with_a_secret_and_tls():
+    assert exposure_problem(ClusterConfig(host="127.0.0.1")) is None
+    assert exposure_problem(ClusterConfig(host="::1")) is None
+    assert exposure_problem(ClusterConfig(host="0.0.0.0")) is not None
+    assert exposure_problem(ClusterConfig(host="0.0.0.0", secret="s")) is not None
+    assert exposure_problem(ClusterConfig(host="0.0.0.0", secret="s", tls_cert_file="cert.pem")) is None
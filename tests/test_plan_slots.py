@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+
+from scheduler import SnipeJob, plan_slots
+
+T0 = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+def at(seconds: float) -> datetime:
+    return T0 + timedelta(seconds=seconds)
+
+def job(job_id: int, start: float, end: float, priority: int = 0) -> SnipeJob:
+    return SnipeJob(username=f"name{job_id}", drop_time=at(start + 0.4), priority=priority, job_id=job_id,
+                    start=at(start), end=at(end))
+
+def owners(slots) -> list:
+    return [(slot.job.job_id, (slot.start - T0).total_seconds(), (slot.end - T0).total_seconds()) for slot in slots]
+
+def test_disjoint_jobs_each_get_their_whole_window():
+    slots = plan_slots([job(2, 20, 30), job(1, 0, 10)])
+    assert owners(slots) == [(1, 0, 10), (2, 20, 30)]
+
+def test_higher_priority_preempts_a_running_window_which_resumes_after():
+    low = job(1, 0, 30)
+    high = job(2, 10, 20, priority=5)
+    assert owners(plan_slots([low, high])) == [(1, 0, 10), (2, 10, 20), (1, 20, 30)]
+
+def test_a_job_covered_by_a_higher_priority_one_gets_no_slot():
+    slots = plan_slots([job(1, 0, 30, priority=5), job(2, 10, 20)])
+    assert owners(slots) == [(1, 0, 30)]
+
+def test_equal_priority_goes_to_the_earlier_drop_time():
+    slots = plan_slots([job(2, 5, 15), job(1, 0, 10)])
+    assert owners(slots) == [(1, 0, 10), (2, 10, 15)]
+
+def test_now_trims_the_past_and_starts_with_the_open_window():
+    slots = plan_slots([job(1, 0, 10), job(2, 20, 30)], now=at(4))
+    assert owners(slots) == [(1, 4, 10), (2, 20, 30)]
+
+def test_slivers_shorter_than_the_minimum_are_dropped():
+    low = job(1, 0, 10.02)
+    high = job(2, 0.01, 10, priority=1)
+    assert owners(plan_slots([low, high])) == [(2, 0.01, 10)]
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+import sniper
+from sniper import RateLimitTracker
+
+class Clock:
+    """Stand-in for time.time() that only moves when told to (also on asyncio.sleep)"""
+    
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+    
+    def time(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(sniper.time, 'time', clock.time)
+    
+    async def sleep(seconds):
+        clock.now += seconds
+    monkeypatch.setattr(sniper.asyncio, 'sleep', sleep)
+    return clock
+
+def test_every_token_starts_ready(clock):
+    tracker = RateLimitTracker(3)
+    assert tracker.get_best_token() == 0
+    assert not any(tracker.is_token_limited(i) for i in range(3))
+
+def test_acquire_spaces_out_each_token(clock):
+    tracker = RateLimitTracker(2, min_interval=0.1)
+    first = asyncio.run(tracker.acquire(deadline=clock.now + 10))
+    second = asyncio.run(tracker.acquire(deadline=clock.now + 10))
+    assert {first, second} == {0, 1}
+    assert tracker.ready_at[first] == pytest.approx(1000.1)
+    
+    # Both tokens are spaced out, so the third attempt waits for the first one
+    third = asyncio.run(tracker.acquire(deadline=clock.now + 10))
+    assert third == first
+    assert clock.now == pytest.approx(1000.1)
+
+def test_defer_leaves_a_stale_heap_entry_that_is_skipped(clock):
+    tracker = RateLimitTracker(2)
+    tracker.defer(0, clock.now + 5)
+    # Token 0's original (0.0, 0) entry is still on the heap but no longer matches ready_at
+    assert (0.0, 0) in tracker._heap
+    assert tracker.get_best_token() == 1
+    assert (0.0, 0) not in tracker._heap
+
+def test_defer_never_moves_a_token_earlier(clock):
+    tracker = RateLimitTracker(1)
+    tracker.defer(0, clock.now + 5)
+    tracker.defer(0, clock.now + 1)
+    assert tracker.ready_at[0] == clock.now + 5
+
+def test_release_undoes_a_defer(clock):
+    tracker = RateLimitTracker(2)
+    tracker.defer(0, clock.now + 5)
+    tracker.defer(1, clock.now + 3)
+    tracker.release(0)
+    assert tracker.get_best_token() == 0
+    assert not tracker.is_token_limited(0)
+
+def test_rate_limit_defers_only_that_token(clock):
+    tracker = RateLimitTracker(2)
+    tracker.record_rate_limit(0, retry_after=2.0)
+    assert tracker.is_token_limited(0)
+    assert not tracker.is_token_limited(1)
+    assert tracker.get_best_token() == 1
+
+def test_removed_tokens_are_never_picked(clock):
+    tracker = RateLimitTracker(2)
+    tracker.remove(0)
+    tracker.defer(0, clock.now + 1)  # Ignored for a removed token
+    assert tracker.get_best_token() == 1
+    tracker.remove(1)
+    assert tracker.get_best_token() is None
+    assert asyncio.run(tracker.acquire(deadline=clock.now + 10)) is None
+
+def test_acquire_waits_out_the_deadline_when_no_token_is_ready(clock):
+    tracker = RateLimitTracker(1)
+    tracker.defer(0, clock.now + 5)
+    assert asyncio.run(tracker.acquire(deadline=clock.now + 2)) is None
+    assert clock.now == 1002.0
+
+def test_held_token_is_skipped_until_released(clock):
+    tracker = RateLimitTracker(2)
+    tracker.hold(0)
+    assert asyncio.run(tracker.acquire(deadline=clock.now + 10)) == 1
+    assert asyncio.run(tracker.acquire(deadline=clock.now + 10)) == 1
+    tracker.release(0)
+    assert tracker.get_best_token() == 0
+
+def test_acquire_keeps_waiting_while_the_only_token_is_held(clock, monkeypatch):
+    tracker = RateLimitTracker(1)
+    tracker.hold(0)
+    
+    # The probe answers a little later and hands the token back
+    async def sleep(seconds):
+        clock.now += seconds
+        if clock.now >= 1000.05:
+            tracker.release(0)
+    monkeypatch.setattr(sniper.asyncio, 'sleep', sleep)
+    assert asyncio.run(tracker.acquire(deadline=clock.now + 10)) == 0
+    assert clock.now == pytest.approx(1000.05)
+
+def test_penalize_and_relax_stay_within_bounds(clock):
+    tracker = RateLimitTracker(1, min_interval=0.01)
+    for _ in range(20):
+        tracker.penalize(0, factor=2.0, max_interval=0.5)
+    assert tracker.intervals[0] == 0.5
+    for _ in range(1000):
+        tracker.relax(0, step=0.01)
+    assert tracker.intervals[0] == 0.01
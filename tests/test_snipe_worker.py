@@ -0,0 +1,68 @@
+import asyncio
+
+from config import AppConfig, HistoryConfig, SnipeConfig
+from sniper import SnipeOutcome, UsernameSniper
+from token_health import TokenState
+
+def make_sniper(workers: int, duration: float, request_delay_ms: int = 0, max_attempts: int = 10 ** 6) -> UsernameSniper:
+    config = AppConfig(
+        snipe=SnipeConfig(
+            bearer_tokens=["only" + "x" * 60],
+            concurrent_requests=workers,
+            request_delay_ms=request_delay_ms,
+            max_snipe_attempts=max_attempts,
+            burst_duration_seconds=duration,
+            adaptive_delays=False,
+            breaker_base_open_ms=100
+        ),
+        history=HistoryConfig(enabled=False),
+        log_level="WARNING"
+    )
+    return UsernameSniper(config)
+
+def test_workers_stay_in_the_burst_while_a_probe_is_out():
+    sniper = make_sniper(workers=10, duration=0.8)
+    probe_window = []
+    after_probe = set()
+    
+    async def claim(username, token, trace=None):
+        if sniper.token_health.health[0].state == TokenState.HALF_OPEN:
+            # The probe takes its time; every other worker has to wait it out
+            probe_window.append(asyncio.get_running_loop().time())
+            await asyncio.sleep(0.3)
+            probe_window.append(asyncio.get_running_loop().time())
+            return {'success': False, 'status': 503}
+        if probe_window:
+            after_probe.add(id(asyncio.current_task()))
+            await asyncio.sleep(0.005)
+            return {'success': False, 'status': 503}
+        # The opening wave times out together
+        await asyncio.sleep(0.02)
+        return {'success': False, 'status': 'timeout'}
+    sniper._claim_username = claim
+    
+    result = asyncio.run(sniper._start_sniping("name"))
+    
+    assert len(probe_window) == 2
+    assert sniper.token_health.health[0].state == TokenState.CLOSED
+    assert sniper.token_health.health[0].consecutive_failures == 0
+    # Every worker, the one that sent the probe included, was still firing after it answered
+    assert len(after_probe) == 10
+    assert result.attempts > 10 + 1 + 10
+
+def test_workers_waiting_for_a_token_hold_no_budget_draws():
+    sniper = make_sniper(workers=10, duration=1.0, max_attempts=15)
+    
+    async def claim(username, token, trace=None):
+        await asyncio.sleep(0.005)
+        # The opening wave times out and rests the only token; every worker then waits for it
+        if sniper._burst_attempts < 10:
+            return {'success': False, 'status': 'timeout'}
+        return {'success': False, 'status': 503}
+    sniper._claim_username = claim
+    
+    result = asyncio.run(sniper._start_sniping("name"))
+    
+    # The budget only ran out once all of it had actually been sent
+    assert result.outcome == SnipeOutcome.BUDGET_EXHAUSTED
+    assert result.attempts == 15
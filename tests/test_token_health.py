@@ -0,0 +1,72 @@
+import base64
+import json
+
+from token_health import TokenHealthRegistry, TokenState, describe_expiry, token_expiry
+
+def jwt(payload) -> str:
+    def encode(data) -> str:
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip('=')
+    return f"{encode({'alg': 'HS256'})}.{encode(payload)}.signature"
+
+def test_token_expiry_reads_the_exp_claim():
+    assert token_expiry(jwt({'exp': 1767225600, 'sub': 'x'})) == 1767225600.0
+    assert token_expiry(jwt({'exp': 1767225600.5})) == 1767225600.5
+
+def test_token_expiry_handles_payloads_that_need_padding():
+    for name in ('a', 'ab', 'abc', 'abcd'):
+        assert token_expiry(jwt({'sub': name, 'exp': 42})) == 42.0
+
+def test_token_expiry_is_none_for_anything_else():
+    assert token_expiry("not-a-jwt") is None
+    assert token_expiry("a.b") is None
+    assert token_expiry("a.!!!.c") is None
+    assert token_expiry(jwt({'sub': 'no exp'})) is None
+    assert token_expiry(jwt({'exp': 'tomorrow'})) is None
+    assert token_expiry(jwt(["not", "an", "object"])) is None
+
+def test_describe_expiry():
+    assert describe_expiry(None) == "expiry unknown"
+    assert describe_expiry(1000 + 3 * 3600 + 12 * 60, now=1000) == "expires in 3h 12m"
+    assert describe_expiry(1000 - 5 * 60, now=1000) == "expired 5m 0s ago"
+
+def test_expiring_tokens_are_removed_before_the_burst():
+    tokens = [jwt({'exp': 500}), jwt({'exp': 1500}), jwt({'exp': 5000}), "opaque"]
+    registry = TokenHealthRegistry(tokens)
+    assert registry.exclude_expiring(deadline=2000, now=1000) == [0, 1]
+    assert registry.health[0].dead_reason == "expired"
+    assert registry.health[1].dead_reason == "expires_during_burst"
+    assert registry.alive_indices() == [2, 3]
+
+def test_half_open_breaker_lets_one_probe_decide():
+    registry = TokenHealthRegistry(["token"], base_open_seconds=1.0)
+    assert registry.record(0, {'status': 'timeout'}, now=100.0) == TokenState.OPEN
+    assert not registry.start_probe(0, now=100.5)  # Still resting
+    assert registry.start_probe(0, now=101.0)
+    assert registry.health[0].state == TokenState.HALF_OPEN
+    assert not registry.start_probe(0, now=101.0)  # Only one probe at a time
+    
+    # A failed probe re-opens the breaker for longer
+    assert registry.record(0, {'status': 'timeout'}, now=101.1) == TokenState.OPEN
+    assert registry.health[0].open_until == 103.1
+    assert registry.start_probe(0, now=103.1)
+    assert registry.record(0, {'status': 200, 'success': True}, now=103.2) == TokenState.CLOSED
+
+def test_a_wave_of_in_flight_failures_opens_the_breaker_once():
+    registry = TokenHealthRegistry(["token"], base_open_seconds=0.25, max_open_seconds=5.0)
+    # Fifty requests sent together all time out together
+    for i in range(50):
+        assert registry.record(0, {'status': 'timeout'}, now=102.0 + i * 0.001, sent_at=100.0) == TokenState.OPEN
+    health = registry.health[0]
+    assert health.consecutive_failures == 1
+    assert health.open_until == 102.25
+    assert health.attempts == 50
+    
+    # A late success from the same wave does not close the breaker either
+    assert registry.record(0, {'status': 200, 'success': True}, now=102.1, sent_at=100.0) == TokenState.OPEN
+    
+    # Only the probe, sent after the rest, decides
+    assert registry.start_probe(0, now=102.25)
+    assert registry.record(0, {'status': 'timeout'}, now=102.3, sent_at=100.5) == TokenState.HALF_OPEN
+    assert registry.record(0, {'status': 'timeout'}, now=102.4, sent_at=102.25) == TokenState.OPEN
+    assert health.consecutive_failures == 2
+    assert health.open_until == 102.9
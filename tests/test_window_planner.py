@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from window_planner import WindowPlanner, uncertainty_weights
+
+T0 = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+
+def at(seconds: float) -> datetime:
+    return T0 + timedelta(seconds=seconds)
+
+def test_overlapping_windows_become_one_segment():
+    planner = WindowPlanner(lead_seconds=0.4, burst_seconds=10, min_gap=0)
+    segments = planner.plan([at(0), at(0.5), at(1.0)])
+    assert len(segments) == 1
+    segment = segments[0]
+    assert segment.start == at(-0.4)
+    assert segment.end == at(10.6)
+    assert segment.drop_time == at(0)
+
+def test_windows_closer_than_the_gap_are_merged():
+    planner = WindowPlanner(lead_seconds=0, burst_seconds=5, min_gap=3)
+    # The second window starts 2s after the first ends - too short to set up a new burst
+    segments = planner.plan([at(0), at(7)])
+    assert len(segments) == 1
+    assert segments[0].duration == 12
+
+def test_windows_further_apart_stay_separate_and_in_order():
+    planner = WindowPlanner(lead_seconds=0, burst_seconds=5, min_gap=3)
+    segments = planner.plan([at(60), at(0), at(20)])
+    assert [segment.drop_time for segment in segments] == [at(0), at(20), at(60)]
+
+def test_density_adds_open_window_weights_and_drops_to_zero_in_gaps():
+    planner = WindowPlanner(lead_seconds=0, burst_seconds=5, min_gap=3)
+    segment = planner.plan([at(0), at(2), at(9)], weights=[1.0, 0.5, 0.25])[0]
+    assert segment.density(1) == 1.0  # Capped at 1 while the first two overlap
+    assert segment.density(6) == 0.5
+    assert segment.density(8) == 0.0  # Between the merged windows
+    assert segment.density(10) == 0.25
+    assert segment.active_workers(10, 10) == 3
+    assert segment.active_workers(8, 10) == 0
+
+def test_weights_are_clamped_and_must_match_the_drop_times():
+    planner = WindowPlanner()
+    segment = planner.plan([at(0)], weights=[3.0])[0]
+    assert segment.windows[0].weight == 1.0
+    with pytest.raises(ValueError):
+        planner.plan([at(0), at(1)], weights=[1.0])
+
+def test_uncertainty_weights_decrease_from_the_exact_time():
+    assert uncertainty_weights(4) == [1.0, 0.75, 0.5, 0.25]
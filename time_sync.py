@@ -8,16 +8,25 @@ import asyncio
 import aiohttp
 import logging
 from datetime import datetime, timezone, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 import json
 
 logger = logging.getLogger(__name__)
 
+def parse_namemc_time(text: str) -> datetime:
+    """Parse a NameMC drop time ("M/D/YYYY • H∶MM∶SS AM/PM", local time) into UTC"""
+    if '•' not in text or '∶' not in text:
+        raise ValueError(f"Invalid NameMC format: '{text}'")
+    parsed = datetime.strptime(text.replace('•', '').replace('∶', ':').strip(), '%m/%d/%Y %I:%M:%S %p')
+    # A naive datetime is taken as local time, with the DST rule in force on that date
+    return parsed.astimezone(timezone.utc)
+
 class TimeSync:
     """Handles time synchronization for accurate sniping"""
     
     def __init__(self):
         self.time_offset = 0.0  # Offset from true time in seconds
+        self.offset_error = None  # Error bound of the offset in seconds (half the sync round trip), None if unknown
         self.last_sync = None
         self.sync_sources = [
             "http://worldtimeapi.org/api/timezone/UTC",
@@ -32,23 +41,18 @@ class TimeSync:
         """Synchronize with internet time sources"""
         logger.info("🕐 Synchronizing time with internet sources...")
         
-        for source in self.sync_sources:
-            try:
-                offset = await self._get_time_offset(source)
-                if offset is not None:
-                    self.time_offset = offset
-                    self.last_sync = datetime.now(timezone.utc)
-                    
-                    if abs(offset) > 1.0:
-                        logger.warning(f"⚠️ System clock is {offset:.2f} seconds off!")
-                        logger.warning("Consider syncing your system clock with NTP")
-                    else:
-                        logger.info(f"✅ Time synchronized (offset: {offset:.3f}s)")
-                    
-                    return True
-            except Exception as e:
-                logger.warning(f"Failed to sync with {source}: {e}")
-                continue
+        sample = await self.measure_offset()
+        if sample is not None:
+            offset, error = sample
+            self.apply_offset(offset, error)
+            
+            if abs(offset) > 1.0:
+                logger.warning(f"⚠️ System clock is {offset:.2f} seconds off!")
+                logger.warning("Consider syncing your system clock with NTP")
+            else:
+                logger.info(f"✅ Time synchronized (offset: {offset:.3f}s)")
+            
+            return True
         
         # If all internet sources fail, use local system time as fallback
         logger.warning("⚠️ All internet time sources failed, using local system time")
@@ -57,14 +61,32 @@ class TimeSync:
         
         # Set minimal offset (assume system time is reasonably accurate)
         self.time_offset = 0.0
+        self.offset_error = None
         self.last_sync = datetime.now(timezone.utc)
         
         logger.info("✅ Fallback to local system time (offset: 0.000s)")
         logger.info("💡 Run 'sudo timedatectl set-ntp true' to improve time accuracy")
         return True
     
-    async def _get_time_offset(self, source: str) -> Optional[float]:
-        """Get time offset from a specific source"""
+    async def measure_offset(self) -> Optional[Tuple[float, float]]:
+        """(offset, error bound) from the first source that answers, without applying it"""
+        for source in self.sync_sources:
+            try:
+                sample = await self._get_time_offset(source)
+                if sample is not None:
+                    return sample
+            except Exception as e:
+                logger.warning(f"Failed to sync with {source}: {e}")
+        return None
+    
+    def apply_offset(self, offset: float, error: Optional[float] = None):
+        """Use a measured offset from now on"""
+        self.time_offset = offset
+        self.offset_error = error
+        self.last_sync = datetime.now(timezone.utc)
+    
+    async def _get_time_offset(self, source: str) -> Optional[Tuple[float, float]]:
+        """Get (time offset, error bound) from a specific source"""
         start_time = time.time()
         
         async with aiohttp.ClientSession() as session:
@@ -157,7 +179,7 @@ class TimeSync:
                     # Calculate offset accounting for network delay
                     local_time = datetime.now(timezone.utc)
                     offset = (server_time - local_time).total_seconds() - network_delay
-                    return offset
+                    return offset, network_delay
         
         return None
     
@@ -0,0 +1,192 @@
+import json
+import time
+import base64
+import logging
+from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+class TokenState:
+    """Circuit breaker states for a bearer token"""
+    CLOSED = "closed"        # Healthy - requests flow normally
+    OPEN = "open"            # Transient failure - token rests until open_until
+    HALF_OPEN = "half_open"  # Rest period over - one probe request is in flight and its result decides
+    DEAD = "dead"            # Permanent failure - removed from rotation
+
+# Statuses that can never recover during a snipe
+PERMANENT_FAILURES = {
+    401: "unauthorized",
+    404: "no_entitlement",
+}
+
+# Statuses that should rest the token for a while before it is used again
+TRANSIENT_FAILURES = {403, 429, 'timeout', 'network_error', 'unknown_error'}
+
+def token_expiry(token: str) -> Optional[float]:
+    """Unix time of the token's JWT `exp` claim, decoded locally; None if it is not a JWT"""
+    parts = token.split('.')
+    if len(parts) != 3:
+        return None
+    try:
+        payload = base64.urlsafe_b64decode(parts[1] + '=' * (-len(parts[1]) % 4))
+        exp = json.loads(payload).get('exp')
+    except (ValueError, AttributeError):
+        return None
+    return float(exp) if isinstance(exp, (int, float)) else None
+
+def describe_expiry(expires_at: Optional[float], now: Optional[float] = None) -> str:
+    """Human-readable time to expiry ("expires in 3h 12m", "expired 5m ago")"""
+    if expires_at is None:
+        return "expiry unknown"
+    remaining = expires_at - (now if now is not None else time.time())
+    minutes = int(abs(remaining) // 60)
+    span = f"{minutes // 60}h {minutes % 60}m" if minutes >= 60 else f"{minutes}m {int(abs(remaining) % 60)}s"
+    return f"expires in {span}" if remaining > 0 else f"expired {span} ago"
+
+@dataclass
+class TokenHealth:
+    """Health and usage counters for a single token"""
+    index: int
+    label: str
+    state: str = TokenState.CLOSED
+    open_until: float = 0.0
+    changed_at: float = 0.0  # When the breaker last changed state
+    consecutive_failures: int = 0
+    attempts: int = 0
+    outcomes: Dict[str, int] = field(default_factory=dict)
+    dead_reason: Optional[str] = None
+    expires_at: Optional[float] = None  # JWT exp claim (Unix time)
+
+class TokenHealthRegistry:
+    """Per-token circuit breakers that pull dead tokens out of the rotation"""
+    
+    def __init__(self, tokens: List[str], base_open_seconds: float = 0.25, max_open_seconds: float = 5.0):
+        self.base_open_seconds = base_open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.tokens = list(tokens)
+        self.health = [
+            TokenHealth(index=i, label=f"#{i + 1} (...{token[-8:]})", expires_at=token_expiry(token))
+            for i, token in enumerate(self.tokens)
+        ]
+    
+    def reset(self):
+        """Clear breaker state and counters while keeping dead tokens dead"""
+        for health in self.health:
+            health.attempts = 0
+            health.outcomes = {}
+            health.consecutive_failures = 0
+            health.open_until = 0.0
+            health.changed_at = 0.0
+            if health.state != TokenState.DEAD:
+                health.state = TokenState.CLOSED
+    
+    def record(self, index: int, result: dict, now: Optional[float] = None, sent_at: Optional[float] = None) -> str:
+        """Record the result of a claim attempt and return the token's new state
+        
+        Only a permanent failure can move the breaker on an answer to a request sent
+        (`sent_at`) before its last state change - a wave of in-flight requests
+        answering together must not escalate the rest or close it again.
+        """
+        now = now if now is not None else time.time()
+        health = self.health[index]
+        status = result.get('status', result.get('status_code', 200 if result.get('success') else 'unknown_error'))
+        
+        health.attempts += 1
+        key = str(status)
+        health.outcomes[key] = health.outcomes.get(key, 0) + 1
+        
+        if health.state == TokenState.DEAD:
+            return health.state
+        probe = health.state == TokenState.HALF_OPEN
+        
+        if status in PERMANENT_FAILURES:
+            self.kill(index, PERMANENT_FAILURES[status])
+        elif sent_at is not None and sent_at < health.changed_at:
+            pass  # Stale answer - counted above, but the breaker has already moved on
+        elif status in TRANSIENT_FAILURES and not result.get('outcome'):
+            health.consecutive_failures += 1
+            if status == 429:
+                open_for = result.get('retry_after', 1.0)
+            else:
+                open_for = self.base_open_seconds * (2 ** (health.consecutive_failures - 1))
+            open_for = min(open_for, self.max_open_seconds)
+            if health.state != TokenState.OPEN:
+                health.changed_at = now
+            health.state = TokenState.OPEN
+            health.open_until = now + open_for
+            logger.debug(f"Token {health.label} breaker open for {open_for:.2f}s (status {status})")
+        else:
+            if probe:
+                logger.debug(f"Token {health.label} breaker closed by its probe (status {status})")
+            health.consecutive_failures = 0
+            if health.state != TokenState.CLOSED:
+                health.changed_at = now
+            health.state = TokenState.CLOSED
+        
+        return health.state
+    
+    def start_probe(self, index: int, now: Optional[float] = None) -> bool:
+        """Move an OPEN token whose rest is over to HALF_OPEN; True if the attempt about to be made is its probe"""
+        health = self.health[index]
+        now = now if now is not None else time.time()
+        if health.state != TokenState.OPEN or now < health.open_until:
+            return False
+        health.state = TokenState.HALF_OPEN
+        health.changed_at = now
+        logger.debug(f"Token {health.label} breaker half-open - probing")
+        return True
+    
+    def kill(self, index: int, reason: str):
+        """Remove a token from the rotation permanently"""
+        health = self.health[index]
+        if health.state == TokenState.DEAD:
+            return
+        health.state = TokenState.DEAD
+        health.dead_reason = reason
+        logger.warning(f"🔌 Token {health.label} removed from rotation: {reason}")
+    
+    def exclude_expiring(self, deadline: float, now: Optional[float] = None) -> List[int]:
+        """Remove tokens whose JWT expires before `deadline` (Unix time); returns their indices
+        
+        The remaining tokens take over the excluded tokens' share, since workers
+        always pick the next ready token from the ones still alive.
+        """
+        now = now if now is not None else time.time()
+        excluded = []
+        for health in self.health:
+            if health.state == TokenState.DEAD or health.expires_at is None or health.expires_at > deadline:
+                continue
+            self.kill(health.index, "expired" if health.expires_at <= now else "expires_during_burst")
+            excluded.append(health.index)
+        return excluded
+    
+    def is_alive(self, index: int) -> bool:
+        """Check whether a token is still in the rotation"""
+        return self.health[index].state != TokenState.DEAD
+    
+    def alive_indices(self) -> List[int]:
+        """Indices of every token that is still in the rotation"""
+        return [h.index for h in self.health if h.state != TokenState.DEAD]
+    
+    def all_dead(self) -> bool:
+        """True once every token has been removed from the rotation"""
+        return all(h.state == TokenState.DEAD for h in self.health)
+    
+    def dead_reasons(self) -> set:
+        """Distinct reasons tokens were removed"""
+        return {h.dead_reason for h in self.health if h.state == TokenState.DEAD}
+    
+    def summary(self) -> List[dict]:
+        """Per-token attempt and outcome counts for the final result"""
+        return [
+            {
+                'token': h.label,
+                'state': h.state,
+                'attempts': h.attempts,
+                'outcomes': dict(h.outcomes),
+                'removed_reason': h.dead_reason,
+                'expires_at': h.expires_at,
+            }
+            for h in self.health
+        ]
@@ -0,0 +1,507 @@
+import ssl
+import sys
+import time
+import socket
+import inspect
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+import asyncio
+import logging
+import statistics
+from dataclasses import dataclass, asdict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+from aiohttp.abc import AbstractResolver
+
+logger = logging.getLogger(__name__)
+
+class TLSSessionCache:
+    """Most recent resumable TLS session per host, plus handshake statistics
+    
+    Sessions live in memory only: the ssl module cannot serialise an
+    SSLSession, so they cannot be carried over between runs.
+    """
+    
+    def __init__(self):
+        self.sessions: Dict[str, ssl.SSLSession] = {}
+        self.full_handshakes = 0
+        self.resumed_handshakes = 0
+        self.full_seconds = 0.0
+        self.resumed_seconds = 0.0
+    
+    def get(self, host: Optional[str]) -> Optional[ssl.SSLSession]:
+        return self.sessions.get(host) if host else None
+    
+    def store(self, host: Optional[str], session: Optional[ssl.SSLSession]):
+        if host and session is not None:
+            self.sessions[host] = session
+    
+    def record_handshake(self, resumed: bool, seconds: float):
+        if resumed:
+            self.resumed_handshakes += 1
+            self.resumed_seconds += seconds
+        else:
+            self.full_handshakes += 1
+            self.full_seconds += seconds
+    
+    def summary(self) -> dict:
+        """Resumption hit rate and handshake time saved so far"""
+        total = self.full_handshakes + self.resumed_handshakes
+        full_ms = self.full_seconds / self.full_handshakes * 1000 if self.full_handshakes else None
+        resumed_ms = self.resumed_seconds / self.resumed_handshakes * 1000 if self.resumed_handshakes else None
+        saved_ms = 0.0
+        if full_ms is not None and resumed_ms is not None:
+            saved_ms = max(0.0, full_ms - resumed_ms) * self.resumed_handshakes
+        return {
+            'handshakes': total,
+            'resumed': self.resumed_handshakes,
+            'hit_rate': round(self.resumed_handshakes / total, 3) if total else 0.0,
+            'full_handshake_ms': round(full_ms, 2) if full_ms is not None else None,
+            'resumed_handshake_ms': round(resumed_ms, 2) if resumed_ms is not None else None,
+            'saved_ms': round(saved_ms, 1),
+        }
+
+class _ResumableSSLObject(ssl.SSLObject):
+    """SSLObject that times its handshake and hands its session back to the cache
+    
+    Instances are created by SSLContext.wrap_bio() through _create(), never
+    through __init__, so per-connection state starts from these class defaults.
+    """
+    _cache: Optional[TLSSessionCache] = None
+    _host: Optional[str] = None
+    _handshake_started = 0.0
+    _session_checked = False
+    handshake_seconds = 0.0
+    
+    def do_handshake(self):
+        if not self._handshake_started:
+            self._handshake_started = time.perf_counter()
+        super().do_handshake()  # Raises SSLWantReadError until the handshake completes
+        self.handshake_seconds = time.perf_counter() - self._handshake_started
+        if self._cache is not None:
+            self._cache.record_handshake(self.session_reused, self.handshake_seconds)
+            self._remember_session()
+    
+    def read(self, *args, **kwargs):
+        data = super().read(*args, **kwargs)
+        # TLS 1.3 tickets arrive after the handshake, ahead of the first application data
+        if not self._session_checked and self._cache is not None:
+            self._session_checked = True
+            self._remember_session()
+        return data
+    
+    def _remember_session(self):
+        session = self.session
+        if session is not None and (session.has_ticket or not self._cache.get(self._host)):
+            self._cache.store(self._host, session)
+
+class ResumingSSLContext(ssl.SSLContext):
+    """Client SSLContext that offers the cached session for a host on every new connection"""
+    sslobject_class = _ResumableSSLObject
+    
+    def __new__(cls, protocol=ssl.PROTOCOL_TLS_CLIENT, *args, **kwargs):
+        return super().__new__(cls, protocol)
+    
+    def __init__(self, protocol=ssl.PROTOCOL_TLS_CLIENT, cache: Optional[TLSSessionCache] = None):
+        self.session_cache = cache or TLSSessionCache()
+        self.load_default_certs()
+    
+    def wrap_bio(self, incoming, outgoing, server_side=False, server_hostname=None, session=None):
+        if session is None and not server_side:
+            session = self.session_cache.get(server_hostname)
+        sslobj = super().wrap_bio(incoming, outgoing, server_side, server_hostname, session)
+        sslobj._cache = self.session_cache
+        sslobj._host = server_hostname
+        return sslobj
+
+# SO_BUSY_POLL is missing from the socket module; 46 is its value on Linux
+SO_BUSY_POLL = getattr(socket, 'SO_BUSY_POLL', 46 if sys.platform.startswith('linux') else None)
+
+class SocketTuner:
+    """Applies a SocketConfig to claim sockets and remembers what actually took effect"""
+    
+    def __init__(self, profile):
+        self.profile = profile
+        self.applied: Dict[str, str] = {}
+    
+    def _options(self, connected: bool) -> List[Tuple[str, int, Optional[int], int]]:
+        """(name, level, option, value) for every enabled option of this stage"""
+        profile = self.profile
+        options = []
+        if not connected:
+            # Buffer sizes must be set before connect() to influence TCP window scaling
+            if profile.send_buffer_bytes:
+                options.append(('send_buffer_bytes', socket.SOL_SOCKET, socket.SO_SNDBUF, profile.send_buffer_bytes))
+            if profile.receive_buffer_bytes:
+                options.append(('receive_buffer_bytes', socket.SOL_SOCKET, socket.SO_RCVBUF, profile.receive_buffer_bytes))
+            return options
+        if profile.tcp_nodelay:
+            options.append(('tcp_nodelay', socket.IPPROTO_TCP, socket.TCP_NODELAY, 1))
+        if profile.tcp_quickack:
+            options.append(('tcp_quickack', socket.IPPROTO_TCP, getattr(socket, 'TCP_QUICKACK', None), 1))
+        if profile.busy_poll_us:
+            options.append(('busy_poll_us', socket.SOL_SOCKET, SO_BUSY_POLL, profile.busy_poll_us))
+        if profile.tcp_user_timeout_ms:
+            options.append(('tcp_user_timeout_ms', socket.IPPROTO_TCP, getattr(socket, 'TCP_USER_TIMEOUT', None), profile.tcp_user_timeout_ms))
+        return options
+    
+    def apply(self, sock: Optional[socket.socket], connected: bool = True):
+        """Set this stage's options, recording 'on', 'unsupported' or the error for each"""
+        if sock is None or sock.family not in (socket.AF_INET, socket.AF_INET6):
+            return
+        for name, level, option, value in self._options(connected):
+            if option is None:
+                self.applied[name] = 'unsupported'
+                continue
+            try:
+                sock.setsockopt(level, option, value)
+                self.applied[name] = 'on'
+            except OSError as e:
+                self.applied[name] = f"denied ({e.strerror or e})"
+    
+    def socket_factory(self, addr_info) -> socket.socket:
+        """Create the socket for a connection attempt with the pre-connect options set"""
+        family, type_, proto, _, _ = addr_info
+        sock = socket.socket(family=family, type=type_, proto=proto)
+        self.apply(sock, connected=False)
+        return sock
+    
+    def report(self) -> dict:
+        """The configured profile and what each option did on this host"""
+        return {'profile': asdict(self.profile), 'applied': dict(self.applied)}
+
+# aiohttp only accepts a socket factory from 3.12 on; older versions get every option after connect
+_SOCKET_FACTORY_SUPPORTED = 'socket_factory' in inspect.signature(aiohttp.TCPConnector.__init__).parameters
+
+class TunedConnector(aiohttp.TCPConnector):
+    """TCPConnector that applies the socket profile to every new connection"""
+    
+    def __init__(self, *args, socket_tuner: Optional[SocketTuner] = None, **kwargs):
+        self.socket_tuner = socket_tuner
+        super().__init__(*args, **kwargs)
+    
+    async def _wrap_create_connection(self, *args, **kwargs):
+        transport, protocol = await super()._wrap_create_connection(*args, **kwargs)
+        if self.socket_tuner is not None:
+            sock = transport.get_extra_info('socket')
+            if not _SOCKET_FACTORY_SUPPORTED:
+                self.socket_tuner.apply(sock, connected=False)
+            self.socket_tuner.apply(sock)
+        return transport, protocol
+
+class TracedResponse(aiohttp.ClientResponse):
+    """ClientResponse that remembers which connection carried it
+    
+    A small response can release its connection before the caller sees the
+    headers, so the local socket address and TLS object are noted as soon as
+    the response starts reading from the connection.
+    """
+    sockname = None
+    ssl_object = None
+    
+    async def start(self, connection):
+        transport = connection.transport
+        if transport is not None:
+            self.sockname = transport.get_extra_info('sockname')
+            self.ssl_object = transport.get_extra_info('ssl_object')
+        return await super().start(connection)
+
+# File descriptors left for logs, DNS, Discord and the rest of the process
+FD_RESERVE = 64
+
+# Connections beyond the worker count for owner lookups and replacements of closing sockets
+POOL_HEADROOM = 8
+
+def pool_limits(concurrency: int, limit: int = 0, limit_per_host: int = 0) -> Tuple[int, int]:
+    """Connection pool limits for a burst with the given number of workers
+    
+    Each worker has at most one claim in flight, so the API host needs one
+    connection per worker (tokens share connections). The total adds a little
+    headroom and is capped by the file descriptor limit, which is raised
+    towards the hard limit first when it is too low. Non-zero arguments
+    override the derived values.
+    """
+    per_host = limit_per_host or concurrency + POOL_HEADROOM // 2
+    total = limit or concurrency + POOL_HEADROOM
+    
+    if resource is not None:
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        wanted = total + FD_RESERVE
+        if soft != resource.RLIM_INFINITY and soft < wanted:
+            new_soft = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+            try:
+                resource.setrlimit(resource.RLIMIT_NOFILE, (new_soft, hard))
+                logger.info(f"Raised open file limit from {soft} to {new_soft}")
+                soft = new_soft
+            except (ValueError, OSError) as e:
+                logger.warning(f"Could not raise open file limit ({soft}): {e}")
+        if soft != resource.RLIM_INFINITY and total > soft - FD_RESERVE:
+            total = max(1, soft - FD_RESERVE)
+            logger.warning(f"⚠️ Open file limit {soft} caps the connection pool at {total} for {concurrency} workers")
+    
+    return total, min(per_host, total)
+
+class PoolMonitor:
+    """aiohttp trace hooks that watch the connection pool during the burst
+    
+    Records how long requests queue for a free connection, new versus reused
+    connections and in-flight requests per host. Requests that had to wait
+    for a connection are kept (up to max_flagged) for the run report.
+    """
+    
+    def __init__(self, max_flagged: int = 100):
+        self.max_flagged = max_flagged
+        self.reset()
+    
+    def reset(self):
+        """Start counting from zero (called at the start of each burst)"""
+        self.started = time.monotonic()
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.requests = 0
+        self.waited = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.flagged: List[dict] = []
+        self.in_flight: Dict[str, int] = {}
+        self.peak_in_flight: Dict[str, int] = {}
+    
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """TraceConfig to pass to the ClientSession"""
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_request_end.append(self._on_request_done)
+        trace_config.on_request_exception.append(self._on_request_done)
+        trace_config.on_connection_queued_start.append(self._on_queued_start)
+        trace_config.on_connection_queued_end.append(self._on_queued_end)
+        trace_config.on_connection_create_end.append(self._on_connection_create)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuse)
+        return trace_config
+    
+    async def _on_request_start(self, session, ctx, params):
+        host = params.url.host
+        ctx.host = host
+        self.requests += 1
+        in_flight = self.in_flight.get(host, 0) + 1
+        self.in_flight[host] = in_flight
+        if in_flight > self.peak_in_flight.get(host, 0):
+            self.peak_in_flight[host] = in_flight
+    
+    async def _on_request_done(self, session, ctx, params):
+        host = getattr(ctx, 'host', None)
+        if host in self.in_flight:
+            self.in_flight[host] -= 1
+    
+    async def _on_queued_start(self, session, ctx, params):
+        ctx.queued_at = time.perf_counter()
+    
+    async def _on_queued_end(self, session, ctx, params):
+        wait = time.perf_counter() - getattr(ctx, 'queued_at', time.perf_counter())
+        self.waited += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+        if len(self.flagged) < self.max_flagged:
+            self.flagged.append({
+                't': round(time.monotonic() - self.started, 3),
+                'host': getattr(ctx, 'host', None),
+                'wait_ms': round(wait * 1000, 2),
+            })
+    
+    async def _on_connection_create(self, session, ctx, params):
+        self.new_connections += 1
+    
+    async def _on_connection_reuse(self, session, ctx, params):
+        self.reused_connections += 1
+    
+    def summary(self) -> dict:
+        """Pool usage since the last reset"""
+        return {
+            'requests': self.requests,
+            'new_connections': self.new_connections,
+            'reused_connections': self.reused_connections,
+            'peak_in_flight': dict(self.peak_in_flight),
+            'waited_for_connection': self.waited,
+            'mean_wait_ms': round(self.wait_total / self.waited * 1000, 2) if self.waited else 0.0,
+            'max_wait_ms': round(self.wait_max * 1000, 2),
+            'flagged_requests': list(self.flagged),
+        }
+
+def create_connector(ssl_context: Optional[ssl.SSLContext] = None, socket_tuner: Optional[SocketTuner] = None,
+                     **kwargs) -> aiohttp.TCPConnector:
+    """Connector for claim traffic using the given (resumption-aware) SSL context and socket profile"""
+    options = dict(
+        limit=500,
+        limit_per_host=100,
+        ttl_dns_cache=300,
+        use_dns_cache=True,
+        keepalive_timeout=30,
+        enable_cleanup_closed=True
+    )
+    options.update(kwargs)
+    if options.get('force_close'):
+        options.pop('keepalive_timeout')
+    if ssl_context is not None:
+        options['ssl'] = ssl_context
+    if socket_tuner is None:
+        return aiohttp.TCPConnector(**options)
+    if _SOCKET_FACTORY_SUPPORTED:
+        options['socket_factory'] = socket_tuner.socket_factory
+    return TunedConnector(socket_tuner=socket_tuner, **options)
+
+# Resolver hook: (host, port) -> [(family, ip), ...]; swap in a stub to test without DNS
+LookupFunction = Callable[[str, int], Awaitable[List[Tuple[int, str]]]]
+
+async def system_lookup(host: str, port: int) -> List[Tuple[int, str]]:
+    """Every A and AAAA record for a host, via the system resolver"""
+    infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    addresses = []
+    for family, _, _, _, sockaddr in infos:
+        if (family, sockaddr[0]) not in addresses:
+            addresses.append((family, sockaddr[0]))
+    return addresses
+
+@dataclass
+class AddressProbe:
+    """Connect latency measured to one resolved address"""
+    ip: str
+    family: int
+    tcp_ms: Optional[float] = None  # Median TCP connect time
+    tls_ms: Optional[float] = None  # Median TLS handshake time on top of TCP
+    error: Optional[str] = None
+    
+    @property
+    def total_ms(self) -> float:
+        if self.tcp_ms is None:
+            return float('inf')
+        return self.tcp_ms + (self.tls_ms or 0.0)
+
+class PinnedResolver(AbstractResolver):
+    """aiohttp resolver that answers from pre-resolved, latency-ordered addresses
+    
+    Pinned hosts never touch DNS. Any other host goes to the fallback resolver,
+    which is logged because it means a lookup happened on the request path.
+    """
+    
+    def __init__(self, fallback: Optional[AbstractResolver] = None):
+        self.fallback = fallback
+        self.pinned: Dict[str, List[Tuple[int, str]]] = {}
+        self.fallback_lookups = 0
+    
+    def pin(self, host: str, addresses: List[Tuple[int, str]]):
+        self.pinned[host] = list(addresses)
+    
+    async def resolve(self, host: str, port: int = 0, family: int = socket.AF_INET) -> list:
+        addresses = self.pinned.get(host)
+        if addresses:
+            return [
+                {'hostname': host, 'host': ip, 'port': port, 'family': addr_family, 'proto': 0, 'flags': socket.AI_NUMERICHOST}
+                for addr_family, ip in addresses
+                if family in (0, socket.AF_UNSPEC) or addr_family == family
+            ]
+        self.fallback_lookups += 1
+        logger.debug(f"DNS lookup for unpinned host {host}")
+        if self.fallback is None:
+            self.fallback = aiohttp.ThreadedResolver()
+        return await self.fallback.resolve(host, port, family)
+    
+    async def close(self):
+        if self.fallback is not None:
+            await self.fallback.close()
+
+class AddressPinner:
+    """Resolve every address of the API host ahead of time, probe them and pin the fastest"""
+    
+    def __init__(self, url: str, resolver: PinnedResolver, ssl_context: Optional[ssl.SSLContext] = None,
+                 lookup: Optional[LookupFunction] = None, pin_count: int = 2,
+                 probes: int = 3, timeout: float = 3.0):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.tls = parts.scheme == 'https'
+        self.port = parts.port or (443 if self.tls else 80)
+        self.resolver = resolver
+        self.ssl_context = ssl_context
+        self.lookup = lookup or system_lookup
+        self.pin_count = pin_count
+        self.probes = probes
+        self.timeout = timeout
+        self.results: List[AddressProbe] = []
+        self.pinned: List[AddressProbe] = []
+    
+    async def prepare(self) -> List[AddressProbe]:
+        """Resolve, probe and pin; keeps the previous pin set if nothing answers"""
+        try:
+            addresses = await self.lookup(self.host, self.port)
+        except (OSError, asyncio.TimeoutError) as e:
+            logger.warning(f"Could not resolve {self.host}: {e}")
+            return self.pinned
+        
+        self.results = list(await asyncio.gather(*(self._probe(family, ip) for family, ip in addresses)))
+        reachable = sorted((p for p in self.results if p.error is None), key=lambda p: p.total_ms)
+        if not reachable:
+            logger.warning(f"No address of {self.host} answered the connect probe - DNS left unpinned")
+            return self.pinned
+        
+        self.pinned = _interleave_families(reachable[:self.pin_count])
+        self.resolver.pin(self.host, [(p.family, p.ip) for p in self.pinned])
+        logger.info(
+            f"📌 Pinned {self.host} to "
+            + ", ".join(f"{p.ip} ({p.total_ms:.1f}ms)" for p in self.pinned)
+            + f" out of {len(self.results)} address(es)"
+        )
+        return self.pinned
+    
+    async def _probe(self, family: int, ip: str) -> AddressProbe:
+        """Median TCP connect and TLS handshake times to one address"""
+        probe = AddressProbe(ip=ip, family=int(family))
+        tcp_times, tls_times = [], []
+        for _ in range(self.probes):
+            writer = None
+            try:
+                start = time.perf_counter()
+                _, writer = await asyncio.wait_for(asyncio.open_connection(ip, self.port), self.timeout)
+                tcp_times.append((time.perf_counter() - start) * 1000)
+                if self.tls:
+                    start = time.perf_counter()
+                    await asyncio.wait_for(
+                        writer.start_tls(self.ssl_context or ssl.create_default_context(), server_hostname=self.host),
+                        self.timeout
+                    )
+                    tls_times.append((time.perf_counter() - start) * 1000)
+            except (OSError, ssl.SSLError, asyncio.TimeoutError) as e:
+                probe.error = str(e) or type(e).__name__
+                break
+            finally:
+                if writer is not None:
+                    writer.close()
+        if tcp_times and probe.error is None:
+            probe.tcp_ms = round(statistics.median(tcp_times), 2)
+            probe.tls_ms = round(statistics.median(tls_times), 2) if tls_times else None
+        return probe
+    
+    def summary(self) -> dict:
+        """Probe results and the pinned set for the run report"""
+        return {
+            'host': self.host,
+            'pinned': [p.ip for p in self.pinned],
+            'probes': [asdict(p) for p in self.results],
+            'fallback_lookups': self.resolver.fallback_lookups,
+        }
+
+def _interleave_families(probes: List[AddressProbe]) -> List[AddressProbe]:
+    """Keep the fastest first, then alternate address families so Happy Eyeballs can race them"""
+    if not probes:
+        return probes
+    first = probes[0]
+    others = [p for p in probes[1:] if p.family != first.family]
+    same = [p for p in probes[1:] if p.family == first.family]
+    ordered = [first]
+    while others or same:
+        if others:
+            ordered.append(others.pop(0))
+        if same:
+            ordered.append(same.pop(0))
+    return ordered
@@ -3,10 +3,12 @@
 Configuration validator for NameMC Sniper
 """
 
-import yaml
 import sys
+import time
+import yaml
 from pathlib import Path
 from config import ConfigManager, SnipeConfig
+from token_health import token_expiry, describe_expiry
 
 def validate_config(config_path: str = "config.yaml"):
     """Validate sniper configuration"""
@@ -65,6 +67,13 @@ def validate_config(config_path: str = "config.yaml"):
                 print(f"   ⚠️ Token #{i}: Seems too short ({len(token)} chars)")
             else:
                 print(f"   ✅ Token #{i}: Valid length (...{token[-8:]})")
+            expires_at = token_expiry(token)
+            if expires_at is None:
+                print(f"      ⚪ Not a JWT - expiry unknown")
+            elif expires_at <= time.time() + 3600:
+                print(f"      ⚠️ {describe_expiry(expires_at)}")
+            else:
+                print(f"      ⏳ {describe_expiry(expires_at)}")
         
         # Performance warnings
         print(f"\n⚡ Performance Analysis:")
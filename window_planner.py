@@ -0,0 +1,97 @@
+import math
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class DropWindow:
+    """One candidate drop time and the share of workers it deserves"""
+    drop_time: datetime
+    start: datetime  # Burst start for this candidate (drop time minus the lead)
+    end: datetime  # Burst end for this candidate
+    weight: float = 1.0  # 0..1 - fraction of workers firing while only this window is open
+
+@dataclass
+class BurstSegment:
+    """A continuous burst covering one or more overlapping drop windows"""
+    windows: List[DropWindow] = field(default_factory=list)
+    
+    @property
+    def start(self) -> datetime:
+        return min(window.start for window in self.windows)
+    
+    @property
+    def end(self) -> datetime:
+        return max(window.end for window in self.windows)
+    
+    @property
+    def drop_time(self) -> datetime:
+        """Earliest candidate drop time in the segment"""
+        return min(window.drop_time for window in self.windows)
+    
+    @property
+    def duration(self) -> float:
+        return (self.end - self.start).total_seconds()
+    
+    def density(self, elapsed: float) -> float:
+        """Share of workers that should fire `elapsed` seconds after the segment start
+        
+        Weights of every window open at that moment are added up and capped at 1;
+        between windows that were merged across a short gap the density is 0.
+        """
+        now = self.start + timedelta(seconds=elapsed)
+        return min(1.0, sum(window.weight for window in self.windows if window.start <= now < window.end))
+    
+    def active_workers(self, elapsed: float, worker_count: int) -> int:
+        """Number of workers allowed to fire at this point of the segment"""
+        return math.ceil(worker_count * self.density(elapsed))
+
+class WindowPlanner:
+    """Merge candidate drop windows into as few continuous bursts as possible
+    
+    Windows that overlap, or that are separated by less than min_gap seconds
+    (too short to tear down and set up a new burst), become one segment so no
+    candidate is missed while the previous burst is still running.
+    """
+    
+    def __init__(self, lead_seconds: float = 0.4, burst_seconds: float = 10.1, min_gap: float = 5.0):
+        self.lead = timedelta(seconds=lead_seconds)
+        self.burst = timedelta(seconds=burst_seconds)
+        self.min_gap = timedelta(seconds=min_gap)
+    
+    def plan(self, drop_times: List[datetime], weights: Optional[List[float]] = None) -> List[BurstSegment]:
+        """Segments in chronological order covering every drop time"""
+        if weights is None:
+            weights = [1.0] * len(drop_times)
+        if len(weights) != len(drop_times):
+            raise ValueError("One weight per drop time is required")
+        
+        windows = sorted(
+            (
+                DropWindow(drop_time=t, start=t - self.lead, end=t - self.lead + self.burst, weight=max(0.0, min(1.0, w)))
+                for t, w in zip(drop_times, weights)
+            ),
+            key=lambda window: window.start
+        )
+        
+        segments: List[BurstSegment] = []
+        for window in windows:
+            if segments and window.start <= segments[-1].end + self.min_gap:
+                segments[-1].windows.append(window)
+            else:
+                segments.append(BurstSegment(windows=[window]))
+        
+        for i, segment in enumerate(segments, 1):
+            logger.info(
+                f"🗓️ Burst {i}/{len(segments)}: {segment.start.strftime('%H:%M:%S.%f')[:-3]} → "
+                f"{segment.end.strftime('%H:%M:%S.%f')[:-3]} ({segment.duration:.1f}s) covering "
+                f"{len(segment.windows)} window(s)"
+            )
+        return segments
+
+def uncertainty_weights(count: int) -> List[float]:
+    """Linearly decreasing weights for AccurateTimer.calculate_drop_windows candidates (exact time first)"""
+    return [1.0 - i / count for i in range(count)]